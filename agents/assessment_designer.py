@@ -1,10 +1,32 @@
 import os
 import json
-import re
-from groq import Groq
 from dotenv import load_dotenv
-from pathlib import Path
 from typing import Optional
+from app.llm_client import get_llm_pool
+from app.datastore import Dataset, data_exists, load_dataset
+from app.skills import canonical_skills
+from app.prompts import PromptBuilder
+from app.question_bank import DSA_SLOTS, JD_SLOTS, JD_DIFFICULTY, get_question_bank, strength_signature
+from app.structured import complete_structured
+
+# Shape _generate() accepts; JSON mode may wrap the list as {"questions": [...]}
+ASSESSMENT_SCHEMA = {
+    "type": "array",
+    "min_items": 1,
+    "unwrap": "questions",
+    "items": {
+        "type": "object",
+        "required": ["title", "difficulty", "description"],
+        "properties": {
+            "title": {"type": "string"},
+            "difficulty": {"type": "string"},
+            "description": {"type": "string"},
+            "topics": {"type": "array"},
+            "examples": {"type": "array"},
+            "options": {"type": "object"},
+        },
+    },
+}
 
 
 class AssessmentDesigner:
@@ -20,38 +42,36 @@ class AssessmentDesigner:
         if not api_key:
             raise ValueError("❌ Missing GROQ_API_KEY in environment or .env file")
         print("✅ GROQ_API_KEY loaded successfully")
-        self.client = Groq(api_key=api_key)
+        self.llm = get_llm_pool()  # shared, rate-limited client
 
         # Load LeetCode profiles
-        with open(leetcode_data_path, "r", encoding="utf-8") as f:
-            self.leetcode_data = json.load(f)
+        self.leetcode_data = load_dataset(leetcode_data_path, key="person_id", required=True)
         print(f"✅ Loaded {len(self.leetcode_data)} candidates from {leetcode_data_path}")
 
         # Load resume data
-        with open(resume_data_path, "r", encoding="utf-8") as f:
-            self.resume_data = json.load(f)
+        self.resume_data = load_dataset(resume_data_path, key="person_id", required=True)
         print(f"✅ Loaded {len(self.resume_data)} resumes from {resume_data_path}")
 
         # Load JD data (optional)
-        self.jd_data = []
-        if Path(jd_data_path).exists():
-            with open(jd_data_path, "r", encoding="utf-8") as f:
-                self.jd_data = json.load(f)
+        self.jd_data = Dataset([], key="job_id")
+        if data_exists(jd_data_path):
+            self.jd_data = load_dataset(jd_data_path, key="job_id")
             print(f"✅ Loaded {len(self.jd_data)} job descriptions from {jd_data_path}")
 
     def _get_candidate_profile(self, person_id: str):
-        lc_entry = next((c for c in self.leetcode_data if c["person_id"] == person_id), None)
+        lc_entry = self.leetcode_data.get(person_id)
         if not lc_entry:
             raise ValueError(f"❌ No candidate found in leetcode.json with person_id {person_id}")
 
-        resume_entry = next((r for r in self.resume_data if r["person_id"] == person_id), None)
+        resume_entry = self.resume_data.get(person_id)
         if not resume_entry:
             raise ValueError(f"❌ No candidate found in resume.json with person_id {person_id}")
 
         merged = {
             "person_id": person_id,
             "username": lc_entry.get("username"),
-            "leetcode_profile": lc_entry,
+            # Canonical strength names ("DP" -> "Dynamic Programming") so equivalent profiles match
+            "leetcode_profile": {**lc_entry, "strengths": canonical_skills(lc_entry.get("strengths", []))},
             "resume_profile": resume_entry
         }
         print(f"✅ Candidate merged: username={merged['username']}, name={resume_entry.get('name')}")
@@ -60,70 +80,112 @@ class AssessmentDesigner:
     def _get_job(self, job_id: Optional[str]):
         if not self.jd_data or not job_id:
             return {}
-        return next((j for j in self.jd_data if j["job_id"] == job_id), {})
-
-    def generate_assessment(self, person_id: str, job_id: Optional[str] = None):
-        candidate_profile = self._get_candidate_profile(person_id)
-        job_info = self._get_job(job_id) if job_id else {}
-
-        prompt = f"""
-You are an assessment generator.
-Create a JSON array of 3 coding challenges for the candidate below.
-
-Candidate Profile:
-{json.dumps(candidate_profile, indent=2)}
-
-Job Description:
-{json.dumps(job_info, indent=2)}
-
-Rules:
-- Total 3 questions:
-    1-2: Easy to Medium DSA → based on candidate's strengths and LeetCode profile. Avoid trivial questions.
-    3: Hard → tailored specifically to the Job Description; assess problem-solving.
+        return self.jd_data.get(job_id, {})
+
+    def _generate(self, candidate_profile: dict, job_info: dict, n_dsa: int = DSA_SLOTS, n_jd: int = JD_SLOTS,
+                  avoid_titles=None, use_cache: bool = True) -> list:
+        """Ask the LLM for n_dsa strength-based problems followed by n_jd JD-specific ones."""
+        rules = []
+        if n_dsa:
+            rules.append(f"""    {n_dsa} Easy to Medium DSA question(s) → based on candidate's strengths and LeetCode profile. Avoid trivial questions.
+    Set "kind": "dsa" and "topics" to the candidate strengths it exercises.""")
+        if n_jd:
+            rules.append(f"""    {n_jd} {JD_DIFFICULTY} question(s) → tailored specifically to the Job Description; assess problem-solving.
+    Set "kind": "jd" and "topics" to the job skills it exercises.""")
+        prompt = (
+            PromptBuilder("assessment")
+            .text(f"You are an assessment generator.\nCreate a JSON array of {n_dsa + n_jd} coding challenges for the candidate below.")
+            .data("Candidate Profile", candidate_profile, priority=80)
+            .data("Job Description", job_info, priority=90)
+            .data("Problems we already have (write different ones)", avoid_titles or [], priority=20)
+            .text(f"""Rules:
+- Total {n_dsa + n_jd} questions, in this order:
+""" + "\n".join(rules) + """
 - Return ONLY valid JSON (no markdown, no explanation)
 - JSON must be a list of objects, each with:
-  "title", "difficulty", "description", "instructions", "constraints", "examples", "options"
+  "kind", "topics", "title", "difficulty", "description", "instructions", "constraints", "examples", "options"
 - Examples must contain "input" and "output"
 - Options must include "time_limit_min" and "languages_allowed"
-"""
+""")
+            .build()
+        )
 
         print("\n📝 Sending prompt to Groq...")
-        response = self.client.chat.completions.create(
+        assessment = complete_structured(
+            self.llm,
+            prompt,
+            ASSESSMENT_SCHEMA,
             model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
+            use_cache=use_cache,
+            agent="assessment",
+            call_site="questions",
         )
+        print("\n✅ Successfully parsed Groq JSON response")
+        return assessment
 
-        raw_text = response.choices[0].message.content
-        if not raw_text:
-            raise ValueError("❌ Groq response content is None")
-        raw_text = raw_text.strip()
-
-        # Remove code fences
-        if raw_text.startswith("```") and raw_text.endswith("```"):
-            raw_text = raw_text.strip("`").strip()
-            if raw_text.lower().startswith("json"):
-                raw_text = raw_text[4:].strip()
-
-        # Remove any inline JS-style comments
-        raw_text = re.sub(r"//.*$", "", raw_text, flags=re.MULTILINE)
-
-        # Remove trailing commas (before } or ])
-        raw_text = re.sub(r",\s*([\]}])", r"\1", raw_text)
-
-        print("\n📨 Cleaned Groq Response:")
-        print(raw_text)
+    def generate_assessment(self, person_id: str, job_id: Optional[str] = None, use_cache: bool = True):
+        """Three problems: two on the candidate's strengths, one on the JD.
 
-        # Parse JSON safely
-        try:
-            assessment = json.loads(raw_text)
-            if not isinstance(assessment, list):
-                raise ValueError("❌ Expected Groq JSON to be a list of assessments")
-            print("\n✅ Successfully parsed Groq JSON response")
-        except json.JSONDecodeError:
-            raise ValueError(f"❌ Groq did not return valid JSON:\n{raw_text}")
+        With the question bank enabled, problems already banked for these strengths and
+        this JD are reused and only the missing slots are generated (use_cache=False
+        generates a fresh package). Generated problems are capped to the open slots and added to the bank.
+        """
+        candidate_profile = self._get_candidate_profile(person_id)
+        job_info = self._get_job(job_id) if job_id else {}
 
-        return assessment
+        bank = get_question_bank()
+        if bank is None:
+            generated = self._generate(candidate_profile, job_info, use_cache=use_cache)
+            return [self._strip_tags(q) for _, q in self._fill_slots(generated, DSA_SLOTS, JD_SLOTS)]
+
+        strengths = candidate_profile["leetcode_profile"].get("strengths", [])
+        dsa, jd = bank.assemble(strengths, job_id) if use_cache else ([], [])
+        n_dsa, n_jd = DSA_SLOTS - len(dsa), JD_SLOTS - len(jd)
+        dsa = [q["question"] for q in dsa]
+        jd = [q["question"] for q in jd]
+        if not n_dsa and not n_jd:
+            print(f"♻️ Assessment assembled from the question bank ({strength_signature(strengths) or 'no strengths'}, {job_id})")
+            return dsa + jd
+
+        print(f"🔧 Question bank covers {len(dsa) + len(jd)}/{DSA_SLOTS + JD_SLOTS}; generating {n_dsa + n_jd}")
+        generated = self._generate(
+            candidate_profile, job_info, n_dsa=n_dsa, n_jd=n_jd,
+            avoid_titles=bank.titles(strengths, job_id)[:30], use_cache=use_cache,
+        )
+        for kind, question in self._fill_slots(generated, n_dsa, n_jd):
+            if kind == "dsa":
+                # Tag with the candidate strengths it exercises (all of them when the model didn't say)
+                topics = [t for t in canonical_skills(question.get("topics") or []) if t in strengths] or strengths
+            else:
+                topics = question.get("topics") or job_info.get("skills_required", [])
+            question = self._strip_tags(question)
+            bank.add(question, kind, topics, job_id=job_id, signature=strength_signature(strengths))
+            (dsa if kind == "dsa" else jd).append(question)
+        return dsa + jd
+
+    @staticmethod
+    def _fill_slots(generated, n_dsa: int, n_jd: int) -> list:
+        """(kind, question) for at most n_dsa DSA and n_jd JD problems; anything the model returned beyond that is dropped."""
+        open_slots = {"dsa": n_dsa, "jd": n_jd}
+        kept = []
+        for i, question in enumerate(generated):
+            if not isinstance(question, dict):
+                continue
+            kind = question.get("kind") if question.get("kind") in ("dsa", "jd") else ("dsa" if i < n_dsa else "jd")
+            if open_slots[kind] > 0:
+                open_slots[kind] -= 1
+                kept.append((kind, question))
+        if len(kept) < len(generated):
+            print(f"⚠️ Dropped {len(generated) - len(kept)} generated problem(s) beyond the open slots")
+        return kept
+
+    @staticmethod
+    def _strip_tags(question):
+        """Drop the bank tags the prompt asks for; the package keeps its original shape."""
+        if not isinstance(question, dict):
+            return question
+        return {k: v for k, v in question.items() if k not in ("kind", "topics")}
 
 
 if __name__ == "__main__":
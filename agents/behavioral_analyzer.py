@@ -1,62 +1,200 @@
 import os
 import json
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pathlib import Path
 from typing import Optional
+from app.llm_cache import get_cache
+from app.llm_client import get_llm_pool
+from app.datastore import data_exists, load_dataset, resolve_data_path
+from app.prompts import TOKEN_BUDGETS, PromptBuilder, estimate_tokens
+from app.structured import complete_structured, parse_structured, validate
+from app.behavior_signals import (
+    BIAS_MITIGATION_GUIDELINES, entry_text, get_behavior_signals, insights_summary, soft_skill_summary,
+)
+
+# Every behavioral call uses these; the response cache is keyed on them too
+MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+TEMPERATURE = 0.7
+
+BEHAVIORAL_SCHEMA = {
+    "type": "object",
+    "required": ["soft_skill_analysis", "keywords", "themes", "high_level_insights", "bias_mitigation_protocol"],
+    "properties": {
+        "soft_skill_analysis": {"type": "object"},
+        "keywords": {"type": "array"},
+        "themes": {"type": "array"},
+        "high_level_insights": {"type": "string"},
+        "bias_mitigation_protocol": {"type": "object"},
+    },
+}
+
+# Hybrid mode: keywords/themes/evidence come from app.behavior_signals, the LLM writes the prose
+INSIGHTS_SCHEMA = {
+    "type": "object",
+    "required": ["soft_skill_analysis", "high_level_insights", "bias_mitigation_protocol"],
+    "properties": {
+        "soft_skill_analysis": {"type": "object"},
+        "high_level_insights": {"type": "string"},
+        "bias_mitigation_protocol": {"type": "object"},
+    },
+}
+INSIGHTS_FIELDS = tuple(INSIGHTS_SCHEMA["required"])
+
+# "llm" (default): the LLM writes the whole analysis; "hybrid": local keywords/themes/evidence
+# + LLM prose; "fast": no LLM, templated prose
+MODES = ("llm", "hybrid", "fast")
+
+# analyze_many(): candidates per request (bounds the reply length) and the prompt's token budget
+BATCH_MAX_CANDIDATES = int(os.getenv("BEHAVIORAL_BATCH_SIZE", "8"))
+BATCH_PROMPT_NAME = "behavioral.batch"
 
 
 class BehavioralAnalyzer:
     """Analyze candidate behavioral & cultural fit from textual data using Groq."""
 
-    def __init__(self, candidate_text_path: Optional[str | Path] = None):
+    def __init__(self, candidate_text_path: Optional[str | Path] = None, mode: Optional[str] = None):
         # Default path relative to this script
         if candidate_text_path is None:
             candidate_text_path = Path(__file__).parent.parent / "data" / "candidate_text.json"
 
-        candidate_text_path = Path(str(candidate_text_path)).resolve()
+        candidate_text_path = resolve_data_path(str(candidate_text_path))  # .json or .ndjson
 
         # Load environment variables
         load_dotenv()
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("❌ Missing GROQ_API_KEY in environment or .env file")
-        print("✅ GROQ_API_KEY loaded successfully")
+        self.mode = mode or os.getenv("BEHAVIORAL_MODE", "llm")
+        if self.mode not in MODES:
+            raise ValueError(f"❌ Unknown behavioral mode {self.mode!r} (expected one of {', '.join(MODES)})")
+        self.llm = None
+        if self.mode != "fast":
+            api_key = os.getenv("GROQ_API_KEY")
+            if not api_key:
+                raise ValueError("❌ Missing GROQ_API_KEY in environment or .env file")
+            print("✅ GROQ_API_KEY loaded successfully")
 
-        self.client = Groq(api_key=api_key)
+            self.llm = get_llm_pool()  # shared, rate-limited client
 
         # Load candidate text
-        if not candidate_text_path.exists():
+        if not data_exists(candidate_text_path):
             raise FileNotFoundError(f"❌ candidate_text.json not found at {candidate_text_path}")
-        with open(candidate_text_path, "r", encoding="utf-8") as f:
-            self.candidate_texts = json.load(f)
+        self.candidate_texts = load_dataset(candidate_text_path, key="person_id")
         print(f"✅ Loaded candidate text data ({len(self.candidate_texts)} entries)")
 
     def _get_candidate_text(self, person_id: str) -> str:
         """Retrieve candidate text safely."""
-        entry = next((c for c in self.candidate_texts if c.get("person_id") == person_id), None)
+        entry = self.candidate_texts.get(person_id)
         if not entry:
             raise ValueError(f"❌ No candidate text found for person_id {person_id}")
 
         # Support both 'text' key or 'texts' list (merge into single string)
-        if "text" in entry:
-            return entry["text"]
-        elif "texts" in entry:
-            return " ".join(entry["texts"])
-        else:
+        text = entry_text(entry)
+        if text is None:
             raise KeyError(f"❌ Candidate entry missing 'text' or 'texts': {entry}")
+        return text
 
-    def analyze(self, person_id: str) -> dict:
-        """Run behavioral analysis and return structured insights."""
-        candidate_text = self._get_candidate_text(person_id)
+    def _complete_json(self, prompt: str, schema: dict, call_site: str, use_cache: bool = True, on_token=None) -> dict:
+        """Structured LLM call, streamed to on_token(chunk) when given."""
+        print("\n📝 Sending prompt to Groq...")
+        if on_token is not None:
+            parts = []
+            for chunk in self.llm.stream(
+                prompt,
+                model=MODEL,
+                temperature=TEMPERATURE,
+                use_cache=use_cache,
+                agent="behavioral",
+                call_site=call_site,
+            ):
+                parts.append(chunk)
+                on_token(chunk)
+            raw_text = "".join(parts)
+        else:
+            raw_text = None  # complete_structured() makes the (JSON mode) call
+        result = complete_structured(
+            self.llm,
+            prompt,
+            schema,
+            model=MODEL,
+            temperature=TEMPERATURE,
+            use_cache=use_cache,
+            agent="behavioral",
+            call_site=call_site,
+            raw=raw_text,
+        )
+        print("✅ Successfully parsed Groq JSON response")
+        return result
+
+    def _local_signals(self, person_id: str) -> dict:
+        """Keywords, themes and evidence from the local extractor (no LLM)."""
+        self._get_candidate_text(person_id)  # same errors as the LLM path for unknown ids
+        signals = get_behavior_signals(self.candidate_texts).get(person_id)
+        return {
+            "person_id": person_id,
+            "keywords": signals["keywords"],
+            "themes": signals["themes"],
+            "evidence": signals["evidence"],
+            "analysis_mode": self.mode,
+        }
+
+    def _local_analysis(self, person_id: str) -> dict:
+        """Fast mode: local signals plus templated soft-skill lines, summary and bias guidelines."""
+        signals = get_behavior_signals(self.candidate_texts).get(person_id)
+        return {
+            **self._local_signals(person_id),
+            "soft_skill_analysis": soft_skill_summary(signals),
+            "high_level_insights": insights_summary(signals),
+            "bias_mitigation_protocol": {"guidelines": list(BIAS_MITIGATION_GUIDELINES)},
+        }
 
-        prompt = f"""
-You are an AI behavioral and cultural fit analyzer.
+    def _hybrid_analysis(self, person_id: str, written: dict) -> dict:
+        """Local signals plus the LLM-written soft-skill analysis, summary and bias protocol."""
+        return {**self._local_signals(person_id), **{field: written[field] for field in INSIGHTS_FIELDS}}
+
+    def _insights_prompt(self, person_id: str, analysis: dict) -> str:
+        return (
+            PromptBuilder("behavioral")
+            .text("You are an AI behavioral and cultural fit analyzer.")
+            .data("Candidate Text", self._get_candidate_text(person_id), priority=90)
+            .data("Detected themes", analysis["themes"], priority=40)
+            .data("Evidence", analysis["evidence"], priority=30)
+            .text("""Task:
+- Analyze the candidate's soft skills (collaboration, problem-solving, communication), grounded in the
+  text and evidence above.
+- Write a high-level summary (2-4 sentences) of their behavioral strengths.
+- Include a bias mitigation protocol.
+- Judge behaviors, not writing style; avoid demographic assumptions.
+- Return ONLY valid JSON (no markdown, no explanation):
+{"soft_skill_analysis": {"collaboration": "...","problem_solving": "...","communication": "..."}, "high_level_insights": "...", "bias_mitigation_protocol": {"guidelines": ["..."]}}
+""")
+            .build()
+        )
 
-Candidate Text:
-{candidate_text}
+    def analyze(self, person_id: str, use_cache: bool = True, on_token=None) -> dict:
+        """Run behavioral analysis and return structured insights.
 
-Task:
+        "llm" (the default) has the LLM write everything. "hybrid" extracts keywords,
+        themes and evidence locally, and the LLM writes the soft-skill analysis, summary
+        and bias protocol; "fast" makes no LLM call. on_token(chunk) receives the raw
+        JSON response as it is streamed.
+        """
+        if self.mode == "llm":
+            return self._analyze_llm(person_id, use_cache=use_cache, on_token=on_token)
+        if self.mode == "fast":
+            return self._local_analysis(person_id)
+        signals = self._local_signals(person_id)
+        prompt = self._insights_prompt(person_id, signals)
+        written = self._complete_json(prompt, INSIGHTS_SCHEMA, "behavioral-insights", use_cache, on_token)
+        return self._hybrid_analysis(person_id, written)
+
+    def _analyze_llm(self, person_id: str, use_cache: bool = True, on_token=None) -> dict:
+        """The whole analysis written by the LLM."""
+        candidate_text = self._get_candidate_text(person_id)
+
+        prompt = (
+            PromptBuilder("behavioral")
+            .text("You are an AI behavioral and cultural fit analyzer.")
+            .data("Candidate Text", candidate_text)
+            .text(f"""Task:
 - Analyze candidate's soft skills based on text.
 - Identify keywords and themes related to:
     - Collaboration
@@ -75,31 +213,133 @@ Structure JSON as:
   "high_level_insights": "...",
   "bias_mitigation_protocol": {{"guidelines": ["...", "..."]}}
 }}
+""")
+            .build()
+        )
+
+        return self._complete_json(prompt, BEHAVIORAL_SCHEMA, "behavioral-summary", use_cache, on_token)
+
+    # ---------- batched ----------
+    def _batch_instructions(self) -> str:
+        if self.mode == "hybrid":
+            return """Task, for EACH candidate above (keyed by person_id):
+- Analyze the candidate's soft skills (collaboration, problem-solving, communication) based on their own text only.
+- Write a high-level summary (2-4 sentences) of their behavioral strengths.
+- Include a bias mitigation protocol.
+- Judge behaviors, not writing style; avoid demographic assumptions.
+- Return ONLY valid JSON (no markdown, no explanation): one object whose keys are the person_ids, each value shaped as
+{"soft_skill_analysis": {"collaboration": "...","problem_solving": "...","communication": "..."}, "high_level_insights": "...", "bias_mitigation_protocol": {"guidelines": ["..."]}}
+"""
+        return """Task, for EACH candidate above (keyed by person_id):
+- Analyze the candidate's soft skills based on their own text only.
+- Identify keywords and themes related to collaboration, problem-solving and communication.
+- Provide a high-level summary of behavioral strengths.
+- Include a bias mitigation protocol.
+- Return ONLY valid JSON (no markdown, no explanation): one object whose keys are the person_ids, each value shaped as
+{"soft_skill_analysis": {"collaboration": "...","problem_solving": "...","communication": "..."}, "keywords": ["..."], "themes": ["..."], "high_level_insights": "...", "bias_mitigation_protocol": {"guidelines": ["..."]}}
 """
 
-        print("\n📝 Sending prompt to Groq...")
-        response = self.client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
+    def _pack(self, person_ids, token_budget: int, max_candidates: int) -> list:
+        """Split person_ids into batches whose texts fit token_budget (a text over budget goes alone)."""
+        batches, batch, used = [], [], 0
+        for person_id in person_ids:
+            tokens = estimate_tokens(self._get_candidate_text(person_id)) + 8  # + key and separators
+            if batch and (used + tokens > token_budget or len(batch) >= max_candidates):
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append(person_id)
+            used += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _analyze_batch(self, person_ids: list, prompt_budget: int, use_cache: bool = True) -> dict:
+        """One request for several candidates; returns the analyses that came back valid."""
+        texts = {person_id: self._get_candidate_text(person_id) for person_id in person_ids}
+        prompt = (
+            PromptBuilder(BATCH_PROMPT_NAME, budget=prompt_budget)
+            .text("You are an AI behavioral and cultural fit analyzer.")
+            .data("Candidate Texts", texts)
+            .text(self._batch_instructions())
+            .build()
+        )
+        print(f"\n📝 Sending {len(person_ids)} candidates to Groq in one request...")
+        raw_text = self.llm.complete(
+            prompt,
+            model=MODEL,
+            temperature=TEMPERATURE,
+            use_cache=use_cache,
+            agent="behavioral",
+            call_site="behavioral-batch",
+            json_mode=True,
         )
+        parsed, errors = parse_structured(raw_text, {"type": "object"})
+        if errors:
+            # Don't replay the unusable response on the next run
+            cache = get_cache()
+            if cache is not None:
+                cache.invalidate(MODEL, prompt, TEMPERATURE)
+            return {}
+
+        results = {}
+        schema = INSIGHTS_SCHEMA if self.mode == "hybrid" else BEHAVIORAL_SCHEMA
+        for person_id in person_ids:
+            entry = parsed.get(person_id)
+            if entry is None:
+                continue
+            entry, entry_errors = validate(entry, schema)
+            if entry_errors:
+                continue
+            if self.mode == "hybrid":
+                results[person_id] = self._hybrid_analysis(person_id, entry)
+            else:
+                results[person_id] = {"person_id": person_id, **entry}
+        return results
 
-        raw_text = response.choices[0].message.content
-        if not raw_text:
-            raise ValueError("❌ Groq response message content is None")
+    def analyze_many(self, person_ids, use_cache: bool = True, token_budget: Optional[int] = None,
+                     max_candidates: int = BATCH_MAX_CANDIDATES, workers: int = 4) -> dict:
+        """Behavioral analysis for many candidates, several per LLM request.
 
-        raw_text = raw_text.strip()
-        # Remove code fences if present
-        if raw_text.startswith("```") and raw_text.endswith("```"):
-            raw_text = raw_text[3:-3].strip()
+        Candidate texts are packed into requests of at most max_candidates and
+        token_budget input tokens (default: the "behavioral.batch" prompt budget minus
+        the instructions); batches run concurrently. Candidates missing or malformed
+        in a batch reply, or whose batch request failed altogether, are retried one by
+        one with analyze(). In "fast" mode no request is made at all. Returns
+        {person_id: analysis} in the order given.
+        """
+        person_ids = list(dict.fromkeys(person_ids))
+        for person_id in person_ids:
+            self._get_candidate_text(person_id)  # unknown ids fail before any request is made
+        if self.mode == "fast":
+            return {person_id: self._local_analysis(person_id) for person_id in person_ids}
+        instruction_tokens = estimate_tokens(self._batch_instructions()) + 50
+        prompt_budget = TOKEN_BUDGETS[BATCH_PROMPT_NAME]
+        if token_budget is None:
+            token_budget = prompt_budget - instruction_tokens
+        prompt_budget = max(prompt_budget, token_budget + instruction_tokens)
 
-        try:
-            analysis = json.loads(raw_text)
-            print("✅ Successfully parsed Groq JSON response")
-        except json.JSONDecodeError:
-            raise ValueError(f"❌ Groq did not return valid JSON:\n{raw_text}")
+        batches = self._pack(person_ids, token_budget, max(1, max_candidates))
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="behavioral") as pool:
+            futures = {pool.submit(self._analyze_batch, batch, prompt_budget, use_cache): batch
+                       for batch in batches if len(batch) > 1}
+            for future, batch in futures.items():
+                try:
+                    results.update(future.result())
+                except Exception as e:
+                    # The batch's candidates fall through to the individual analyze() calls below
+                    print(f"❌ Behavioral batch of {len(batch)} failed: {e}")
 
-        return analysis
+            # Single-candidate batches, plus anyone a batch request failed, left out or got wrong
+            missing = [person_id for person_id in person_ids if person_id not in results]
+            batched = {person_id for batch in futures.values() for person_id in batch}
+            dropped = sum(1 for person_id in missing if person_id in batched)
+            if dropped:
+                print(f"🔧 {dropped} candidate(s) missing from the batched replies; analyzing them individually")
+            for person_id, analysis in zip(missing, pool.map(lambda pid: self.analyze(pid, use_cache=use_cache), missing)):
+                results[person_id] = analysis
+        print(f"✅ Behavioral analysis for {len(person_ids)} candidates in {len(batches)} batch(es)")
+        return {person_id: results[person_id] for person_id in person_ids}
 
 
 if __name__ == "__main__":
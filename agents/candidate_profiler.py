@@ -1,15 +1,27 @@
 import os
 import json
+import hashlib
 from pathlib import Path
 from collections import defaultdict
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from app.llm_client import get_llm_pool
+from app.datastore import load_dataset
+from app.skills import expand_skill, skill_key
+from app.prompts import PII_KEYS, PromptBuilder, compact
+from app.sqlstore import get_db
+from app.report_archive import get_archive
+from app.structured import repair_json
 
 # Load environment variables from .env
 load_dotenv()
 
 class CandidateProfilerAI:
-    def __init__(self, data_dir="data", report_dir="talent-intelligence-report", use_ai=True):
+    # Section values that should never be reused on regeneration
+    FAILED_SECTION_VALUES = (None, "AI analysis error.", "AI disabled, no analysis available.", "No AI response.")
+
+    def __init__(self, data_dir="data", report_dir="talent-intelligence-report", use_ai=True,
+                 batch_scoring=True, score_chunk_size=40):
         print("🔧 Initializing CandidateProfilerAI...")
         self.data_dir = Path(data_dir)
         self.report_dir = Path(report_dir)
@@ -20,49 +32,197 @@ class CandidateProfilerAI:
         self.linkedin = self._load_json("linkedin.json")
         self.github = self._load_json("github.json")
         self.leetcode = self._load_json("leetcode.json")
-        self.jd_data = self._load_json("jd.json")  # Job descriptions
+        self.jd_data = self._load_json("jd.json", key="job_id")  # Job descriptions
         self.use_ai = use_ai
+        self.batch_scoring = batch_scoring  # one request per chunk of skills instead of per skill
+        self.score_chunk_size = score_chunk_size
 
         # Initialize Groq AI client
         if use_ai:
             api_key = os.getenv("GROQ_API_KEY")
             if not api_key:
                 raise ValueError("❌ GROQ_API_KEY not found in environment variables")
-            print("🔧 Initializing Groq client...")
-            self.client = Groq(api_key=api_key)
-            print("✅ Groq client initialized")
+            print("🔧 Connecting to shared Groq client pool...")
+            self.llm = get_llm_pool()
+            print("✅ Groq client ready")
 
-    def _load_json(self, filename):
-        path = self.data_dir / filename
-        if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
+    def _load_json(self, filename, key="person_id"):
+        # Shared indexed dataset (empty if the file is missing)
+        return load_dataset(self.data_dir / filename, key=key)
 
     def _get_candidate(self, dataset, person_id):
-        return next((d for d in dataset if d["person_id"] == person_id), None)
+        return dataset.get(person_id)
 
     def _get_job(self, job_id):
-        return next((j for j in self.jd_data if j["job_id"] == job_id), {})
+        return self.jd_data.get(job_id, {})
 
-    def _ai_analyze(self, prompt, temp=0.2):
-        """Utility to call Groq for text output"""
+    def _ai_analyze(self, prompt, temp=0.2, use_cache=True, on_token=None, call_site="unknown", json_mode=False):
+        """Utility to call Groq for text output (streamed to on_token(chunk) when given)"""
         if not self.use_ai:
             return "AI disabled, no analysis available."
         try:
-            response = self.client.chat.completions.create(
-                model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temp
-            )
-            content = response.choices[0].message.content
+            if on_token is not None:
+                parts = []
+                for chunk in self.llm.stream(
+                    prompt,
+                    model="meta-llama/llama-4-scout-17b-16e-instruct",
+                    temperature=temp,
+                    use_cache=use_cache,
+                    agent="profiler",
+                    call_site=call_site,
+                ):
+                    parts.append(chunk)
+                    on_token(chunk)
+                content = "".join(parts)
+            else:
+                content = self.llm.complete(
+                    prompt,
+                    model="meta-llama/llama-4-scout-17b-16e-instruct",
+                    temperature=temp,
+                    use_cache=use_cache,
+                    agent="profiler",
+                    call_site=call_site,
+                    json_mode=json_mode,
+                )
             return content.strip() if content is not None else "No AI response."
         except Exception as e:
             print(f"❌ AI analysis failed: {e}")
             return "AI analysis error."
 
-    def generate_tir(self, person_id, job_id=None):
-        """Generate Talent Intelligence Report for a candidate (optionally with job match)"""
+    def _score_skill(self, skill, ev, use_cache=True):
+        """Score a single skill with its own LLM call"""
+        confidence = self._ai_analyze(
+            f"Rate proficiency confidence (0-1) for skill '{skill}' "
+            f"given evidence {ev}. Only output a number.",
+            temp=0,
+            use_cache=use_cache,
+            call_site="skill-score",
+        )
+        try:
+            return float(confidence)
+        except:
+            return 0.5
+
+    def _parse_score_map(self, raw):
+        """Pull the skill -> confidence JSON object out of a batched scoring response"""
+        try:
+            parsed = repair_json(raw)
+        except ValueError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def _score_skills_batched(self, evidence_map, use_cache=True):
+        """Score all skills in chunked requests, falling back per skill only for unparseable entries"""
+        skills = list(evidence_map.keys())
+        scores = {}
+        for start in range(0, len(skills), self.score_chunk_size):
+            chunk = skills[start:start + self.score_chunk_size]
+            evidence = {skill: evidence_map[skill] for skill in chunk}
+            raw = self._ai_analyze(
+                "Rate proficiency confidence (0-1) for each skill below, given how many times it "
+                "appears in the candidate's resume, LinkedIn, GitHub and LeetCode data.\n"
+                f"Evidence: {compact(evidence)}\n"
+                "Return ONLY a JSON object mapping every skill name exactly as given to a number between 0 and 1.",
+                temp=0,
+                use_cache=use_cache,
+                call_site="skill-score-batch",
+                json_mode=True,
+            )
+            parsed = self._parse_score_map(raw)
+            for skill in chunk:
+                try:
+                    scores[skill] = min(max(float(parsed[skill]), 0.0), 1.0)
+                except (KeyError, TypeError, ValueError):
+                    scores[skill] = self._score_skill(skill, evidence_map[skill], use_cache=use_cache)
+        return scores
+
+    def _build_skills_report(self, evidence_map, use_cache=True):
+        """AI confidence scoring for every skill in the evidence map"""
+        if self.batch_scoring:
+            scores = self._score_skills_batched(evidence_map, use_cache=use_cache)
+        else:
+            scores = {skill: self._score_skill(skill, ev, use_cache=use_cache) for skill, ev in evidence_map.items()}
+        return [{"skill": skill, "confidence": round(scores[skill], 2)} for skill in evidence_map]
+
+    def _compare_with_job(self, skills_report, work_history, resume, job, use_cache=True):
+        """AI-based job match analysis (None when there is no job)"""
+        if not job:
+            return None
+        prompt = (
+            PromptBuilder("profiler.job_comparison")
+            .text("Compare candidate's skills and experience with the job description.")
+            .data("Candidate Skills", skills_report, priority=90)
+            .data("Candidate Work History", work_history, priority=70)
+            .data("Candidate Projects", resume.get("projects", []), priority=60)
+            .data("Job Description", job, priority=100)
+            .text(
+                "Provide:\n"
+                "1. Overall match percentage\n"
+                "2. Key strengths\n"
+                "3. Gaps to be addressed\n"
+                "4. Role fit analysis in 2-3 sentences."
+            )
+            .build()
+        )
+        return self._ai_analyze(prompt, temp=0.4, use_cache=use_cache, call_site="job-comparison")
+
+    def _career_summary_prompt(self, work_history, resume, yoe):
+        return (
+            PromptBuilder("profiler.career_summary")
+            .text("Summarize candidate's career in 2-3 recruiter-style sentences.")
+            .data("Work History", work_history, priority=90)
+            .data("Projects", resume.get("projects", []), priority=60)
+            .text(f"YOE: {yoe}")
+            .build()
+        )
+
+    def _insights_prompt(self, resume, linkedin, github, leetcode, work_history, yoe, job):
+        # Experience and LinkedIn jobs are already in Work History, so they aren't sent twice
+        return (
+            PromptBuilder("profiler.insights")
+            .text("Analyze candidate strengths, risks, and potential role fit.")
+            .data("Resume", resume, priority=80, drop_keys=PII_KEYS | {"experience", "person_id"})
+            .data("LinkedIn", linkedin, priority=60, drop_keys=PII_KEYS | {"jobs", "person_id"})
+            .data("GitHub", github, priority=40, drop_keys=PII_KEYS | {"person_id"})
+            .data("LeetCode", leetcode, priority=30, drop_keys=PII_KEYS | {"person_id"})
+            .data("Work History", work_history, priority=70)
+            .text(f"YOE: {yoe}")
+            .data("Job Description", job, priority=90)
+            .build()
+        )
+
+    def _report_path(self, person_id, job_id):
+        return self.report_dir / f"TIR_{person_id}_{job_id if job_id else 'nojob'}.json"
+
+    def _load_previous_report(self, path, person_id=None, job_id=None):
+        db = get_db()
+        if db is not None:
+            return db.load_report("tir", person_id, job_id) or {}
+        archive = get_archive()
+        if archive is not None:
+            return archive.get("tir", person_id, job_id, {})
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _fingerprint(*inputs):
+        """Content hash of a section's inputs"""
+        raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def generate_tir(self, person_id, job_id=None, use_cache=True, parallel=False, on_token=None, incremental=True):
+        """Generate Talent Intelligence Report for a candidate (optionally with job match).
+
+        parallel=True runs the independent LLM sections concurrently. on_token(section, chunk)
+        receives the career summary and insights as they are streamed. With incremental=True,
+        sections whose input fingerprints match the saved report are reused instead of
+        re-queried (use_cache=False always regenerates).
+        """
         resume = self._get_candidate(self.resume, person_id)
         linkedin = self._get_candidate(self.linkedin, person_id)
         github = self._get_candidate(self.github, person_id)
@@ -72,80 +232,96 @@ class CandidateProfilerAI:
         if not resume:
             return {"error": f"No resume data found for {person_id}"}
 
-        # --- Build Evidence Map ---
+        # --- Build Evidence Map (keyed on canonical skill names, so aliases share one entry) ---
         evidence_map = defaultdict(lambda: {"resume": 0, "linkedin": 0, "github": 0, "leetcode": 0})
+        display_names = {}
+
+        def _add_evidence(skill, source):
+            for name in expand_skill(skill):
+                name = display_names.setdefault(skill_key(name), name)
+                evidence_map[name][source] += 1
+
         for s in resume.get("skills", []):
-            evidence_map[s]["resume"] += 1
+            _add_evidence(s, "resume")
         if linkedin:
             for s in linkedin.get("skills", []):
-                evidence_map[s]["linkedin"] += 1
+                _add_evidence(s, "linkedin")
         if github and github.get("top_languages"):
             for s in github["top_languages"]:
-                evidence_map[s]["github"] += 1
+                _add_evidence(s, "github")
         if leetcode and leetcode.get("strengths"):
             for s in leetcode["strengths"]:
-                evidence_map[s]["leetcode"] += 1
-
-        # --- Skills Report (AI confidence scoring) ---
-        skills_report = []
-        for skill, ev in evidence_map.items():
-            confidence = self._ai_analyze(
-                f"Rate proficiency confidence (0-1) for skill '{skill}' "
-                f"given evidence {ev}. Only output a number.",
-                temp=0
-            )
-            try:
-                confidence = float(confidence)
-            except:
-                confidence = 0.5
-            skills_report.append({"skill": skill, "confidence": round(confidence, 2)})
+                _add_evidence(s, "leetcode")
 
         # --- Work History & YOE ---
-        work_history = resume.get("experience", [])
+        # Copy so LinkedIn jobs aren't appended to the shared resume entry
+        work_history = list(resume.get("experience", []))
         if linkedin and linkedin.get("jobs"):
             work_history += linkedin["jobs"]
         yoe = resume.get("YOE", None)
 
-        # --- AI-Based Job Match Analysis ---
-        ai_job_comparison = None
-        if job:
-            ai_job_comparison = self._ai_analyze(
-                f"""
-                Compare candidate's skills and experience with the job description.
-                Candidate Skills: {json.dumps(skills_report, indent=2)}
-                Candidate Work History: {json.dumps(work_history, indent=2)}
-                Candidate Projects: {json.dumps(resume.get("projects", []), indent=2)}
-                Job Description: {json.dumps(job, indent=2)}
-                Provide:
-                1. Overall match percentage
-                2. Key strengths
-                3. Gaps to be addressed
-                4. Role fit analysis in 2-3 sentences.
-                """,
-                temp=0.4
+        career_prompt = self._career_summary_prompt(work_history, resume, yoe)
+        insights_prompt = self._insights_prompt(resume, linkedin, github, leetcode, work_history, yoe, job)
+
+        # --- Section Fingerprints (reuse sections whose inputs are unchanged) ---
+        out_path = self._report_path(person_id, job_id)
+        previous = self._load_previous_report(out_path, person_id, job_id) if incremental and use_cache else {}
+        previous_fingerprints = previous.get("section_fingerprints", {})
+        fingerprints = {
+            "skills_analysis": self._fingerprint(evidence_map),
+            "career_summary": self._fingerprint(work_history, resume.get("projects", []), yoe),
+            "ai_insights": self._fingerprint(resume, linkedin, github, leetcode, work_history, yoe, job),
+        }
+
+        def _stream_to(section):
+            return (lambda chunk: on_token(section, chunk)) if on_token else None
+
+        def _section(section, compute):
+            value = previous.get(section)
+            if previous_fingerprints.get(section) == fingerprints[section] and value not in self.FAILED_SECTION_VALUES:
+                print(f"♻️ Reusing unchanged {section} for {person_id}")
+                if on_token and isinstance(value, str):
+                    on_token(section, value)
+                return value
+            return compute()
+
+        def _skills_and_job_comparison():
+            skills = _section("skills_analysis", lambda: self._build_skills_report(evidence_map, use_cache))
+            # Job comparison depends on the skill scores, so it's fingerprinted after them
+            fingerprints["ai_job_comparison"] = self._fingerprint(
+                skills, work_history, resume.get("projects", []), job
             )
+            comparison = _section(
+                "ai_job_comparison",
+                lambda: self._compare_with_job(skills, work_history, resume, job, use_cache)
+            )
+            return skills, comparison
 
-        # --- Career Summary ---
-        career_summary = self._ai_analyze(
-            f"Summarize candidate's career in 2-3 recruiter-style sentences.\n"
-            f"Work History: {json.dumps(work_history, indent=2)}\n"
-            f"Projects: {json.dumps(resume.get('projects', []), indent=2)}\n"
-            f"YOE: {yoe}",
-            temp=0.3
-        )
+        def _career_summary():
+            return _section("career_summary", lambda: self._ai_analyze(
+                career_prompt, temp=0.3, use_cache=use_cache, on_token=_stream_to("career_summary"),
+                call_site="career-summary",
+            ))
 
-        # --- AI Insights ---
-        ai_insights = self._ai_analyze(
-            f"""Analyze candidate strengths, risks, and potential role fit. 
-            Resume: {json.dumps(resume, indent=2)}
-            LinkedIn: {json.dumps(linkedin, indent=2)}
-            GitHub: {json.dumps(github, indent=2)}
-            LeetCode: {json.dumps(leetcode, indent=2)}
-            Work History: {json.dumps(work_history, indent=2)}
-            YOE: {yoe}
-            Job Description: {json.dumps(job, indent=2)}""",
-            temp=0.4
-        )
+        def _ai_insights():
+            return _section("ai_insights", lambda: self._ai_analyze(
+                insights_prompt, temp=0.4, use_cache=use_cache, on_token=_stream_to("ai_insights"),
+                call_site="insights",
+            ))
+
+        if parallel:
+            # Career summary and insights don't depend on skill scores, so they
+            # run alongside the skills -> job comparison chain
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                career_future = pool.submit(_career_summary)
+                insights_future = pool.submit(_ai_insights)
+                skills_report, ai_job_comparison = _skills_and_job_comparison()
+                career_summary = career_future.result()
+                ai_insights = insights_future.result()
+        else:
+            skills_report, ai_job_comparison = _skills_and_job_comparison()
+            career_summary = _career_summary()
+            ai_insights = _ai_insights()
 
         # --- Final Structured Report ---
         tir = {
@@ -169,13 +345,21 @@ class CandidateProfilerAI:
             "career_summary": career_summary,
             "ai_job_comparison": ai_job_comparison,  # NEW
             "ai_insights": ai_insights,
-            "job_info": job
+            "job_info": job,
+            "section_fingerprints": fingerprints
         }
 
-        # Save JSON
-        out_path = self.report_dir / f"TIR_{person_id}_{job_id if job_id else 'nojob'}.json"
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(tir, f, indent=2)
+        # Save JSON (or append to the report archive)
+        archive = get_archive()
+        if archive is not None:
+            archive.put("tir", person_id, job_id, tir)
+            out_path = archive.directory
+        else:
+            with open(out_path, "w", encoding="utf-8") as f:
+                json.dump(tir, f, indent=2)
+        db = get_db()
+        if db is not None:
+            db.save_report("tir", person_id, job_id, tir)
         print(f"✅ Talent Intelligence Report saved at {out_path}")
 
         return tir
@@ -3,8 +3,20 @@ import json
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
-from groq import Groq
-from statistics import median
+from app.llm_client import get_llm_pool
+from app.datastore import data_exists, load_dataset, load_document, resolve_data_path
+from app.prompts import PromptBuilder
+from app.market_index import LEVEL_DESCRIPTIONS, get_market_index
+from app.structured import StructuredOutputError, complete_structured
+
+MARKET_SUMMARY_SCHEMA = {
+    "type": "object",
+    "required": ["summary", "recommendations"],
+    "properties": {
+        "summary": {"type": "string"},
+        "recommendations": {"type": "array"},
+    },
+}
 
 
 class MarketOptimizer:
@@ -18,60 +30,38 @@ class MarketOptimizer:
             jd_data_path = Path(__file__).parent.parent / "data" / "jd.json"
 
         self.market_data_path = Path(market_data_path).resolve()
-        self.jd_data_path = Path(jd_data_path).resolve()
+        self.jd_data_path = resolve_data_path(jd_data_path)  # .json or .ndjson
 
-        if not self.market_data_path.exists():
+        if not data_exists(self.market_data_path):
             raise FileNotFoundError(f"❌ Market intelligence file not found: {self.market_data_path}")
-        if not self.jd_data_path.exists():
+        if not data_exists(self.jd_data_path):
             raise FileNotFoundError(f"❌ Job description file not found: {self.jd_data_path}")
 
-        with open(self.market_data_path, "r", encoding="utf-8") as f:
-            self.market_data = json.load(f)
-        with open(self.jd_data_path, "r", encoding="utf-8") as f:
-            self.jd_data = json.load(f)
+        self.market_data = load_document(self.market_data_path)
+        self.jd_data = load_dataset(self.jd_data_path, key="job_id")
 
         self.roles = self.market_data.get("roles", [])
+        self.index = get_market_index(self.market_data)  # (role, location, seniority) -> precomputed stats
 
         # Groq client
         load_dotenv()
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("❌ Missing GROQ_API_KEY in .env")
-        self.client = Groq(api_key=api_key)
+        self.llm = get_llm_pool()  # shared, rate-limited client
 
     # ---------- helper ----------
-    def _get_job_info(self, job_id: str) -> dict:
-        return next((j for j in self.jd_data if j.get("job_id") == job_id), {})
+    def job_info(self, job_id: str) -> dict:
+        """The JD record ({} if unknown), e.g. for keying per-JD artifacts on its contents."""
+        return self.jd_data.get(job_id, {})
 
     def _filter_market(self, role: str, location: str, seniority: str):
-        return [
-            r for r in self.roles
-            if r.get("role", "").lower() == role.lower()
-            and r.get("location", "").lower() == location.lower()
-            and r.get("seniority", "").lower() == seniority.lower()
-        ]
-
-    def _comp_benchmarks(self, rows):
-        samples = []
-        for r in rows:
-            samples.extend([float(x) for x in r.get("salary_samples_inr_lpa", [])])
-        if not samples:
-            return {"p25": 0, "median": 0, "p75": 0, "sample_size": 0}
-        samples.sort()
-
-        def pct(values, p): 
-            return values[int(p * (len(values) - 1))]
-
-        return {
-            "p25": pct(samples, 0.25),
-            "median": median(samples),
-            "p75": pct(samples, 0.75),
-            "sample_size": len(samples)
-        }
+        cell, _ = self.index.query(role, location, seniority)
+        return cell["rows"] if cell else []
 
     # ---------- main ----------
-    def analyze(self, job_id: str) -> dict:
-        job = self._get_job_info(job_id)
+    def analyze(self, job_id: str, use_cache: bool = True) -> dict:
+        job = self.job_info(job_id)
         if not job:
             raise ValueError(f"❌ job_id {job_id} not found in jd.json")
 
@@ -79,8 +69,9 @@ class MarketOptimizer:
         location = job.get("location", "")
         seniority = job.get("seniority", "Mid")
 
-        rows = self._filter_market(role, location, seniority)
-        if not rows:
+        # Narrowest rollup with data: exact cell, then any location, any seniority, role only
+        cell, level = self.index.query(role, location, seniority)
+        if not cell:
             return {
                 "job_id": job_id, 
                 "role": role, 
@@ -89,42 +80,32 @@ class MarketOptimizer:
                 "error": "No market data found"
             }
 
-        # Compensation
-        comp = self._comp_benchmarks(rows)
-
-        # Talent trends
-        total_openings = sum(r.get("openings", 0) for r in rows)
-        avg_tsi = sum(r.get("talent_supply_index", 0) for r in rows) / len(rows)
-        hotspots = sorted(
-            [{"location": r["location"], "openings": r["openings"]} for r in rows],
-            key=lambda x: x["openings"], reverse=True
-        )
-
-        # Recommended channels
-        channel_scores = {}
-        for r in rows:
-            for ch, sc in r.get("channels", {}).items():
-                channel_scores.setdefault(ch, []).append(sc)
-        ranked_channels = sorted(
-            [{"channel": ch, "effectiveness": sum(v) / len(v)} for ch, v in channel_scores.items()],
-            key=lambda x: x["effectiveness"], reverse=True
-        )
+        # Compensation, talent trends and channel rankings are precomputed per market cell
+        comp = dict(cell["compensation"])
+        total_openings = cell["total_openings"]
+        avg_tsi = cell["avg_talent_supply_index"]
+        hotspots = [dict(h) for h in cell["hotspots"]]
+        ranked_channels = [dict(c) for c in cell["channels"]]
 
         # ---------- Groq summary ----------
-        prompt = f"""
-You are a Market Intelligence & Talent Sourcing expert.
+        prompt = (
+            PromptBuilder("market")
+            .text(f"""You are a Market Intelligence & Talent Sourcing expert.
 
 Job role: {role}
 Location: {location}
 Seniority: {seniority}
+Market data scope: {LEVEL_DESCRIPTIONS[level]}
 
 Market Data:
-- Compensation Benchmarks (LPA): p25 {comp['p25']}, median {comp['median']}, p75 {comp['p75']}
+- Compensation Benchmarks (LPA): p10 {comp['p10']}, p25 {comp['p25']}, median {comp['median']}, p75 {comp['p75']}, p90 {comp['p90']}
 - Total openings: {total_openings}
-- Avg Talent Supply Index: {avg_tsi:.2f}
-- Hotspot locations: {hotspots}
-- Recommended sourcing channels: {ranked_channels}
-
+- Avg Talent Supply Index: {avg_tsi:.2f}""")
+            .data("- Hotspot locations", hotspots, priority=40)
+            .data("- Recommended sourcing channels", [
+                {"channel": c["channel"], "effectiveness": round(c["effectiveness"], 2)} for c in ranked_channels
+            ], priority=60)
+            .text(f"""
 Task:
 - Provide a high-level **market summary** with recommendations.
 - Highlight pay competitiveness, talent availability, and top sourcing channels.
@@ -137,28 +118,33 @@ JSON schema:
   "summary": "...",
   "recommendations": ["...", "..."]
 }}
-"""
-        response = self.client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
+""")
+            .build()
         )
-        raw = (response.choices[0].message.content or "").strip()
-
-        # 🔧 Fix: strip code fences if Groq wrapped response
-        if raw.startswith("```"):
-            raw = raw.split("```json")[-1].split("```")[0].strip()
-
+        degraded = False
         try:
-            ai_summary = json.loads(raw)
-        except Exception:
-            ai_summary = {"job_id": job_id, "summary": raw, "recommendations": []}
-
-        return {
+            ai_summary = complete_structured(
+                self.llm,
+                prompt,
+                MARKET_SUMMARY_SCHEMA,
+                model="meta-llama/llama-4-scout-17b-16e-instruct",
+                temperature=0.7,
+                use_cache=use_cache,
+                agent="market",
+                call_site="market-summary",
+            )
+        except StructuredOutputError as e:
+            # The computed market statistics are still worth returning; keep the prose as the summary
+            ai_summary = {"job_id": job_id, "summary": e.raw, "recommendations": []}
+            degraded = True
+
+        result = {
             "job_id": job_id,
             "role": role,
             "location": location,
             "seniority": seniority,
+            "market_level": level,
+            "market_scope": LEVEL_DESCRIPTIONS[level],
             "compensation": comp,
             "talent_trends": {
                 "total_openings": total_openings,
@@ -169,6 +155,9 @@ JSON schema:
             "ai_summary": ai_summary,
             "updated_at": self.market_data.get("updated_at")
         }
+        if degraded:
+            result["ai_summary_degraded"] = True  # raw prose fallback; not worth storing as an artifact
+        return result
 
 
 if __name__ == "__main__":
@@ -1,8 +1,77 @@
+import re
+import json
+import queue
+import threading
 import streamlit as st
-from app.orchestrator import list_profiles, list_jds, run_orch
+from app.orchestrator import run_orch
+from app.ui_cache import data_version, cached_profiles, cached_jds, cached_agents, cached_report, remember_report
 
 st.set_page_config(page_title="Meta Recruit AI", page_icon="🤖", layout="centered")
 
+# Sections streamed token by token while the agents run
+STREAM_SECTIONS = {
+    "career_summary": "Career Summary",
+    "ai_insights": "AI Insights",
+    "behavioral_analysis": "Behavioral Summary",
+}
+
+def partial_json_string(raw, key):
+    """Best-effort value of a string field from a JSON document that is still streaming in."""
+    match = re.search(rf'"{key}"\s*:\s*"((?:[^"\\]|\\.)*)', raw)
+    if not match:
+        return ""
+    value = match.group(1).rstrip("\\")
+    try:
+        return json.loads(f'"{value}"')
+    except json.JSONDecodeError:
+        return value
+
+def run_orch_streaming(person_id, job_id, agents=None):
+    """Run the orchestration in a worker thread and render streamed sections as they arrive."""
+    placeholders = {}
+    for section, label in STREAM_SECTIONS.items():
+        st.markdown(f"**{label}**")
+        placeholders[section] = st.empty()
+        placeholders[section].caption("Waiting for first tokens...")
+
+    tokens = queue.Queue()
+    outcome = {}
+
+    def _worker():
+        try:
+            outcome["report"] = run_orch(
+                person_id=person_id,
+                job_id=job_id,
+                concurrent=True,
+                on_token=lambda section, chunk: tokens.put((section, chunk)),
+                agents=agents
+            )
+        except Exception as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=_worker, daemon=True)
+    worker.start()
+
+    # Streamlit elements must be updated from the script thread, so the agents only enqueue chunks
+    buffers = {section: "" for section in STREAM_SECTIONS}
+    while worker.is_alive() or not tokens.empty():
+        try:
+            section, chunk = tokens.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        buffers[section] += chunk
+        if section == "behavioral_analysis":
+            text = partial_json_string(buffers[section], "high_level_insights")
+        else:
+            text = buffers[section]
+        if text:
+            placeholders[section].markdown(text)
+    worker.join()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["report"]
+
 # --- Header ---
 st.title("Meta Recruit AI – Multi-Agent Recruitment System")
 st.markdown("""
@@ -15,9 +84,10 @@ It integrates four core agents:
 ---
 """)
 
-# --- Load Profiles & JDs ---
-profiles = list_profiles()
-jds = list_jds()
+# --- Load Profiles & JDs (cached until a data file changes) ---
+version = data_version()
+profiles = cached_profiles(version)
+jds = cached_jds(version)
 
 if not profiles:
     st.error("No candidate profiles found in `data/resume.json`.")
@@ -47,22 +117,37 @@ else:
         if st.session_state["selected_job"] in jds else 0
     )
 
+    stream_results = st.toggle("Stream results as they are generated", value=True)
+    reuse_results = st.toggle("Reuse earlier results for this pair (until the data changes)", value=True)
+
     # --- Action Buttons ---
     col1, col2 = st.columns([1, 1])
     with col1:
-        if st.button("Run Analysis", use_container_width=True):
-            with st.spinner(f"Running analysis for {st.session_state['selected_profile']} against {st.session_state['selected_job']}..."):
-                st.session_state["report"] = run_orch(
-                    person_id=st.session_state["selected_profile"],
-                    job_id=st.session_state["selected_job"]
-                )
-            # Temporary toast notification instead of static success
-            st.toast("✅ Orchestration done!", icon="✅")
+        run_clicked = st.button("Run Analysis", use_container_width=True)
     with col2:
         if st.button("Clear Results", type="secondary", use_container_width=True):
             st.session_state["report"] = None
             st.success("Results cleared.")
 
+    if run_clicked:
+        person_id = st.session_state["selected_profile"]
+        job_id = st.session_state["selected_job"]
+        report = cached_report(person_id, job_id, version) if reuse_results else None
+        if report is not None:
+            st.session_state["report"] = report
+            st.toast("♻️ Loaded the earlier analysis for this pair", icon="♻️")
+        else:
+            agents = cached_agents(version)
+            if stream_results:
+                report = run_orch_streaming(person_id, job_id, agents)
+            else:
+                with st.spinner(f"Running analysis for {person_id} against {job_id}..."):
+                    report = run_orch(person_id=person_id, job_id=job_id, concurrent=True, agents=agents)
+            remember_report(person_id, job_id, version, report)
+            st.session_state["report"] = report
+            # Temporary toast notification instead of static success
+            st.toast("✅ Orchestration done!", icon="✅")
+
     # --- Navigation (only if report exists) ---
     if st.session_state.get("report"):
         st.markdown("### Next Steps")
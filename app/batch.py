@@ -0,0 +1,133 @@
+"""Score every candidate against every job description on a bounded worker pool.
+
+Usage (from the repo root):
+    python -m app.batch --workers 4
+    python -m app.batch --jobs JD001 JD002 --force
+    python -m app.batch --stream          # start immediately, never materialize the pair list
+"""
+import os
+import time
+import argparse
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app.datastore import get_store
+from app.job_matcher import JobMatcher
+from app.orchestrator import DATA_DIR, run_orch, report_path
+from app.report_archive import get_archive
+
+
+def is_up_to_date(person_id: str, job_id: str, version: float) -> bool:
+    archive = get_archive()
+    if archive is not None:
+        saved_at = archive.saved_at("orchestrated", person_id, job_id)
+        return saved_at is not None and saved_at >= version
+    path = report_path(person_id, job_id)
+    return os.path.exists(path) and os.path.getmtime(path) >= version
+
+
+def iter_pairs(person_ids=None, job_ids=None, force=False, shortlist=None, skipped=None):
+    """Lazily yield the (person, job) pairs to run, skipping those with an up-to-date report
+    unless force=True. Skipped pairs are appended to the `skipped` list when one is given.
+
+    shortlist=K keeps only each JD's top-K candidates by the local JobMatcher score,
+    so the LLM pipeline runs on the shortlist instead of the full matrix.
+    """
+    store = get_store(DATA_DIR)
+    person_ids = person_ids or store.person_ids()
+    job_ids = job_ids or store.job_ids()
+    version = store.data_version()
+
+    candidates_per_job = {job_id: person_ids for job_id in job_ids}
+    if shortlist:
+        allowed = set(person_ids)
+        ranked = JobMatcher(store).score_jobs(job_ids, top_k=len(store.person_ids()))
+        candidates_per_job = {
+            job_id: [e["person_id"] for e in ranked[job_id] if e["person_id"] in allowed][:shortlist]
+            for job_id in job_ids
+        }
+
+    for job_id in job_ids:
+        for person_id in candidates_per_job[job_id]:
+            if not force and is_up_to_date(person_id, job_id, version):
+                if skipped is not None:
+                    skipped.append((person_id, job_id))
+                continue
+            yield person_id, job_id
+
+
+def build_pairs(person_ids=None, job_ids=None, force=False, shortlist=None):
+    """All pairs to run as a list, plus how many were skipped as up to date."""
+    skipped = []
+    pairs = list(iter_pairs(person_ids, job_ids, force=force, shortlist=shortlist, skipped=skipped))
+    return pairs, len(skipped)
+
+
+def run_batch(pairs, workers=4, use_cache=True, concurrent_agents=False):
+    """Run run_orch over pairs with at most `workers` pairs in flight; returns per-pair failures.
+
+    `pairs` may be any iterable (e.g. iter_pairs()); it is consumed as workers free up,
+    so memory stays bounded however many pairs there are.
+    """
+    total = len(pairs) if hasattr(pairs, "__len__") else None
+    pairs = iter(pairs)
+    done = 0
+    failures = {}
+    started = time.monotonic()
+
+    def _run(pair):
+        person_id, job_id = pair
+        run_orch(person_id, job_id, use_cache=use_cache, concurrent=concurrent_agents)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        # Keep a small window of submitted pairs instead of queueing the whole matrix
+        futures = {pool.submit(_run, pair): pair for pair in islice(pairs, workers * 2)}
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                person_id, job_id = futures.pop(future)
+                try:
+                    future.result()
+                    status = "✅"
+                except Exception as e:
+                    failures[(person_id, job_id)] = str(e)
+                    status = f"❌ {e}"
+                done += 1
+                elapsed = time.monotonic() - started
+                rate = done / elapsed * 60 if elapsed else 0.0
+                print(f"[{done}/{total or '?'}] {person_id} x {job_id} {status} | {rate:.1f} pairs/min")
+            for pair in islice(pairs, len(finished)):
+                futures[pool.submit(_run, pair)] = pair
+
+    elapsed = time.monotonic() - started
+    print(
+        f"\n🏁 Batch finished: {done - len(failures)}/{done} pairs in {elapsed:.1f}s "
+        f"({(done / elapsed * 60) if elapsed else 0.0:.1f} pairs/min), {len(failures)} failed"
+    )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the full candidate x job orchestration matrix.")
+    parser.add_argument("--workers", type=int, default=4, help="Pairs processed in parallel")
+    parser.add_argument("--persons", nargs="*", help="Only these person_ids (default: all in resume.json)")
+    parser.add_argument("--jobs", nargs="*", help="Only these job_ids (default: all in jd.json)")
+    parser.add_argument("--shortlist", type=int, help="Only run each JD's top-K candidates by local match score")
+    parser.add_argument("--force", action="store_true", help="Re-run pairs whose report is already up to date")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    parser.add_argument("--concurrent-agents", action="store_true", help="Also run the four agents of each pair in parallel")
+    parser.add_argument("--stream", action="store_true", help="Feed pairs lazily instead of listing them all up front")
+    args = parser.parse_args()
+
+    if args.stream:
+        pairs = iter_pairs(args.persons, args.jobs, force=args.force, shortlist=args.shortlist)
+        print("📋 Streaming pairs (up-to-date reports are skipped as they come)")
+    else:
+        pairs, skipped = build_pairs(args.persons, args.jobs, force=args.force, shortlist=args.shortlist)
+        print(f"📋 {len(pairs)} pairs to run, {skipped} already up to date")
+        if not pairs:
+            return
+    run_batch(pairs, workers=args.workers, use_cache=not args.no_cache, concurrent_agents=args.concurrent_agents)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Local behavioral signals from candidate_text.json: keywords, themes and evidence, no LLM.
+
+Usage (from the repo root):
+    python -m app.behavior_signals CAND001
+    python -m app.behavior_signals --all --top 5
+
+A precompiled cue lexicon (matched once per distinct word of the corpus) tags each
+sentence with collaboration / problem-solving / communication themes, and TF-IDF over
+the whole corpus ranks each candidate's keywords. Everything is computed for all candidates at once with numpy and cached
+per dataset, so a lookup afterwards is a dict access.
+"""
+import re
+import json
+import argparse
+import threading
+import numpy as np
+from typing import Optional
+
+DIMENSIONS = ("collaboration", "problem_solving", "communication")
+
+# dimension -> theme -> cue patterns, each matched against a whole lowercased word
+LEXICON = {
+    "collaboration": {
+        "teamwork": [r"collaborat\w*", r"team\w*", r"together", r"pair(?:ed|ing)?", r"partner\w*", r"cooperat\w*",
+                     r"coordinat\w*"],
+        "mentoring": [r"mentor\w*", r"coach\w*", r"onboard\w*", r"junior\w*", r"teach\w*", r"taught", r"guid(?:e|ed|ing)"],
+        "cross-functional work": [r"cross-functional", r"stakeholders?", r"client\w*", r"interdisciplinary"],
+    },
+    "problem_solving": {
+        "debugging": [r"debug\w*", r"troubleshoot\w*", r"root-caus\w*", r"resolv\w*", r"fix\w*", r"blockers?",
+                      r"issues?", r"bugs?"],
+        "analytical thinking": [r"analy[sz]\w*", r"brainstorm\w*", r"problem-solving", r"solutions?", r"investigat\w*",
+                                r"experiment\w*", r"research\w*"],
+        "optimization": [r"optimi[sz]\w*", r"improv\w*", r"scal(?:e|ed|ing|able|ability)", r"performance",
+                         r"automat\w*", r"latency", r"efficien\w*", r"refactor\w*"],
+    },
+    "communication": {
+        "documentation": [r"document\w*", r"wr(?:ite|ote|iting|itten)", r"write-?ups?", r"reports?", r"specs?"],
+        "presenting": [r"present\w*", r"demo\w*", r"explain\w*", r"talks?", r"workshops?"],
+        "stakeholder updates": [r"communicat\w*", r"updates?", r"progress", r"feedback", r"clarif\w*", r"facilitat\w*",
+                                r"listen\w*", r"align\w*"],
+    },
+}
+
+# Compiled once; applied to each distinct word of the corpus, not to every occurrence
+THEMES = [(dimension, theme) for dimension, themes in LEXICON.items() for theme in themes]
+_THEME_PATTERNS = [re.compile("|".join(LEXICON[d][t])) for d, t in THEMES]
+_THEME_DIMENSION = np.array([DIMENSIONS.index(d) for d, _ in THEMES])
+
+_TOKEN = re.compile(r"[a-z][a-z+#-]*[a-z+#]")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset({
+    "a", "about", "across", "after", "all", "also", "always", "am", "an", "and", "any", "are", "as", "at", "be",
+    "been", "being", "between", "both", "but", "by", "can", "could", "did", "do", "does", "doing", "during", "each",
+    "enjoy", "ensure", "ensuring", "every", "few", "for", "from", "had", "has", "have", "having", "he", "her", "him",
+    "his", "how", "if", "in", "into", "is", "it", "its", "just", "last", "like", "made", "make", "making", "many",
+    "me", "more", "most", "much", "multiple", "my", "myself", "new", "not", "of", "often", "on", "one", "only", "or",
+    "other", "our", "out", "over", "own", "same", "she", "should", "so", "some", "such", "sure", "than", "that",
+    "the", "their", "them", "then", "there", "these", "they", "this", "those", "through", "to", "too", "under",
+    "up", "us", "use", "used", "using", "very", "was", "we", "were", "what", "when", "where", "which", "while",
+    "who", "why", "will", "with", "within", "would", "you", "your", "worked", "work", "working", "thrive",
+})
+
+KEYWORDS_PER_CANDIDATE = 8
+EVIDENCE_PER_DIMENSION = 2
+CUE_BOOST = 2.0  # lexicon cue words rank above other distinctive words
+
+BIAS_MITIGATION_GUIDELINES = [
+    "Judge behaviors described in the text, not writing style, fluency or tone.",
+    "Ignore names, gender, age, nationality and other demographic signals.",
+    "Score every candidate against the same collaboration, problem-solving and communication rubric.",
+    "Treat missing evidence as unknown rather than negative.",
+]
+
+
+def entry_text(entry: Optional[dict]) -> Optional[str]:
+    """A candidate_text.json record's text ('text', or 'texts' joined); None if it has neither."""
+    if not entry:
+        return None
+    if "text" in entry:
+        return entry["text"]
+    if "texts" in entry:
+        return " ".join(entry["texts"])
+    return None
+
+
+def _top_k_per_group(groups: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores within each group (groups sorted ascending, ties by position)."""
+    order = np.lexsort((np.arange(len(scores)), -scores, groups))
+    if not len(order):
+        return order
+    starts = np.r_[0, np.flatnonzero(np.diff(groups[order])) + 1]
+    first = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return order[np.arange(len(order)) - first < k]
+
+
+class BehaviorSignals:
+    """Keywords, themes and evidence snippets of every candidate, computed in one pass."""
+
+    def __init__(self, texts: dict):
+        self.person_ids = list(texts)
+        n = len(self.person_ids)
+
+        # ---------- tokens ----------
+        # Every word occurrence as (vocabulary id, sentence); sentences know their candidate
+        vocab, sentences, sentence_doc, term, token_sentence = {}, [], [], [], []
+        for d, person_id in enumerate(self.person_ids):
+            for sentence in _SENTENCE.split(str(texts[person_id] or "")):
+                sentence = sentence.strip()
+                if not sentence:
+                    continue
+                words = _TOKEN.findall(sentence.lower())
+                term.extend(vocab.setdefault(w, len(vocab)) for w in words)
+                token_sentence.extend([len(sentences)] * len(words))
+                sentences.append(sentence)
+                sentence_doc.append(d)
+        words = list(vocab)
+        term = np.array(term, dtype=np.int64)
+        token_sentence = np.array(token_sentence, dtype=np.int64)
+        sentence_doc = np.array(sentence_doc, dtype=np.int64)
+        token_doc = sentence_doc[token_sentence]
+
+        # Lexicon theme of each distinct word (-1: none)
+        word_theme = np.full(len(words), -1, dtype=np.int64)
+        for i, word in enumerate(words):
+            for t, pattern in enumerate(_THEME_PATTERNS):
+                if pattern.fullmatch(word):
+                    word_theme[i] = t
+                    break
+
+        # ---------- sentences x themes ----------
+        themed = word_theme[term] >= 0
+        sentence_theme = np.bincount(
+            token_sentence[themed] * len(THEMES) + word_theme[term[themed]],
+            minlength=len(sentences) * len(THEMES),
+        ).reshape(len(sentences), len(THEMES))
+        dimension_onehot = np.eye(len(DIMENSIONS), dtype=np.int64)[_THEME_DIMENSION]
+        sentence_dimension = sentence_theme @ dimension_onehot
+
+        self.theme_counts = np.zeros((n, len(THEMES)), dtype=np.int64)
+        np.add.at(self.theme_counts, sentence_doc, sentence_theme)
+        self.dimension_counts = self.theme_counts @ dimension_onehot
+
+        # Evidence: the sentences with the most cues of each dimension, per candidate
+        s_idx, d_idx = np.nonzero(sentence_dimension)
+        keep = _top_k_per_group(sentence_doc[s_idx] * len(DIMENSIONS) + d_idx,
+                                sentence_dimension[s_idx, d_idx].astype(float), EVIDENCE_PER_DIMENSION)
+        self._evidence = {}
+        for doc, dim, sentence in zip(sentence_doc[s_idx[keep]].tolist(), d_idx[keep].tolist(), s_idx[keep].tolist()):
+            self._evidence.setdefault((doc, DIMENSIONS[dim]), []).append(sentences[sentence])
+
+        # ---------- TF-IDF keywords ----------
+        content = np.array([w not in _STOPWORDS and len(w) > 2 for w in words], dtype=bool)
+        self._keywords = {}
+        if term.size:
+            mask = content[term]
+            pair, counts = np.unique(token_doc[mask] * len(words) + term[mask], return_counts=True)
+            pair_doc, pair_term = pair // len(words), pair % len(words)
+            df = np.bincount(pair_term, minlength=len(words))
+            idf = np.log((1 + n) / (1 + df)) + 1.0
+            boost = np.where(word_theme >= 0, CUE_BOOST, 1.0)
+            doc_len = np.bincount(token_doc[mask], minlength=n)
+            scores = counts / doc_len[pair_doc] * idf[pair_term] * boost[pair_term]
+            keep = _top_k_per_group(pair_doc, scores, KEYWORDS_PER_CANDIDATE)
+            for doc, t in zip(pair_doc[keep].tolist(), pair_term[keep].tolist()):
+                self._keywords.setdefault(doc, []).append(words[t])
+        self._row = {p: i for i, p in enumerate(self.person_ids)}
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def __contains__(self, person_id):
+        return person_id in self._row
+
+    def get(self, person_id) -> Optional[dict]:
+        """{"keywords", "themes", "evidence", "cue_counts"} for a candidate; None if unknown."""
+        row = self._row.get(person_id)
+        if row is None:
+            return None
+        theme_counts = self.theme_counts[row]
+        themes = [THEMES[t][1] for t in np.argsort(-theme_counts, kind="stable") if theme_counts[t] > 0]
+        keywords = self._keywords.get(row, [])  # already ranked by TF-IDF
+        return {
+            "keywords": list(keywords),
+            "themes": themes,
+            "evidence": {d: self._evidence.get((row, d), []) for d in DIMENSIONS},
+            "cue_counts": {d: int(c) for d, c in zip(DIMENSIONS, self.dimension_counts[row])},
+        }
+
+
+def soft_skill_summary(signals: dict) -> dict:
+    """One line per dimension: how much evidence there is and which themes it shows."""
+    summary = {}
+    for dimension in DIMENSIONS:
+        count = signals["cue_counts"][dimension]
+        themes = [t for t in signals["themes"] if t in LEXICON[dimension]]
+        if count:
+            summary[dimension] = f"{count} cue(s) in the candidate's text ({', '.join(themes)})."
+        else:
+            summary[dimension] = "No direct evidence in the candidate's text."
+    return summary
+
+
+def insights_summary(signals: dict) -> str:
+    """Template narrative used when no LLM writes one (fast mode)."""
+    counts = signals["cue_counts"]
+    ranked = [d for d in sorted(DIMENSIONS, key=lambda d: -counts[d]) if counts[d]]
+    if not ranked:
+        return "The candidate's text contains no clear collaboration, problem-solving or communication cues."
+    labels = [d.replace("_", "-") for d in ranked]
+    lead = labels[0] if len(labels) == 1 else ", ".join(labels[:-1]) + " and " + labels[-1]
+    missing = [d.replace("_", "-") for d in DIMENSIONS if not counts[d]]
+    text = f"Strongest evidence of {lead}, with themes of {', '.join(signals['themes'][:3])}."
+    if missing:
+        text += f" No direct evidence of {' or '.join(missing)}."
+    return text
+
+
+# Built once per candidate_text dataset; the datastore shares one dataset per file mtime
+_signals: dict = {}
+_lock = threading.Lock()
+
+
+def get_behavior_signals(dataset) -> BehaviorSignals:
+    """Signals for every candidate in a candidate_text dataset (Dataset or StreamingDataset)."""
+    with _lock:
+        cached = _signals.get(id(dataset))
+        if cached is not None and cached[0] is dataset:
+            return cached[1]
+    texts = {person_id: entry_text(dataset.get(person_id)) or "" for person_id in dataset.ids()}
+    signals = BehaviorSignals(texts)
+    with _lock:
+        if len(_signals) >= 8:
+            _signals.clear()
+        _signals[id(dataset)] = (dataset, signals)
+    return signals
+
+
+def main():
+    from pathlib import Path
+    from app.datastore import load_dataset
+
+    parser = argparse.ArgumentParser(description="Extract local behavioral signals from candidate_text.json.")
+    parser.add_argument("person_ids", nargs="*")
+    parser.add_argument("--all", action="store_true", help="Every candidate in the file")
+    parser.add_argument("--top", type=int, help="Only print this many candidates")
+    parser.add_argument("--path", default=str(Path(__file__).resolve().parent.parent / "data" / "candidate_text.json"))
+    args = parser.parse_args()
+
+    signals = get_behavior_signals(load_dataset(args.path, key="person_id", required=True))
+    person_ids = signals.person_ids if args.all or not args.person_ids else args.person_ids
+    for person_id in person_ids[:args.top]:
+        result = signals.get(person_id)
+        print(json.dumps({"person_id": person_id, **result} if result else {"person_id": person_id, "error": "not found"},
+                         indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
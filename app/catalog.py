@@ -0,0 +1,37 @@
+"""Names shared by the storage backends: the datasets and the report file layout."""
+import re
+from typing import Optional
+
+# Dataset name -> (JSON file, id field, fields holding skill lists)
+DATASETS = {
+    "resume": ("resume.json", "person_id", ["skills"]),
+    "linkedin": ("linkedin.json", "person_id", ["skills"]),
+    "github": ("github.json", "person_id", ["top_languages"]),
+    "leetcode": ("leetcode.json", "person_id", ["strengths"]),
+    "candidate_text": ("candidate_text.json", "person_id", []),
+    "jd": ("jd.json", "job_id", ["skills_required", "preferred_skills"]),
+}
+FILE_TO_DATASET = {filename: name for name, (filename, _, _) in DATASETS.items()}
+
+REPORT_KINDS = ("tir", "orchestrated")
+_REPORT_FILES = (
+    ("tir", re.compile(r"^TIR_(?P<person_id>.+?)_(?P<job_id>[^_]+)\.json$")),
+    ("orchestrated", re.compile(r"^(?P<person_id>.+?)_(?P<job_id>[^_]+)_orchestrated\.json$")),
+)
+
+
+def report_filename(kind: str, person_id: str, job_id: Optional[str]) -> str:
+    """File name the report has in the per-pair JSON layout."""
+    if kind == "tir":
+        return f"TIR_{person_id}_{job_id if job_id else 'nojob'}.json"
+    return f"{person_id}_{job_id}_orchestrated.json"
+
+
+def parse_report_filename(filename: str) -> Optional[tuple]:
+    """(kind, person_id, job_id) for a report file name, or None if it isn't one."""
+    for kind, pattern in _REPORT_FILES:
+        match = pattern.match(filename)
+        if match:
+            job_id = match["job_id"] if match["job_id"] != "nojob" else None
+            return kind, match["person_id"], job_id
+    return None
@@ -0,0 +1,196 @@
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+from app.catalog import DATASETS as _CATALOG, FILE_TO_DATASET
+from app.ingest import NDJSON_SUFFIXES, StreamingDataset, is_ndjson, iter_records
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# JSON arrays larger than this are served from an offset index instead of being parsed whole
+STREAM_THRESHOLD_BYTES = int(float(os.getenv("DATA_STREAM_THRESHOLD_MB", "64")) * 1024 * 1024)
+
+# Shared, read-only documents keyed by resolved path; reloaded when the file's mtime changes
+_documents: dict = {}
+_datasets: dict = {}
+_lock = threading.Lock()
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def resolve_data_path(path: str | Path) -> Path:
+    """The file itself, or an NDJSON sibling (resume.ndjson / resume.jsonl) when it doesn't exist."""
+    path = Path(path).resolve()
+    if path.exists():
+        return path
+    for suffix in NDJSON_SUFFIXES:
+        sibling = path.with_suffix(suffix)
+        if sibling.exists():
+            return sibling
+    return path
+
+
+def _sqlite_backend():
+    # Imported here: the SQLite backend builds on this module
+    from app.sqlstore import get_db
+    return get_db()
+
+
+def data_exists(path: str | Path) -> bool:
+    """Whether a data file (or its NDJSON sibling, or its SQLite table) is available."""
+    if _sqlite_backend() is not None:
+        if Path(path).with_suffix(".json").name in {*FILE_TO_DATASET, "market_intelligence.json"}:
+            return True
+    return resolve_data_path(path).exists()
+
+
+def load_document(path: str | Path, default=None):
+    """Parse a JSON (or NDJSON, as a list) file once per process (per mtime) and share the result."""
+    db = _sqlite_backend()
+    if db is not None and Path(path).name == "market_intelligence.json":
+        return db.market() or default
+    path = resolve_data_path(path)
+    mtime = _mtime(path)
+    if mtime is None:
+        return default
+    with _lock:
+        cached = _documents.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    if is_ndjson(path):
+        document = list(iter_records(path))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+    with _lock:
+        _documents[path] = (mtime, document)
+    return document
+
+
+class Dataset:
+    """A list of records with a dict index on their id field."""
+
+    def __init__(self, records: list, key: str, path: Optional[Path] = None, mtime: Optional[float] = None):
+        self.records = records
+        self.key = key
+        self.path = path
+        self.mtime = mtime
+        self.index = {}
+        for record in records:
+            if key in record:
+                # Keep the first record per id, matching the old next(...) scans
+                self.index.setdefault(record[key], record)
+
+    def get(self, record_id, default=None):
+        return self.index.get(record_id, default)
+
+    def ids(self) -> list:
+        return [r[self.key] for r in self.records if self.key in r]
+
+    def __contains__(self, record_id):
+        return record_id in self.index
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def load_dataset(path: str | Path, key: str = "person_id", required: bool = False,
+                 stream: Optional[bool] = None) -> Dataset | StreamingDataset:
+    """Load an indexed dataset, sharing one parse + index per file across all callers.
+
+    NDJSON files and JSON arrays over STREAM_THRESHOLD_BYTES (or any file with stream=True)
+    are returned as a StreamingDataset: records stay on disk and are read by offset.
+    With DATA_BACKEND=sqlite, known data files (resume.json, jd.json, ...) are served
+    from the database instead.
+    """
+    db = _sqlite_backend()
+    if db is not None:
+        name = FILE_TO_DATASET.get(Path(path).with_suffix(".json").name)
+        if name:
+            return db.dataset(name)
+    path = resolve_data_path(path)
+    mtime = _mtime(path)
+    if mtime is None:
+        if required:
+            raise FileNotFoundError(f"❌ Data file not found: {path}")
+        return Dataset([], key, path)
+    if stream is None:
+        stream = is_ndjson(path) or path.stat().st_size > STREAM_THRESHOLD_BYTES
+    with _lock:
+        cached = _datasets.get((path, key, stream))
+        if cached and cached.mtime == mtime:
+            return cached
+    if stream:
+        dataset = StreamingDataset(path, key, mtime)
+    else:
+        dataset = Dataset(load_document(path, default=[]), key, path, mtime)
+    with _lock:
+        _datasets[(path, key, stream)] = dataset
+    return dataset
+
+
+class DataStore:
+    """Named access to every dataset in a data directory."""
+
+    DATASETS = {name: (filename, key) for name, (filename, key, _) in _CATALOG.items()}
+
+    def __init__(self, data_dir: Optional[str | Path] = None):
+        self.data_dir = Path(data_dir or DATA_DIR).resolve()
+
+    def path(self, filename: str) -> Path:
+        return resolve_data_path(self.data_dir / filename)
+
+    def dataset(self, name: str) -> Dataset | StreamingDataset:
+        filename, key = self.DATASETS[name]
+        return load_dataset(self.path(filename), key)
+
+    def iter(self, name: str):
+        """Stream a dataset's records straight from disk without loading or indexing it."""
+        path = self.path(self.DATASETS[name][0])
+        if path.exists():
+            yield from iter_records(path)
+
+    def candidate(self, name: str, person_id: str, default=None):
+        return self.dataset(name).get(person_id, default)
+
+    def job(self, job_id: str, default=None):
+        return self.dataset("jd").get(job_id, default)
+
+    def person_ids(self) -> list:
+        return self.dataset("resume").ids()
+
+    def job_ids(self) -> list:
+        return self.dataset("jd").ids()
+
+    def market(self) -> dict:
+        return load_document(self.path("market_intelligence.json"), default={})
+
+    def data_version(self) -> float:
+        """Newest mtime across every input file (or the last SQLite import); reports older than this are stale."""
+        db = _sqlite_backend()
+        if db is not None:
+            return db.data_version()
+        filenames = [filename for filename, _ in self.DATASETS.values()] + ["market_intelligence.json"]
+        paths = [self.path(f) for f in filenames]
+        return max((os.path.getmtime(p) for p in paths if p.exists()), default=0.0)
+
+
+_stores: dict = {}
+
+
+def get_store(data_dir: Optional[str | Path] = None) -> DataStore:
+    """Return the shared DataStore for a data directory (repo data/ by default)."""
+    data_dir = Path(data_dir or DATA_DIR).resolve()
+    with _lock:
+        if data_dir not in _stores:
+            _stores[data_dir] = DataStore(data_dir)
+        return _stores[data_dir]
@@ -0,0 +1,190 @@
+import os
+import json
+import codecs
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+INDEX_DIR = Path(__file__).resolve().parent.parent / ".cache" / "ingest"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def is_ndjson(path: str | Path) -> bool:
+    """One JSON record per line (.ndjson / .jsonl); .json files hold a single document."""
+    return Path(path).suffix.lower() in NDJSON_SUFFIXES
+
+
+def _iter_ndjson(path: Path):
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped:
+                start = offset + (len(line) - len(line.lstrip()))
+                yield start, len(stripped), json.loads(stripped)
+            offset += len(line)
+
+
+def _iter_array(path: Path, chunk_size: int):
+    """Decode a top-level JSON array one element at a time from fixed-size reads."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, offset = "", 0, 0  # offset = byte position of buffer[pos] in the file
+    eof = False
+
+    with open(path, "rb") as f:
+        def _fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + decoder.decode(chunk, final=eof)
+            pos = 0
+
+        def _skip(chars):
+            # Advance over whitespace and the given separator characters (all single-byte)
+            nonlocal pos, offset
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                    offset += 1
+                if pos < len(buffer) or eof:
+                    return
+                _fill()
+
+        _fill()
+        _skip(_WHITESPACE)
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"❌ {path} is not a JSON array")
+        pos += 1
+        offset += 1
+
+        while True:
+            _skip(_WHITESPACE + ",")
+            if pos >= len(buffer):
+                raise ValueError(f"❌ {path} ended before the closing ']'")
+            if buffer[pos] == "]":
+                return
+            while True:
+                try:
+                    record, end = _decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    _fill()  # the element continues past the end of the buffer
+            length = len(buffer[pos:end].encode("utf-8"))
+            yield offset, length, record
+            offset += length
+            pos = end
+
+
+def iter_entries(path: str | Path, chunk_size: int = 1 << 20):
+    """Yield (byte_offset, byte_length, record) for every record in an NDJSON file or JSON array.
+
+    Only one chunk plus the current record is held in memory at a time.
+    """
+    path = Path(path)
+    if is_ndjson(path):
+        yield from _iter_ndjson(path)
+    else:
+        yield from _iter_array(path, chunk_size)
+
+
+def iter_records(path: str | Path, chunk_size: int = 1 << 20):
+    """Generator over the records of an NDJSON file or JSON array, with bounded memory."""
+    for _, _, record in iter_entries(path, chunk_size):
+        yield record
+
+
+def read_record(path: str | Path, offset: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.read(length))
+
+
+# --- Offset index ---
+def _index_file(path: Path, key: str) -> Path:
+    digest = hashlib.sha256(f"{path}:{key}".encode("utf-8")).hexdigest()[:16]
+    return INDEX_DIR / f"{path.stem}-{digest}.json"
+
+
+def build_offset_index(path: str | Path, key: str = "person_id", persist: bool = True) -> dict:
+    """id -> (offset, length) of each record (first occurrence wins), in file order.
+
+    The index is saved under .cache/ingest/ and reused until the file's size or mtime changes.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    signature = [stat.st_size, stat.st_mtime]
+    index_file = _index_file(path, key)
+    if persist and index_file.exists():
+        try:
+            saved = json.loads(index_file.read_text(encoding="utf-8"))
+            if saved.get("signature") == signature:
+                return {record_id: tuple(span) for record_id, span in saved["offsets"]}
+        except (OSError, ValueError, KeyError):
+            pass
+
+    offsets = {}
+    for offset, length, record in iter_entries(path):
+        if isinstance(record, dict) and key in record:
+            offsets.setdefault(record[key], (offset, length))
+
+    if persist:
+        try:
+            INDEX_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = index_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"signature": signature, "offsets": list(offsets.items())}), encoding="utf-8")
+            os.replace(tmp, index_file)
+        except OSError as e:
+            print(f"⚠️ Could not save offset index for {path.name}: {e}")
+    return offsets
+
+
+class StreamingDataset:
+    """Dataset backed by the file itself: an offset index for lookups, streaming for iteration.
+
+    Same interface as datastore.Dataset, but only ids and byte offsets stay in memory;
+    looked-up records are kept in a small LRU cache.
+    """
+
+    def __init__(self, path: str | Path, key: str = "person_id", mtime: Optional[float] = None,
+                 cache_size: int = 1024):
+        self.path = Path(path).resolve()
+        self.key = key
+        self.mtime = mtime
+        self.offsets = build_offset_index(self.path, key)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, record_id, default=None):
+        with self._lock:
+            if record_id in self._cache:
+                self._cache.move_to_end(record_id)
+                return self._cache[record_id]
+        span = self.offsets.get(record_id)
+        if span is None:
+            return default
+        record = read_record(self.path, *span)
+        with self._lock:
+            self._cache[record_id] = record
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def ids(self) -> list:
+        return list(self.offsets)
+
+    def __contains__(self, record_id):
+        return record_id in self.offsets
+
+    def __iter__(self):
+        return iter_records(self.path)
+
+    def __len__(self):
+        return len(self.offsets)
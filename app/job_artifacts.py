@@ -0,0 +1,188 @@
+"""Job-scoped artifacts: market intelligence computed once per JD instead of once per (candidate, JD) pair.
+
+Usage (from the repo root):
+    python -m app.job_artifacts warm              # compute every missing or stale JD artifact
+    python -m app.job_artifacts warm JD001 JD002
+    python -m app.job_artifacts show JD001
+
+Each JD's MarketOptimizer.analyze() result is persisted under .cache/artifacts/market/
+with a signature of its inputs (the market file's updated_at and a hash of the JD).
+run_orch attaches the stored artifact; a changed signature means it is recomputed.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_ARTIFACT_DIR = Path(__file__).resolve().parent.parent / ".cache" / "artifacts" / "market"
+
+
+def market_signature(agent, job_id: str) -> dict:
+    """Inputs a JD's market intelligence depends on: the market snapshot date and the JD itself."""
+    job = agent.job_info(job_id)
+    raw = json.dumps(job, sort_keys=True, ensure_ascii=False, default=str)
+    return {
+        "market_updated_at": agent.market_data.get("updated_at"),
+        "job_hash": hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16],
+    }
+
+
+class MarketArtifacts:
+    """Persisted per-JD market intelligence, refreshed in the background.
+
+    get() returns the stored artifact when its signature still matches, waits for
+    an in-flight computation of the same JD, or computes it; concurrent callers for
+    one JD share a single analyze() call. Forced (use_cache=False) and cached runs,
+    or runs for different JD/market signatures, never share a computation.
+    """
+
+    def __init__(self, directory: Optional[str | Path] = None, workers: int = 2):
+        self.directory = Path(directory or DEFAULT_ARTIFACT_DIR).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="market-artifact")
+        self._inflight = {}  # (job_id, use_cache, signature) -> Future
+        self._seen_inputs = (None, None)  # market/JD documents as of the last refresh()
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def load(self, job_id: str, signature: Optional[dict] = None) -> Optional[dict]:
+        """Stored market intelligence for a JD; None if missing or (given a signature) stale."""
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if signature is not None and artifact.get("signature") != signature:
+            return None
+        return artifact["market_intelligence"]
+
+    def _save(self, job_id: str, signature: dict, result: dict):
+        path = self._path(job_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"job_id": job_id, "signature": signature, "created_at": time.time(),
+                       "market_intelligence": result}, f, indent=2)
+        os.replace(tmp, path)
+
+    def _compute(self, agent, job_id: str, signature: dict, use_cache: bool, key: tuple) -> dict:
+        try:
+            result = agent.analyze(job_id=job_id, use_cache=use_cache)
+            if result.get("error") or result.get("ai_summary_degraded"):
+                # Served for this call only; the next get() retries instead of reusing it
+                print(f"⚠️ Market artifact for {job_id} not saved: {result.get('error') or 'AI summary fell back to raw text'}")
+            else:
+                self._save(job_id, signature, result)
+                print(f"💾 Market artifact saved for {job_id}")
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _submit(self, agent, job_id: str, signature: dict, use_cache: bool = True, background: bool = True) -> Future:
+        key = (job_id, use_cache, tuple(sorted(signature.items())))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if background:
+                future = self._executor.submit(self._compute, agent, job_id, signature, use_cache, key)
+                self._inflight[key] = future
+                return future
+            future = Future()
+            self._inflight[key] = future
+        # Computed on the caller's thread, so a busy background pool never delays run_orch
+        try:
+            future.set_result(self._compute(agent, job_id, signature, use_cache, key))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def get(self, agent, job_id: str, use_cache: bool = True) -> dict:
+        """The JD's market intelligence: stored if current, otherwise (re)computed. use_cache=False forces a rerun."""
+        signature = market_signature(agent, job_id)
+        if use_cache:
+            stored = self.load(job_id, signature)
+            if stored is not None:
+                print(f"♻️ Using stored market artifact for {job_id}")
+                return stored
+        return self._submit(agent, job_id, signature, use_cache=use_cache, background=False).result()
+
+    def warm(self, agent, job_ids=None) -> list:
+        """Schedule background computation for every JD whose artifact is missing or stale."""
+        job_ids = list(job_ids) if job_ids is not None else agent.jd_data.ids()
+        futures = []
+        for job_id in job_ids:
+            signature = market_signature(agent, job_id)
+            if self.load(job_id, signature) is None:
+                futures.append(self._submit(agent, job_id, signature))
+        if futures:
+            print(f"🔧 Warming market artifacts for {len(futures)} JD(s) in the background")
+        return futures
+
+    def refresh(self, agent) -> list:
+        """warm() all JDs, but only when the market or JD documents changed since the last call.
+
+        The datastore hands out one shared document per file mtime, so object identity
+        changes exactly when a file is edited (or a JD is added).
+        """
+        with self._lock:
+            market_data, jd_data = self._seen_inputs
+            if market_data is agent.market_data and jd_data is agent.jd_data:
+                return []
+            self._seen_inputs = (agent.market_data, agent.jd_data)
+        return self.warm(agent)
+
+
+_artifacts: Optional[MarketArtifacts] = None
+_artifacts_lock = threading.Lock()
+
+
+def get_market_artifacts() -> Optional[MarketArtifacts]:
+    """Shared store (MARKET_ARTIFACT_DIR, MARKET_ARTIFACT_WORKERS); None when MARKET_ARTIFACTS_DISABLED=1."""
+    global _artifacts
+    if os.getenv("MARKET_ARTIFACTS_DISABLED") == "1":
+        return None
+    with _artifacts_lock:
+        if _artifacts is None:
+            _artifacts = MarketArtifacts(
+                os.getenv("MARKET_ARTIFACT_DIR") or None,
+                workers=int(os.getenv("MARKET_ARTIFACT_WORKERS", "2")),
+            )
+        return _artifacts
+
+
+def main():
+    from agents.market_optimizer import MarketOptimizer
+
+    parser = argparse.ArgumentParser(description="Precompute per-JD market intelligence artifacts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_warm = sub.add_parser("warm", help="Compute missing or stale artifacts")
+    p_warm.add_argument("job_ids", nargs="*")
+    p_show = sub.add_parser("show", help="Print a stored artifact")
+    p_show.add_argument("job_id")
+    args = parser.parse_args()
+
+    store = get_market_artifacts() or MarketArtifacts(os.getenv("MARKET_ARTIFACT_DIR") or None)
+    agent = MarketOptimizer()
+    if args.command == "warm":
+        futures = store.warm(agent, args.job_ids or None)
+        for future in futures:
+            future.result()
+        print(f"✅ {len(futures)} market artifact(s) computed; the others were already current")
+    else:
+        artifact = store.load(args.job_id, market_signature(agent, args.job_id))
+        print(json.dumps(artifact, indent=2) if artifact is not None else f"❌ No current artifact for {args.job_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import numpy as np
+from typing import Optional
+from app.datastore import DataStore, get_store
+from app.skills import canonical_keys
+
+# How much a skill listed in each source counts as evidence (capped at 1 per skill)
+SOURCE_WEIGHTS = {"resume": 1.0, "linkedin": 0.8, "github": 0.6, "leetcode": 0.4}
+
+# Blend of the three components in the final score
+SCORE_WEIGHTS = {"required": 0.6, "preferred": 0.25, "experience": 0.15}
+
+
+def candidate_skills(store: DataStore, person_id: str) -> dict:
+    """Skills per source for one candidate, as listed in resume/LinkedIn/GitHub/LeetCode."""
+    resume = store.candidate("resume", person_id) or {}
+    linkedin = store.candidate("linkedin", person_id) or {}
+    github = store.candidate("github", person_id) or {}
+    leetcode = store.candidate("leetcode", person_id) or {}
+    return {
+        "resume": resume.get("skills", []),
+        "linkedin": linkedin.get("skills", []),
+        "github": github.get("top_languages", []),
+        "leetcode": leetcode.get("strengths", []),
+    }
+
+
+def years_of_experience(resume: dict) -> float:
+    """Resume-level YOE if present, otherwise the sum of per-role YOE entries."""
+    try:
+        if resume.get("YOE") is not None:
+            return float(resume["YOE"])
+    except (TypeError, ValueError):
+        pass
+    total = 0.0
+    for role in resume.get("experience", []):
+        try:
+            total += float(role.get("YOE", 0) or 0)
+        except (TypeError, ValueError):
+            continue
+    return total
+
+
+class JobMatcher:
+    """Deterministic candidate x JD scorer over a candidate x skill evidence matrix.
+
+    Used to shortlist candidates before spending any LLM calls on job comparison.
+    """
+
+    def __init__(self, store: Optional[DataStore] = None, source_weights: Optional[dict] = None):
+        self.store = store or get_store()
+        self.source_weights = source_weights or SOURCE_WEIGHTS
+        self.person_ids = self.store.person_ids()
+
+        # Vocabulary over every skill any candidate lists
+        per_candidate = [candidate_skills(self.store, pid) for pid in self.person_ids]
+        vocab = sorted({k for sources in per_candidate for skills in sources.values() for s in skills for k in canonical_keys(s)})
+        self.skill_index = {skill: i for i, skill in enumerate(vocab)}
+        self.vocab = vocab
+
+        # Evidence matrix: weighted sum of sources listing the skill, capped at 1
+        self.matrix = np.zeros((len(self.person_ids), len(vocab)), dtype=np.float32)
+        for row, sources in enumerate(per_candidate):
+            for source, skills in sources.items():
+                cols = list({self.skill_index[k] for s in skills for k in canonical_keys(s)})
+                self.matrix[row, cols] += self.source_weights.get(source, 0.0)
+        np.minimum(self.matrix, 1.0, out=self.matrix)
+
+        self.yoe = np.array(
+            [years_of_experience(self.store.candidate("resume", pid) or {}) for pid in self.person_ids],
+            dtype=np.float32,
+        )
+
+    def _requirement_matrix(self, jobs: list, field: str):
+        """(skills x jobs) one-hot matrix of a JD skill list plus each JD's list length."""
+        req = np.zeros((len(self.vocab), len(jobs)), dtype=np.float32)
+        counts = np.zeros(len(jobs), dtype=np.float32)
+        for col, job in enumerate(jobs):
+            skills = {k for s in job.get(field, []) for k in canonical_keys(s)}
+            counts[col] = len(skills)
+            rows = [self.skill_index[s] for s in skills if s in self.skill_index]
+            req[rows, col] = 1.0
+        return req, counts
+
+    def score_jobs(self, job_ids: list, top_k: int = 10) -> dict:
+        """Score every candidate against every JD in one pass; returns job_id -> top-k shortlist."""
+        jobs = [self.store.job(job_id, {}) for job_id in job_ids]
+        if not self.person_ids or not jobs:
+            return {job_id: [] for job_id in job_ids}
+
+        required, n_required = self._requirement_matrix(jobs, "skills_required")
+        preferred, n_preferred = self._requirement_matrix(jobs, "preferred_skills")
+
+        # (candidates x jobs) coverage; a JD with an empty list counts as fully covered
+        shape = (len(self.person_ids), len(jobs))
+        required_cov = np.divide(
+            self.matrix @ required, n_required, out=np.ones(shape, dtype=np.float32), where=n_required > 0
+        )
+        preferred_cov = np.divide(
+            self.matrix @ preferred, n_preferred, out=np.ones(shape, dtype=np.float32), where=n_preferred > 0
+        )
+
+        years_needed = np.array([float(job.get("experience_required_years") or 0) for job in jobs], dtype=np.float32)
+        experience_fit = np.ones_like(required_cov)
+        needs_years = years_needed > 0
+        experience_fit[:, needs_years] = np.clip(self.yoe[:, None] / years_needed[needs_years], 0.0, 1.0)
+
+        scores = (
+            SCORE_WEIGHTS["required"] * required_cov
+            + SCORE_WEIGHTS["preferred"] * preferred_cov
+            + SCORE_WEIGHTS["experience"] * experience_fit
+        )
+
+        k = min(top_k, len(self.person_ids))
+        shortlists = {}
+        for col, job_id in enumerate(job_ids):
+            top = np.argpartition(-scores[:, col], k - 1)[:k]
+            top = top[np.argsort(-scores[top, col], kind="stable")]
+            shortlists[job_id] = [
+                self._breakdown(row, col, jobs[col], scores, required_cov, preferred_cov, experience_fit)
+                for row in top
+            ]
+        return shortlists
+
+    def score_job(self, job_id: str, top_k: int = 10) -> list:
+        return self.score_jobs([job_id], top_k=top_k)[job_id]
+
+    def shortlist(self, job_id: str, top_k: int = 10) -> list:
+        """Just the person_ids of the top-k candidates for a JD."""
+        return [entry["person_id"] for entry in self.score_job(job_id, top_k=top_k)]
+
+    def _breakdown(self, row, col, job, scores, required_cov, preferred_cov, experience_fit) -> dict:
+        has_skill = self.matrix[row] > 0
+
+        def _split(field):
+            matched, missing = [], []
+            for skill in job.get(field, []):
+                idxs = [self.skill_index.get(k) for k in canonical_keys(skill)]
+                (matched if all(i is not None and has_skill[i] for i in idxs) else missing).append(skill)
+            return matched, missing
+
+        matched_required, missing_required = _split("skills_required")
+        matched_preferred, _ = _split("preferred_skills")
+        return {
+            "person_id": self.person_ids[row],
+            "score": round(float(scores[row, col]), 4),
+            "required_coverage": round(float(required_cov[row, col]), 4),
+            "preferred_coverage": round(float(preferred_cov[row, col]), 4),
+            "experience_fit": round(float(experience_fit[row, col]), 4),
+            "years_of_experience": round(float(self.yoe[row]), 2),
+            "matched_required": matched_required,
+            "missing_required": missing_required,
+            "matched_preferred": matched_preferred,
+        }
+
+
+if __name__ == "__main__":
+    import json
+    matcher = JobMatcher()
+    print(json.dumps(matcher.score_job("JD001", top_k=5), indent=2))
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / ".cache" / "llm_cache.sqlite3"
+
+
+class LLMCache:
+    """Disk-backed cache of chat completion responses, keyed on (model, prompt, temperature)."""
+
+    def __init__(
+        self,
+        path: Optional[str | Path] = None,
+        max_entries: int = 5000,
+        max_age_s: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.path = Path(path or DEFAULT_CACHE_PATH).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        raw = json.dumps([model, prompt, float(temperature)], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_s is not None and now - created_at > self.max_age_s
+
+    def get(self, model: str, prompt: str, temperature: float) -> Optional[str]:
+        key = self.make_key(model, prompt, temperature)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            content, created_at = row
+            if self._is_expired(created_at, now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return content
+
+    def set(self, model: str, prompt: str, temperature: float, content: str):
+        key = self.make_key(model, prompt, temperature)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, float(temperature), content, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def invalidate(self, model: str, prompt: str, temperature: float):
+        """Drop a single entry, e.g. when the cached response turned out to be unusable."""
+        key = self.make_key(model, prompt, temperature)
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        # Age-based: drop everything older than max_age_s
+        if self.max_age_s is not None:
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.max_age_s,)
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+        # Size-based: drop least recently used entries beyond max_entries
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the process-wide cache, or None when disabled via LLM_CACHE_DISABLED=1."""
+    global _cache
+    if os.getenv("LLM_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_age_days = os.getenv("LLM_CACHE_MAX_AGE_DAYS")
+            _cache = LLMCache(
+                path=os.getenv("LLM_CACHE_PATH"),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+                max_age_s=float(max_age_days) * 24 * 3600 if max_age_days else 7 * 24 * 3600,
+            )
+        return _cache
+
@@ -0,0 +1,339 @@
+import os
+import time
+import queue
+import random
+import asyncio
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from groq import AsyncGroq, APIConnectionError, APIStatusError
+from app.llm_cache import get_cache
+from app.prompts import estimate_tokens
+from app.telemetry import get_telemetry
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Structured-output calls ask for response_format=json_object unless LLM_JSON_MODE=0
+JSON_MODE_ENABLED = os.getenv("LLM_JSON_MODE", "1") != "0"
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_min`."""
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or rate_per_min
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount: float):
+        """Charge extra usage after the fact (may go negative, delaying later callers)."""
+        self._refill()
+        self.tokens -= amount
+
+
+class LLMClientPool:
+    """Shared async Groq client with rate limiting, bounded concurrency and retries.
+
+    A single AsyncGroq client (one HTTP connection pool) runs on a background event
+    loop, so synchronous agents can call complete() from any thread.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        requests_per_min: Optional[float] = 30,
+        tokens_per_min: Optional[float] = 30000,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: float = 60.0,
+        completion_token_estimate: int = 512,
+    ):
+        load_dotenv()
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("❌ Missing GROQ_API_KEY in environment or .env file")
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_token_estimate = completion_token_estimate
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-pool", daemon=True)
+        self._thread.start()
+
+        # Client, limiter and semaphore live on the pool's loop
+        self.client = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url or os.getenv("GROQ_BASE_URL") or None,
+            max_retries=0,  # retries are handled here, with backoff shared across callers
+            timeout=timeout,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(requests_per_min) if requests_per_min else None
+        self._tokens = TokenBucket(tokens_per_min) if tokens_per_min else None
+
+    # ---------- helpers ----------
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    @staticmethod
+    def _retry_after(error: APIStatusError) -> Optional[float]:
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    async def _acquire(self, prompt: str):
+        if self._requests:
+            await self._requests.acquire(1)
+        if self._tokens:
+            await self._tokens.acquire(estimate_tokens(prompt) + self.completion_token_estimate)
+
+    def _settle_usage(self, prompt: str, total_tokens: Optional[int]):
+        """Charge the token bucket for any usage beyond the pre-call estimate."""
+        if self._tokens and total_tokens:
+            extra = total_tokens - (estimate_tokens(prompt) + self.completion_token_estimate)
+            if extra > 0:
+                self._tokens.debit(extra)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `error`, or None if it should be raised."""
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(error, APIStatusError):
+            if error.status_code not in RETRYABLE_STATUS:
+                return None
+            delay = self._backoff(attempt, self._retry_after(error))
+            print(f"⚠️ Groq returned {error.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            return delay
+        if isinstance(error, APIConnectionError):
+            delay = self._backoff(attempt)
+            print(f"⚠️ Groq connection error ({error}), retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            return delay
+        return None
+
+    def _cached(self, prompt: str, model: str, temperature: float, use_cache: bool) -> Optional[str]:
+        cache = get_cache()
+        if cache is None:
+            return None
+        if not use_cache:
+            cache.bypassed += 1
+            return None
+        return cache.get(model, prompt, temperature)
+
+    def _store(self, prompt: str, model: str, temperature: float, content: Optional[str]):
+        # Only successful, non-empty responses are worth replaying
+        cache = get_cache()
+        if cache is not None and content:
+            cache.set(model, prompt, temperature, content)
+
+    @staticmethod
+    def _record(agent, call_site, model, started, retries, outcome, prompt_tokens=0, completion_tokens=0,
+                streamed=False, error=None):
+        telemetry = get_telemetry()
+        if telemetry is not None:
+            telemetry.record(
+                agent=agent,
+                call_site=call_site,
+                model=model,
+                latency_s=time.monotonic() - started,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                retries=retries,
+                outcome=outcome,
+                streamed=streamed,
+                error=error,
+            )
+
+    # ---------- main ----------
+    async def acomplete(self, prompt: str, model: str, temperature: float, use_cache: bool = True,
+                        agent: str = "unknown", call_site: str = "unknown", json_mode: bool = False) -> Optional[str]:
+        """Single-message chat completion with caching, rate limiting and retries.
+
+        agent/call_site only label the call in telemetry. json_mode=True asks for a JSON
+        object (response_format); if the request is rejected it is retried once without it.
+        """
+        started = time.monotonic()
+        cached = self._cached(prompt, model, temperature, use_cache)
+        if cached is not None:
+            self._record(agent, call_site, model, started, 0, "cache_hit")
+            return cached
+
+        attempt = 0
+        json_mode = json_mode and JSON_MODE_ENABLED
+        try:
+            while True:
+                await self._acquire(prompt)
+                try:
+                    async with self._semaphore:
+                        response = await self.client.chat.completions.create(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            temperature=temperature,
+                            **({"response_format": {"type": "json_object"}} if json_mode else {}),
+                        )
+                    break
+                except (APIStatusError, APIConnectionError) as e:
+                    if json_mode and isinstance(e, APIStatusError) and e.status_code == 400:
+                        # Model without JSON mode, or output that failed Groq's own JSON check
+                        print(f"⚠️ JSON mode request rejected ({e.status_code}), retrying without it")
+                        json_mode = False
+                        continue
+                    delay = self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                attempt += 1
+                await asyncio.sleep(delay)
+        except Exception as e:
+            self._record(agent, call_site, model, started, attempt, "error", error=type(e).__name__)
+            raise
+
+        usage = getattr(response, "usage", None)
+        self._settle_usage(prompt, getattr(usage, "total_tokens", None))
+        content = response.choices[0].message.content
+        self._store(prompt, model, temperature, content)
+        self._record(
+            agent, call_site, model, started, attempt, "ok",
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or estimate_tokens(prompt),
+            completion_tokens=getattr(usage, "completion_tokens", None) or estimate_tokens(content or ""),
+        )
+        return content
+
+    async def astream(self, prompt: str, model: str, temperature: float, use_cache: bool = True,
+                      agent: str = "unknown", call_site: str = "unknown"):
+        """Streamed chat completion yielding text chunks as they arrive.
+
+        A cache hit is yielded as a single chunk. Retries only happen before the
+        first chunk; a stream that breaks midway raises.
+        """
+        started = time.monotonic()
+        cached = self._cached(prompt, model, temperature, use_cache)
+        if cached is not None:
+            self._record(agent, call_site, model, started, 0, "cache_hit", streamed=True)
+            yield cached
+            return
+
+        parts = []
+        usage = None
+        attempt = 0
+        try:
+            while True:
+                await self._acquire(prompt)
+                try:
+                    async with self._semaphore:
+                        stream = await self.client.chat.completions.create(
+                            model=model,
+                            messages=[{"role": "user", "content": prompt}],
+                            temperature=temperature,
+                            stream=True,
+                        )
+                        async for chunk in stream:
+                            # Groq reports usage on the final chunk
+                            usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                    break
+                except (APIStatusError, APIConnectionError) as e:
+                    delay = None if parts else self._retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                attempt += 1
+                await asyncio.sleep(delay)
+        except Exception as e:
+            self._record(agent, call_site, model, started, attempt, "error", streamed=True, error=type(e).__name__)
+            raise
+
+        content = "".join(parts)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_tokens(prompt)
+        completion_tokens = getattr(usage, "completion_tokens", None) or estimate_tokens(content)
+        self._settle_usage(prompt, prompt_tokens + completion_tokens)
+        self._store(prompt, model, temperature, content)
+        self._record(
+            agent, call_site, model, started, attempt, "ok",
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, streamed=True,
+        )
+
+    def complete(self, prompt: str, model: str, temperature: float, use_cache: bool = True,
+                 agent: str = "unknown", call_site: str = "unknown", json_mode: bool = False) -> Optional[str]:
+        """Blocking wrapper around acomplete() for the synchronous agents (safe from any thread)."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.acomplete(prompt, model, temperature, use_cache=use_cache, agent=agent, call_site=call_site,
+                           json_mode=json_mode),
+            self._loop,
+        )
+        return future.result()
+
+    def stream(self, prompt: str, model: str, temperature: float, use_cache: bool = True,
+               agent: str = "unknown", call_site: str = "unknown"):
+        """Blocking generator over astream() chunks (safe from any thread)."""
+        chunks = queue.Queue()
+        finished = object()
+
+        async def _pump():
+            try:
+                async for chunk in self.astream(
+                    prompt, model, temperature, use_cache=use_cache, agent=agent, call_site=call_site
+                ):
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(finished)
+
+        asyncio.run_coroutine_threadsafe(_pump(), self._loop)
+        while True:
+            item = chunks.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_pool: Optional[LLMClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> LLMClientPool:
+    """Return the process-wide client pool, configured from the environment on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            rpm = float(os.getenv("LLM_REQUESTS_PER_MIN", "30"))
+            tpm = float(os.getenv("LLM_TOKENS_PER_MIN", "30000"))
+            _pool = LLMClientPool(
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                requests_per_min=rpm or None,
+                tokens_per_min=tpm or None,
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+            )
+        return _pool
@@ -0,0 +1,161 @@
+import threading
+import numpy as np
+from typing import Optional
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Wildcard used in rollup keys ("any location" / "any seniority")
+ANY = "*"
+
+# Rollup levels, narrowest first: which of (role, location, seniority) each level keeps.
+# A query falls back through them in this order; role is always required.
+ROLLUP_LEVELS = (
+    ("exact", (True, True, True)),
+    ("any_location", (True, False, True)),
+    ("any_seniority", (True, True, False)),
+    ("role", (True, False, False)),
+)
+LEVEL_DESCRIPTIONS = {
+    "exact": "exact role, location and seniority",
+    "any_location": "same role and seniority, all locations",
+    "any_seniority": "same role and location, all seniorities",
+    "role": "same role, all locations and seniorities",
+}
+
+
+def normalize(value) -> str:
+    """Case- and whitespace-insensitive form of a role/location/seniority label."""
+    return " ".join(str(value or "").split()).casefold()
+
+
+def market_key(role, location, seniority) -> tuple:
+    return normalize(role), normalize(location), normalize(seniority)
+
+
+def rollup_key(key: tuple, keep: tuple) -> tuple:
+    return tuple(part if kept else ANY for part, kept in zip(key, keep))
+
+
+def interpolated_percentiles(offsets: np.ndarray, counts: np.ndarray, values: np.ndarray,
+                             percentiles=PERCENTILES) -> np.ndarray:
+    """Linearly interpolated percentiles of many groups at once.
+
+    values holds every group's samples sorted within the group; group g is
+    values[offsets[g]:offsets[g] + counts[g]]. Returns a (groups, len(percentiles))
+    array, NaN for empty groups. Matches np.percentile(..., method="linear").
+    """
+    q = np.asarray(percentiles, dtype=float) / 100.0
+    n = counts[:, None].astype(float)
+    pos = np.clip(q[None, :] * (n - 1), 0, None)
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(counts[:, None] - 1, 0))
+    frac = pos - lower
+    base = offsets[:, None]
+    if values.size == 0:
+        return np.full(pos.shape, np.nan)
+    lo = values[np.minimum(base + lower, values.size - 1)]
+    hi = values[np.minimum(base + upper, values.size - 1)]
+    result = lo + (hi - lo) * frac
+    result[counts == 0] = np.nan
+    return result
+
+
+def _compensation(percentiles: np.ndarray, size: int) -> dict:
+    if size == 0:
+        return {"p10": 0, "p25": 0, "median": 0, "p75": 0, "p90": 0, "sample_size": 0}
+    p10, p25, p50, p75, p90 = (round(float(v), 2) for v in percentiles)
+    return {"p10": p10, "p25": p25, "median": p50, "p75": p75, "p90": p90, "sample_size": size}
+
+
+class MarketIndex:
+    """Market rows grouped by normalized (role, location, seniority), plus the
+    "any location" / "any seniority" rollups of every role, with every per-group
+    statistic MarketOptimizer reports computed once at build time.
+
+    Building is a single pass over the rows plus one vectorized sort and
+    percentile computation, so analyze() is a few dict lookups however many rows
+    the market file has.
+    """
+
+    def __init__(self, market_data: dict):
+        self.updated_at = market_data.get("updated_at")
+        groups = {}
+        for row in market_data.get("roles", []):
+            key = market_key(row.get("role"), row.get("location"), row.get("seniority"))
+            for _, keep in ROLLUP_LEVELS:
+                groups.setdefault(rollup_key(key, keep), []).append(row)
+        self.keys = [key for key in groups if ANY not in key]
+
+        # Salary samples of every group in one array, sorted within each group
+        salaries = [
+            np.fromiter((float(x) for r in rows for x in r.get("salary_samples_inr_lpa", [])), dtype=float)
+            for rows in groups.values()
+        ]
+        counts = np.array([len(s) for s in salaries], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64) if len(counts) else counts
+        values = np.concatenate(salaries) if salaries else np.empty(0)
+        group_ids = np.repeat(np.arange(len(counts)), counts)
+        values = values[np.lexsort((values, group_ids))]
+        percentiles = interpolated_percentiles(offsets, counts, values)
+
+        self.cells = {}
+        for g, (key, rows) in enumerate(groups.items()):
+            channel_scores, openings_by_location = {}, {}
+            for r in rows:
+                for ch, sc in r.get("channels", {}).items():
+                    channel_scores.setdefault(ch, []).append(sc)
+                location = r.get("location", "")
+                openings_by_location[location] = openings_by_location.get(location, 0) + r.get("openings", 0)
+            self.cells[key] = {
+                "rows": rows,
+                "salaries": values[offsets[g]:offsets[g] + counts[g]],
+                "compensation": _compensation(percentiles[g], int(counts[g])),
+                "total_openings": sum(r.get("openings", 0) for r in rows),
+                "avg_talent_supply_index": sum(r.get("talent_supply_index", 0) for r in rows) / len(rows),
+                "hotspots": sorted(
+                    [{"location": loc, "openings": n} for loc, n in openings_by_location.items()],
+                    key=lambda x: x["openings"], reverse=True
+                ),
+                "channels": sorted(
+                    [{"channel": ch, "effectiveness": sum(v) / len(v)} for ch, v in channel_scores.items()],
+                    key=lambda x: x["effectiveness"], reverse=True
+                ),
+            }
+
+    def lookup(self, role: str, location: str, seniority: str) -> Optional[dict]:
+        """Exact (role, location, seniority) cell only."""
+        return self.cells.get(market_key(role, location, seniority))
+
+    def query(self, role: str, location: str, seniority: str) -> tuple:
+        """(cell, level) from the narrowest rollup level with data, or (None, None).
+
+        level is one of the ROLLUP_LEVELS names: "exact", "any_location",
+        "any_seniority" or "role" (any location and seniority).
+        """
+        key = market_key(role, location, seniority)
+        for level, keep in ROLLUP_LEVELS:
+            cell = self.cells.get(rollup_key(key, keep))
+            if cell is not None:
+                return cell, level
+        return None, None
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# Built once per market document; the datastore shares one parsed document per file mtime
+_indexes: dict = {}
+_lock = threading.Lock()
+
+
+def get_market_index(market_data: dict) -> MarketIndex:
+    with _lock:
+        cached = _indexes.get(id(market_data))
+        if cached is not None and cached[0] is market_data:
+            return cached[1]
+    index = MarketIndex(market_data)
+    with _lock:
+        if len(_indexes) >= 8:
+            _indexes.clear()
+        _indexes[id(market_data)] = (market_data, index)
+    return index
@@ -1,65 +1,177 @@
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from agents.candidate_profiler import CandidateProfilerAI
 from agents.assessment_designer import AssessmentDesigner
 from agents.behavioral_analyzer import BehavioralAnalyzer
 from agents.market_optimizer import MarketOptimizer  # NEW
+from app.datastore import get_store
+from app.sqlstore import get_db
+from app.report_archive import get_archive
+from app.job_artifacts import get_market_artifacts
+from app.structured import StructuredOutputError
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 REPORT_DIR = os.path.join(os.path.dirname(__file__), "..", "talent-intelligence-report")
 
+# Per-agent wall-clock limits (seconds) for concurrent orchestration
+AGENT_TIMEOUTS = {
+    "tir": float(os.getenv("PROFILER_TIMEOUT_S", "180")),
+    "assessment": float(os.getenv("ASSESSMENT_TIMEOUT_S", "120")),
+    "behavioral_analysis": float(os.getenv("BEHAVIORAL_TIMEOUT_S", "120")),
+    "market_intelligence": float(os.getenv("MARKET_TIMEOUT_S", "120")),
+}
+
 def list_profiles():
-    resume_path = os.path.join(DATA_DIR, "resume.json")
-    if not os.path.exists(resume_path):
-        return []
-    with open(resume_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [c["person_id"] for c in data]
+    return get_store(DATA_DIR).person_ids()
 
 def list_jds():
-    jd_path = os.path.join(DATA_DIR, "jd.json")
-    if not os.path.exists(jd_path):
-        return []
-    with open(jd_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [jd["job_id"] for jd in data]
-
-def run_orch(person_id: str, job_id: str):
-    # --- Load JD Info ---
-    jd_path = os.path.join(DATA_DIR, "jd.json")
-    job_info = {}
-    if os.path.exists(jd_path):
-        with open(jd_path, "r", encoding="utf-8") as f:
-            jds = json.load(f)
-        job_info = next((j for j in jds if j.get("job_id") == job_id), {})
-
-    # --- Candidate Profiler ---
-    profiler = CandidateProfilerAI(use_ai=True)
-    tir = profiler.generate_tir(person_id=person_id, job_id=job_id)
-
-    # --- Assessment Designer ---
-    designer = AssessmentDesigner(
+    return get_store(DATA_DIR).job_ids()
+
+def report_path(person_id: str, job_id: str) -> str:
+    return os.path.join(REPORT_DIR, f"{person_id}_{job_id}_orchestrated.json")
+
+# --- Agent runners (each builds its own agent unless one is passed in; agents are read-only once built) ---
+def _new_profiler():
+    return CandidateProfilerAI(data_dir=DATA_DIR, report_dir=REPORT_DIR, use_ai=True)
+
+def _new_designer():
+    return AssessmentDesigner(
         leetcode_data_path=os.path.join(DATA_DIR, "leetcode.json"),
         resume_data_path=os.path.join(DATA_DIR, "resume.json"),
         jd_data_path=os.path.join(DATA_DIR, "jd.json")
     )
-    assessment = designer.generate_assessment(person_id=person_id, job_id=job_id)
 
-    # --- Behavioral Analyzer ---
-    behavior_agent = BehavioralAnalyzer(
-        candidate_text_path=os.path.join(DATA_DIR, "candidate_text.json")
-    )
-    behavioral_analysis = behavior_agent.analyze(person_id)
+def _new_behavior_agent():
+    return BehavioralAnalyzer(candidate_text_path=os.path.join(DATA_DIR, "candidate_text.json"))
 
-    # --- Market Intelligence & Sourcing Optimizer (NEW) ---
-    role = job_info.get("role_title") or job_info.get("title") or job_info.get("role") or "Backend Engineer"
-    location = job_info.get("location") or "Bengaluru, IN"
-    seniority = job_info.get("seniority") or "Mid"
+def _new_market_agent():
+    return MarketOptimizer(market_data_path=os.path.join(DATA_DIR, "market_intelligence.json"))
 
-    market_agent = MarketOptimizer(
-        market_data_path=os.path.join(DATA_DIR, "market_intelligence.json")
+def build_agents() -> dict:
+    """One instance of each agent, keyed by report section; safe to share across threads and runs"""
+    return {
+        "tir": _new_profiler(),
+        "assessment": _new_designer(),
+        "behavioral_analysis": _new_behavior_agent(),
+        "market_intelligence": _new_market_agent(),
+    }
+
+def _run_profiler(person_id, job_id, use_cache=True, parallel=False, on_token=None, profiler=None):
+    profiler = profiler or _new_profiler()
+    return profiler.generate_tir(
+        person_id=person_id, job_id=job_id, use_cache=use_cache, parallel=parallel, on_token=on_token
     )
-    market_intel = market_agent.analyze(job_id=job_id)
+
+def _run_assessment(person_id, job_id, use_cache=True, designer=None):
+    designer = designer or _new_designer()
+    return designer.generate_assessment(person_id=person_id, job_id=job_id, use_cache=use_cache)
+
+def _run_behavioral(person_id, use_cache=True, on_token=None, behavior_agent=None):
+    behavior_agent = behavior_agent or _new_behavior_agent()
+    stream = (lambda chunk: on_token("behavioral_analysis", chunk)) if on_token else None
+    return behavior_agent.analyze(person_id, use_cache=use_cache, on_token=stream)
+
+def _run_market(job_id, use_cache=True, market_agent=None):
+    """Market intelligence depends only on the JD, so it comes from the job-scoped artifact store"""
+    market_agent = market_agent or _new_market_agent()
+    artifacts = get_market_artifacts()
+    if artifacts is None:
+        return market_agent.analyze(job_id=job_id, use_cache=use_cache)
+    artifacts.refresh(market_agent)  # new JDs / a new market snapshot are warmed in the background
+    return artifacts.get(market_agent, job_id, use_cache=use_cache)
+
+def _agent_fallback(section, person_id, job_id, error):
+    """Placeholder with the same shape the pages expect when an agent fails or times out; it carries the error"""
+    if section == "tir":
+        return {"person_id": person_id, "job_id": job_id, "error": error}
+    if section == "assessment":
+        return [{"person_id": person_id, "job_id": job_id, "error": error}]
+    if section == "behavioral_analysis":
+        return {"person_id": person_id, "error": error}
+    return {"job_id": job_id, "error": error}
+
+def _run_agents_concurrently(person_id, job_id, use_cache=True, timeouts=None, on_token=None, agents=None):
+    """Run all four agents in parallel with per-agent timeouts and error isolation"""
+    timeouts = {**AGENT_TIMEOUTS, **(timeouts or {})}
+    agents = agents or {}
+    pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent")
+    started = time.monotonic()
+    futures = {
+        "tir": pool.submit(_run_profiler, person_id, job_id, use_cache, True, on_token, agents.get("tir")),
+        "assessment": pool.submit(_run_assessment, person_id, job_id, use_cache, agents.get("assessment")),
+        "behavioral_analysis": pool.submit(
+            _run_behavioral, person_id, use_cache, on_token, agents.get("behavioral_analysis")
+        ),
+        "market_intelligence": pool.submit(_run_market, job_id, use_cache, agents.get("market_intelligence")),
+    }
+
+    results = {}
+    for section, future in futures.items():
+        remaining = max(0.0, timeouts[section] - (time.monotonic() - started))
+        try:
+            results[section] = future.result(timeout=remaining)
+        except FutureTimeout:
+            print(f"❌ {section} timed out after {timeouts[section]:.0f}s")
+            results[section] = _agent_fallback(section, person_id, job_id, f"Timed out after {timeouts[section]:.0f}s")
+        except Exception as e:
+            print(f"❌ {section} failed: {e}")
+            results[section] = _agent_fallback(section, person_id, job_id, str(e))
+
+    # Don't block on agents that timed out; their threads finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+    print(f"⏱️ Agents finished in {time.monotonic() - started:.1f}s")
+    return results
+
+def run_orch(person_id: str, job_id: str, use_cache: bool = True, concurrent: bool = False,
+             timeouts: dict = None, on_token=None, agents: dict = None):
+    """Run all agents for a (person, job) pair and save the merged report.
+
+    concurrent=True runs the agents in parallel with per-agent timeouts; a failing
+    agent yields an error placeholder instead of aborting the whole run.
+    on_token(section, chunk) streams "career_summary", "ai_insights" and the raw
+    "behavioral_analysis" JSON as they are generated.
+    agents reuses prebuilt agents (see build_agents) instead of constructing new ones.
+    """
+    agents = agents or {}
+    # --- Load JD Info ---
+    job_info = get_store(DATA_DIR).job(job_id, {})
+
+    if concurrent:
+        results = _run_agents_concurrently(
+            person_id, job_id, use_cache=use_cache, timeouts=timeouts, on_token=on_token, agents=agents
+        )
+        tir = results["tir"]
+        assessment = results["assessment"]
+        behavioral_analysis = results["behavioral_analysis"]
+        market_intel = results["market_intelligence"]
+    else:
+        # A section whose reply stays malformed after its re-query gets a placeholder,
+        # so the other agents' output is still saved
+        def _section(section, fn, *args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except StructuredOutputError as e:
+                print(f"❌ {section} failed: {e}")
+                return _agent_fallback(section, person_id, job_id, str(e))
+
+        # --- Candidate Profiler ---
+        tir = _run_profiler(person_id, job_id, use_cache=use_cache, on_token=on_token, profiler=agents.get("tir"))
+
+        # --- Assessment Designer ---
+        assessment = _section("assessment", _run_assessment, person_id, job_id, use_cache=use_cache,
+                              designer=agents.get("assessment"))
+
+        # --- Behavioral Analyzer ---
+        behavioral_analysis = _section(
+            "behavioral_analysis", _run_behavioral,
+            person_id, use_cache=use_cache, on_token=on_token, behavior_agent=agents.get("behavioral_analysis")
+        )
+
+        # --- Market Intelligence & Sourcing Optimizer (NEW) ---
+        market_intel = _section("market_intelligence", _run_market, job_id, use_cache=use_cache,
+                                market_agent=agents.get("market_intelligence"))
 
     # --- Merge Results ---
     orchestrated_output = {
@@ -72,11 +184,19 @@ def run_orch(person_id: str, job_id: str):
         "market_intelligence": market_intel  # NEW
     }
 
-    # --- Save to file ---
-    os.makedirs(REPORT_DIR, exist_ok=True)
-    out_path = os.path.join(REPORT_DIR, f"{person_id}_{job_id}_orchestrated.json")
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(orchestrated_output, f, indent=2)
+    # --- Save to file (or append to the report archive) ---
+    archive = get_archive()
+    if archive is not None:
+        archive.put("orchestrated", person_id, job_id, orchestrated_output)
+        out_path = archive.directory
+    else:
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        out_path = report_path(person_id, job_id)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(orchestrated_output, f, indent=2)
+    db = get_db()
+    if db is not None:
+        db.save_report("orchestrated", person_id, job_id, orchestrated_output)
 
     print(f"✅ Orchestration complete. Saved: {out_path}")
     return orchestrated_output
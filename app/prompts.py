@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import threading
+from collections import defaultdict
+from typing import Optional
+
+# Contact details never help the model and cost tokens (URLs and nulls are dropped separately)
+PII_KEYS = {"phone", "email", "social_profiles"}
+
+# Per-prompt input token budgets; PROMPT_TOKEN_BUDGET overrides all of them
+TOKEN_BUDGETS = {
+    "profiler.job_comparison": 3000,
+    "profiler.career_summary": 2000,
+    "profiler.insights": 3500,
+    "assessment": 3000,
+    "behavioral": 2000,
+    "behavioral.batch": 6000,
+    "market": 1500,
+}
+
+_URL = re.compile(r"^\s*(https?://|www\.)", re.IGNORECASE)
+
+# Running totals per prompt name: prompts built, estimated tokens sent, tokens saved
+TOKEN_STATS = defaultdict(lambda: {"prompts": 0, "tokens": 0, "saved": 0, "trimmed": 0})
+_stats_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting and rate limits."""
+    return max(1, len(text) // 4)
+
+
+def prune(value, drop_keys=frozenset()):
+    """Drop the given keys, nulls, empty containers and URL strings, recursively."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            if key in drop_keys:
+                continue
+            item = prune(item, drop_keys)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, (list, tuple)):
+        items = [prune(item, drop_keys) for item in value]
+        return [item for item in items if item is not None and item != "" and item != [] and item != {}]
+    if isinstance(value, str) and _URL.match(value):
+        return None
+    return value
+
+
+def compact(value) -> str:
+    """Minified JSON (no indentation or spaces after separators)."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class PromptBuilder:
+    """Assemble a prompt from fixed text and prioritized data sections within a token budget.
+
+    Data sections are pruned and serialized compactly. If the prompt is still over budget,
+    the lowest-priority sections are trimmed first (list tails, then long text, then the
+    whole section). Savings against the old indent=2 serialization are logged.
+    """
+
+    def __init__(self, name: str, budget: Optional[int] = None):
+        self.name = name
+        env_budget = os.getenv("PROMPT_TOKEN_BUDGET")
+        self.budget = budget or (int(env_budget) if env_budget else TOKEN_BUDGETS.get(name))
+        self.parts = []
+
+    def text(self, text: str):
+        self.parts.append({"text": text})
+        return self
+
+    def data(self, label: str, value, priority: int = 50, drop_keys=PII_KEYS):
+        self.parts.append({
+            "label": label,
+            "raw": value,
+            "value": prune(value, frozenset(drop_keys)) if not isinstance(value, str) else value,
+            "priority": priority,
+        })
+        return self
+
+    @staticmethod
+    def _render_part(part) -> str:
+        if "text" in part:
+            return part["text"]
+        value = part["value"]
+        return f"{part['label']}: {value if isinstance(value, str) else compact(value)}"
+
+    def _render(self) -> str:
+        return "\n".join(self._render_part(p) for p in self.parts)
+
+    def _baseline(self) -> str:
+        """What the same prompt used to cost: raw data dumped with indent=2."""
+        lines = []
+        for part in self.parts:
+            if "text" in part:
+                lines.append(part["text"])
+            else:
+                raw = part["raw"]
+                lines.append(f"{part['label']}: {raw if isinstance(raw, str) else json.dumps(raw, indent=2)}")
+        return "\n".join(lines)
+
+    def _fit(self) -> bool:
+        """Trim lowest-priority data until the prompt fits the budget; returns True if anything was cut."""
+        overshoot = estimate_tokens(self._render()) - self.budget
+        if overshoot <= 0:
+            return False
+        for part in sorted((p for p in self.parts if "label" in p), key=lambda p: p["priority"]):
+            value = part["value"]
+            if isinstance(value, list):
+                while value and overshoot > 0:
+                    overshoot -= estimate_tokens(compact(value.pop())) + 1
+                if not value and overshoot > 0:
+                    self.parts.remove(part)
+            elif isinstance(value, str) and len(value) > 400:
+                keep = max(200, len(value) - overshoot * 4)
+                overshoot -= estimate_tokens(value[keep:])
+                part["value"] = value[:keep].rsplit(" ", 1)[0] + " ..."
+            else:
+                overshoot -= estimate_tokens(self._render_part(part))
+                self.parts.remove(part)
+            if overshoot <= 0:
+                break
+        return True
+
+    def build(self) -> str:
+        baseline_tokens = estimate_tokens(self._baseline())
+        trimmed = self._fit() if self.budget else False
+        prompt = self._render()
+        tokens = estimate_tokens(prompt)
+        saved = max(0, baseline_tokens - tokens)
+
+        with _stats_lock:
+            stats = TOKEN_STATS[self.name]
+            stats["prompts"] += 1
+            stats["tokens"] += tokens
+            stats["saved"] += saved
+            stats["trimmed"] += int(trimmed)
+        note = f", trimmed to {self.budget} budget" if trimmed else ""
+        print(f"🧮 {self.name}: ~{tokens} tokens (~{saved} saved vs indent=2{note})")
+        return prompt
@@ -0,0 +1,286 @@
+"""Persisted bank of generated assessment questions.
+
+Usage (from the repo root):
+    python -m app.question_bank stats
+    python -m app.question_bank list --job JD001
+    python -m app.question_bank list --topic "Dynamic Programming"
+
+Every generated problem is stored once (near-identical titles are skipped) and
+tagged with its difficulty, the strengths it covers and the JD it was written for,
+so AssessmentDesigner can assemble packages from the bank and only generate gaps.
+"""
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional
+from app.skills import canonical_skills
+
+DEFAULT_BANK_PATH = Path(__file__).parent.parent / "data" / "question_bank.sqlite3"
+
+# Slots of an assessment package: DSA problems on the candidate's strengths, then one JD problem
+DSA_SLOTS = 2
+JD_SLOTS = 1
+DSA_DIFFICULTIES = ("Easy", "Medium")
+JD_DIFFICULTY = "Hard"
+
+# Words that don't distinguish one problem title from another
+_TITLE_STOPWORDS = {"a", "an", "the", "of", "in", "on", "for", "to", "and", "with", "problem", "challenge",
+                    "question", "task", "exercise"}
+NEAR_DUPLICATE_JACCARD = 0.8
+
+# Share of a banked DSA problem's topics that must be among the candidate's strengths
+MIN_TOPIC_OVERLAP = 0.5
+
+
+def normalize_difficulty(value) -> str:
+    value = str(value or "").strip().capitalize()
+    return value if value in ("Easy", "Medium", "Hard") else "Medium"
+
+
+def title_tokens(title: str) -> frozenset:
+    return frozenset(t for t in re.findall(r"[a-z0-9]+", str(title).lower()) if t not in _TITLE_STOPWORDS)
+
+
+def title_key(title: str) -> str:
+    """Order-, case- and punctuation-insensitive form of a title ("Two-Sum Problem" == "two sum")."""
+    return " ".join(sorted(title_tokens(title)))
+
+
+def is_near_duplicate(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= NEAR_DUPLICATE_JACCARD
+
+
+def strength_signature(strengths) -> str:
+    """Canonical, order-independent key of a LeetCode strengths list."""
+    return "|".join(sorted(set(canonical_skills(strengths))))
+
+
+def topic_overlap(topics, wanted: set) -> float:
+    """Share of a problem's topics that are among the wanted strengths."""
+    topics = set(topics)
+    return len(topics & wanted) / len(topics) if topics else 0.0
+
+
+def signature_similarity(signature: str, wanted: set) -> float:
+    """Jaccard similarity of a stored strength signature and a strengths set."""
+    stored = set(filter(None, (signature or "").split("|")))
+    return len(stored & wanted) / len(stored | wanted) if stored or wanted else 1.0
+
+
+class QuestionBank:
+    """SQLite-backed question store: one row per problem, topics in a side table for lookups."""
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self.path = Path(path or DEFAULT_BANK_PATH).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,              -- 'dsa' or 'jd'
+                title TEXT NOT NULL,
+                title_key TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                job_id TEXT NOT NULL,            -- source JD ('' when generated without one)
+                signature TEXT NOT NULL,         -- strength signature of the candidate it was generated for
+                doc TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_questions_kind_job ON questions(kind, job_id);
+            CREATE INDEX IF NOT EXISTS idx_questions_title_key ON questions(title_key);
+            CREATE TABLE IF NOT EXISTS question_topics (
+                question_id INTEGER NOT NULL,
+                topic TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_question_topics_topic ON question_topics(topic);
+            CREATE TABLE IF NOT EXISTS question_tokens (  -- title tokens, to find near-duplicate candidates
+                question_id INTEGER NOT NULL,
+                token TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_question_tokens_token ON question_tokens(token);
+            """
+        )
+        self._conn.commit()
+
+    # ---------- writes ----------
+    def _find_duplicate(self, kind: str, job_id: str, tokens: frozenset) -> Optional[int]:
+        """Id of a banked problem with a near-identical title, if any.
+
+        Jaccard >= NEAR_DUPLICATE_JACCARD needs at least that share of this title's
+        tokens in common, so only problems sharing that many indexed tokens are compared.
+        """
+        scope = "q.kind = ? AND q.job_id = ?" if kind == "jd" else "q.kind = ?"
+        params = (kind, job_id) if kind == "jd" else (kind,)
+        if not tokens:
+            row = self._conn.execute(f"SELECT q.id FROM questions q WHERE {scope} AND q.title_key = ''", params).fetchone()
+            return row[0] if row else None
+        shared = math.ceil(NEAR_DUPLICATE_JACCARD * len(tokens) - 1e-9)
+        marks = ",".join("?" * len(tokens))
+        rows = self._conn.execute(
+            f"SELECT q.id, q.title_key FROM question_tokens t JOIN questions q ON q.id = t.question_id "
+            f"WHERE t.token IN ({marks}) AND {scope} GROUP BY q.id HAVING COUNT(*) >= ? ORDER BY q.id",
+            (*sorted(tokens), *params, shared),
+        )
+        for question_id, key in rows:
+            if is_near_duplicate(tokens, frozenset(key.split())):
+                return question_id
+        return None
+
+    def add(self, question: dict, kind: str, topics, job_id: Optional[str] = None, signature: str = "") -> int:
+        """Store a problem; returns its id (the existing one when a near-identical title is already banked)."""
+        job_id = job_id or ""
+        tokens = title_tokens(question.get("title", ""))
+        difficulty = normalize_difficulty(question.get("difficulty"))
+        with self._lock:
+            existing = self._find_duplicate(kind, job_id, tokens)
+            if existing is not None:
+                return existing
+            cur = self._conn.execute(
+                "INSERT INTO questions (kind, title, title_key, difficulty, job_id, signature, doc, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, question.get("title", ""), title_key(question.get("title", "")), difficulty, job_id, signature,
+                 json.dumps({**question, "difficulty": difficulty}, ensure_ascii=False), time.time()),
+            )
+            question_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO question_topics VALUES (?, ?)",
+                [(question_id, topic) for topic in sorted(set(canonical_skills(topics)))],
+            )
+            self._conn.executemany("INSERT INTO question_tokens VALUES (?, ?)",
+                                   [(question_id, token) for token in sorted(tokens)])
+            self._conn.commit()
+            return question_id
+
+    # ---------- reads ----------
+    def _rows(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"id": r[0], "kind": r[1], "title": r[2], "title_key": r[3], "difficulty": r[4],
+                 "job_id": r[5] or None, "question": json.loads(r[6]), "topics": r[7].split("\t") if r[7] else [],
+                 "signature": r[8]}
+                for r in rows]
+
+    _SELECT = ("SELECT q.id, q.kind, q.title, q.title_key, q.difficulty, q.job_id, q.doc, "
+               "(SELECT group_concat(topic, char(9)) FROM question_topics WHERE question_id = q.id), q.signature "
+               "FROM questions q")
+
+    def dsa_questions(self, strengths) -> list:
+        """Easy/Medium DSA problems relevant to the given strengths, most relevant first.
+
+        A problem qualifies when at least MIN_TOPIC_OVERLAP of its topics are among the
+        strengths. Ranking: share of its topics covered, then how close the profile it
+        was generated for (its strength signature) is to this one, then easier, older.
+        """
+        topics = sorted(set(canonical_skills(strengths)))
+        if not topics:
+            return []
+        wanted = set(topics)
+        marks = ",".join("?" * len(topics))
+        rows = self._rows(
+            f"{self._SELECT} WHERE q.kind = 'dsa' AND q.difficulty IN (?, ?) AND q.id IN "
+            f"(SELECT question_id FROM question_topics WHERE topic IN ({marks})) ORDER BY q.id",
+            (*DSA_DIFFICULTIES, *topics),
+        )
+        scored = []
+        for q in rows:
+            overlap = topic_overlap(q["topics"], wanted)
+            if overlap >= MIN_TOPIC_OVERLAP:
+                scored.append(((-overlap, -signature_similarity(q["signature"], wanted),
+                                DSA_DIFFICULTIES.index(q["difficulty"]), q["id"]), q))
+        return [q for _, q in sorted(scored, key=lambda x: x[0])]
+
+    def jd_questions(self, job_id: Optional[str]) -> list:
+        return self._rows(f"{self._SELECT} WHERE q.kind = 'jd' AND q.job_id = ? ORDER BY q.id", (job_id or "",))
+
+    def assemble(self, strengths, job_id: Optional[str]) -> tuple:
+        """(dsa, jd) bank entries for a package, deterministic for a given bank state.
+
+        DSA picks cover as many distinct strengths as possible, most relevant first (see
+        dsa_questions); no two picks have near-identical titles. Either list may be short of its slot count.
+        """
+        wanted = set(canonical_skills(strengths))
+        candidates = self.dsa_questions(strengths)
+        dsa, covered = [], set()
+        while len(dsa) < DSA_SLOTS:
+            taken = [frozenset(q["title_key"].split()) for q in dsa]
+            options = [q for q in candidates if q not in dsa
+                       and not any(is_near_duplicate(frozenset(q["title_key"].split()), t) for t in taken)]
+            if not options:
+                break
+            # Prefer a problem on a strength no earlier pick covers
+            dsa.append(max(options, key=lambda q: len((set(q["topics"]) & wanted) - covered)))
+            covered |= set(dsa[-1]["topics"])
+        jd = self.jd_questions(job_id)[:JD_SLOTS]
+        return dsa, jd
+
+    def titles(self, strengths, job_id: Optional[str]) -> list:
+        """Titles already banked for this candidate profile and JD (to steer generation away from them)."""
+        return [q["title"] for q in self.dsa_questions(strengths)] + [q["title"] for q in self.jd_questions(job_id)]
+
+    def find(self, job_id: Optional[str] = None, topic: Optional[str] = None) -> list:
+        if topic:
+            topic = canonical_skills([topic])[0]
+            return self._rows(f"{self._SELECT} WHERE q.id IN "
+                              "(SELECT question_id FROM question_topics WHERE topic = ?) ORDER BY q.id", (topic,))
+        if job_id:
+            return self._rows(f"{self._SELECT} WHERE q.job_id = ? ORDER BY q.id", (job_id,))
+        return self._rows(f"{self._SELECT} ORDER BY q.id")
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_kind = dict(self._conn.execute("SELECT kind, COUNT(*) FROM questions GROUP BY kind").fetchall())
+            by_difficulty = dict(self._conn.execute(
+                "SELECT difficulty, COUNT(*) FROM questions GROUP BY difficulty").fetchall())
+            jobs = self._conn.execute("SELECT COUNT(DISTINCT job_id) FROM questions WHERE kind = 'jd'").fetchone()[0]
+            topics = self._conn.execute("SELECT COUNT(DISTINCT topic) FROM question_topics").fetchone()[0]
+        return {"questions": sum(by_kind.values()), "by_kind": by_kind, "by_difficulty": by_difficulty,
+                "jobs": jobs, "topics": topics}
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """Shared bank (QUESTION_BANK_PATH); None when QUESTION_BANK_DISABLED=1."""
+    global _bank
+    if os.getenv("QUESTION_BANK_DISABLED") == "1":
+        return None
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank(os.getenv("QUESTION_BANK_PATH") or None)
+        return _bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the assessment question bank.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    p_list = sub.add_parser("list")
+    p_list.add_argument("--job")
+    p_list.add_argument("--topic")
+    args = parser.parse_args()
+
+    bank = QuestionBank(os.getenv("QUESTION_BANK_PATH") or None)
+    if args.command == "stats":
+        print(json.dumps(bank.stats(), indent=2))
+    else:
+        for q in bank.find(args.job, args.topic):
+            print(f"{q['id']:>5}  {q['kind']:<3}  {q['difficulty']:<6}  {q['job_id'] or '-':<8}  "
+                  f"{q['title']}  [{', '.join(q['topics'])}]")
+
+
+if __name__ == "__main__":
+    main()
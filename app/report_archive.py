@@ -0,0 +1,279 @@
+"""Append-only, compressed archive for TIR and orchestrated reports.
+
+Usage (from the repo root):
+    python -m app.report_archive import             # existing report files -> archive
+    python -m app.report_archive export OUT_DIR     # archive -> TIR_*.json / *_orchestrated.json
+    python -m app.report_archive stats
+
+Reports are zlib-compressed frames appended to segment files; a key index maps
+(kind, person_id, job_id) to the latest frame, so lookups are a dict hit plus one
+read. An orchestrated report doesn't repeat its TIR: it points at the TIR frame.
+Set REPORT_STORE=archive to make generate_tir and run_orch write here instead of
+one JSON file per pair.
+"""
+import os
+import json
+import zlib
+import time
+import struct
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional
+from app.catalog import REPORT_KINDS, parse_report_filename, report_filename
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ARCHIVE_DIR = ROOT / "talent-intelligence-report" / "archive"
+
+# Frame: key length (uint16), payload length (uint32), key (utf-8), zlib(JSON)
+_HEADER = struct.Struct(">HI")
+_REF = "$archive_ref"
+
+
+def _key(kind: str, person_id: str, job_id: Optional[str]) -> str:
+    if kind not in REPORT_KINDS and kind != "blob":
+        raise ValueError(f"❌ Unknown report kind {kind!r}, expected one of {REPORT_KINDS}")
+    return f"{kind}\t{person_id}\t{job_id or ''}"
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class ReportArchive:
+    """Segment files + an append-only key index; one writer process at a time."""
+
+    def __init__(self, directory: Optional[str | Path] = None, max_segment_bytes: int = 64 * 1024 * 1024,
+                 level: int = 6):
+        self.directory = Path(directory or DEFAULT_ARCHIVE_DIR).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.log"
+        self.max_segment_bytes = max_segment_bytes
+        self.level = level
+        self._lock = threading.Lock()
+        # key -> (segment, offset, length, digest, saved_at), kept in storage order of each key's latest frame
+        self.index = {}
+        self._load_index()
+
+    # ---------- index ----------
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment-{segment:06d}.seg"
+
+    def _segments(self) -> list:
+        return sorted(int(p.stem.split("-")[1]) for p in self.directory.glob("segment-*.seg"))
+
+    def _load_index(self):
+        indexed_end = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 8:
+                        continue  # a line cut short by a crash
+                    kind, person_id, job_id, segment, offset, length, digest, saved_at = parts
+                    entry = (int(segment), int(offset), int(length), digest, float(saved_at))
+                    self._set(f"{kind}\t{person_id}\t{job_id}", entry)
+                    indexed_end[entry[0]] = max(indexed_end.get(entry[0], 0), entry[1] + entry[2])
+
+        # Frames written after the last index line (e.g. a crash in between) are re-indexed
+        for segment in self._segments():
+            path = self._segment_path(segment)
+            if path.stat().st_size > indexed_end.get(segment, 0):
+                self._reindex(segment, indexed_end.get(segment, 0))
+
+    def _reindex(self, segment: int, start: int):
+        path = self._segment_path(segment)
+        recovered = []
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                key_len, payload_len = _HEADER.unpack(header)
+                key = f.read(key_len).decode("utf-8")
+                payload = f.read(payload_len)
+                if len(payload) < payload_len:
+                    break  # torn write at the end of the segment
+                length = _HEADER.size + key_len + payload_len
+                entry = (segment, offset, length, _digest(payload), path.stat().st_mtime)
+                self._set(key, entry)
+                recovered.append((key, entry))
+                offset += length
+        if recovered:
+            print(f"♻️ Re-indexed {len(recovered)} archive frames from {path.name}")
+            self._append_index(recovered)
+
+    def _set(self, key: str, entry: tuple):
+        # Re-inserted so the dict's order stays the storage order of the latest frames
+        self.index.pop(key, None)
+        self.index[key] = entry
+
+    def _append_index(self, entries):
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            for key, (segment, offset, length, digest, saved_at) in entries:
+                f.write(f"{key}\t{segment}\t{offset}\t{length}\t{digest}\t{saved_at:.3f}\n")
+
+    # ---------- frames ----------
+    def _append(self, key: str, document) -> tuple:
+        """Write one frame and index it; returns its index entry."""
+        payload = zlib.compress(json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                                self.level)
+        key_bytes = key.encode("utf-8")
+        frame = _HEADER.pack(len(key_bytes), len(payload)) + key_bytes + payload
+
+        segments = self._segments()
+        segment = segments[-1] if segments else 1
+        path = self._segment_path(segment)
+        if path.exists() and path.stat().st_size + len(frame) > self.max_segment_bytes:
+            segment += 1
+            path = self._segment_path(segment)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(frame)
+        entry = (segment, offset, len(frame), _digest(payload), time.time())
+        self._set(key, entry)
+        self._append_index([(key, entry)])
+        return entry
+
+    def _read(self, segment: int, offset: int, length: int):
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            frame = f.read(length)
+        key_len, payload_len = _HEADER.unpack_from(frame)
+        return json.loads(zlib.decompress(frame[_HEADER.size + key_len:]))
+
+    def _hydrate(self, report):
+        """Replace the TIR reference inside an orchestrated report with the TIR itself."""
+        tir = report.get("tir") if isinstance(report, dict) else None
+        if isinstance(tir, dict) and _REF in tir:
+            segment, offset, length = tir[_REF]
+            report["tir"] = self._read(segment, offset, length)
+        return report
+
+    # ---------- main ----------
+    def put(self, kind: str, person_id: str, job_id: Optional[str], report: dict):
+        """Append a report. An orchestrated report's TIR is stored once and referenced."""
+        with self._lock:
+            if kind == "orchestrated" and isinstance(report.get("tir"), dict):
+                tir_key = _key("tir", person_id, job_id)
+                tir_bytes = zlib.compress(
+                    json.dumps(report["tir"], separators=(",", ":"), ensure_ascii=False).encode("utf-8"), self.level
+                )
+                entry = self.index.get(tir_key)
+                if entry is None or entry[3] != _digest(tir_bytes):
+                    # Not the TIR the profiler saved for this pair: keep it as its own blob
+                    entry = self._append(_key("blob", person_id, job_id), report["tir"])
+                report = {**report, "tir": {_REF: list(entry[:3])}}
+            self._append(_key(kind, person_id, job_id), report)
+
+    def get(self, kind: str, person_id: str, job_id: Optional[str], default=None):
+        entry = self.index.get(_key(kind, person_id, job_id))
+        if entry is None:
+            return default
+        return self._hydrate(self._read(*entry[:3]))
+
+    def saved_at(self, kind: str, person_id: str, job_id: Optional[str]) -> Optional[float]:
+        entry = self.index.get(_key(kind, person_id, job_id))
+        return entry[4] if entry else None
+
+    def __contains__(self, item):
+        kind, person_id, job_id = item
+        return _key(kind, person_id, job_id) in self.index
+
+    def __len__(self):
+        return sum(1 for key in self.index if not key.startswith("blob\t"))
+
+    def keys(self, kind: Optional[str] = None):
+        """Yield (kind, person_id, job_id) of every stored report, in storage order."""
+        for key in list(self.index):  # snapshot of the keys only, so puts during iteration are safe
+            if key.startswith("blob\t") or (kind is not None and not key.startswith(kind + "\t")):
+                continue
+            k, person_id, job_id = key.split("\t")
+            yield k, person_id, job_id or None
+
+    def iter(self, kind: Optional[str] = None):
+        """Stream ((kind, person_id, job_id), report) pairs, reading segments sequentially."""
+        for key in self.keys(kind):
+            yield key, self.get(*key)
+
+    # ---------- migration ----------
+    def import_dir(self, report_dir: str | Path) -> int:
+        """Archive every TIR and orchestrated JSON file in a directory (TIRs first, so they dedupe)."""
+        files = sorted(Path(report_dir).glob("*.json"), key=lambda p: not p.name.startswith("TIR_"))
+        count = 0
+        for path in files:
+            parsed = parse_report_filename(path.name)
+            if not parsed:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                print(f"⚠️ Skipping unreadable report {path.name}")
+                continue
+            self.put(*parsed, report)
+            count += 1
+        return count
+
+    def export(self, out_dir: str | Path, kind: Optional[str] = None) -> int:
+        """Write reports back out in the per-pair JSON layout (indent=2)."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for (k, person_id, job_id), report in self.iter(kind):
+            with open(out_dir / report_filename(k, person_id, job_id), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            count += 1
+        return count
+
+    def stats(self) -> dict:
+        segments = self._segments()
+        return {
+            "reports": len(self),
+            "tir": sum(1 for key in self.index if key.startswith("tir\t")),
+            "orchestrated": sum(1 for key in self.index if key.startswith("orchestrated\t")),
+            "segments": len(segments),
+            "bytes": sum(self._segment_path(s).stat().st_size for s in segments),
+        }
+
+
+_archive: Optional[ReportArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[ReportArchive]:
+    """The shared archive when REPORT_STORE=archive (directory from REPORT_ARCHIVE_DIR), otherwise None."""
+    global _archive
+    if os.getenv("REPORT_STORE", "json").lower() != "archive":
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = ReportArchive(os.getenv("REPORT_ARCHIVE_DIR") or None)
+        return _archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed, indexed archive of TIR and orchestrated reports.")
+    parser.add_argument("--archive", help="Archive directory (default: REPORT_ARCHIVE_DIR or talent-intelligence-report/archive)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Archive existing report files")
+    p_import.add_argument("--report-dir", default=str(ROOT / "talent-intelligence-report"))
+    p_export = sub.add_parser("export", help="Write the archive out as per-pair JSON files")
+    p_export.add_argument("out_dir")
+    p_export.add_argument("--kind", choices=REPORT_KINDS)
+    sub.add_parser("stats", help="Report counts and archive size")
+    args = parser.parse_args()
+
+    archive = ReportArchive(args.archive or os.getenv("REPORT_ARCHIVE_DIR") or None)
+    if args.command == "import":
+        print(f"✅ Archived {archive.import_dir(args.report_dir)} reports from {args.report_dir}")
+    elif args.command == "export":
+        print(f"✅ Exported {archive.export(args.out_dir, args.kind)} reports to {args.out_dir}")
+    print(f"📦 {archive.directory}: {archive.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Mergeable salary quantile sketches per (role, location, seniority) and time bucket.
+
+Usage (from the repo root):
+    python -m app.salary_sketch ingest observations.ndjson     # {"role", "location", "seniority", "salary_inr_lpa", "observed_at"}
+    python -m app.salary_sketch ingest-snapshot                # data/market_intelligence.json samples, dated updated_at
+    python -m app.salary_sketch query "Backend Engineer" "Hyderabad, IN" Mid --start 2025-01 --end 2025-12
+    python -m app.salary_sketch trend "Backend Engineer" "Hyderabad, IN" Mid
+
+Observations are folded into KLL sketches instead of being stored, so memory per
+(cell, bucket) stays at O(k log(n / k)) however many salaries arrive. Sketches of
+the buckets in a time window are merged to answer percentile queries over it.
+"""
+import os
+import re
+import json
+import math
+import argparse
+import calendar
+import threading
+import numpy as np
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from app.ingest import iter_records
+from app.market_index import PERCENTILES, market_key
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SKETCH_PATH = ROOT / "data" / "salary_sketches.json"
+BUCKETS = ("day", "week", "month")
+_WEEK_LABEL = re.compile(r"^(\d{4})-W(\d{1,2})$", re.IGNORECASE)
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang & Liberty): a stack of compactors where
+    level h holds items of weight 2**h. Compaction alternates which half it keeps,
+    so results are deterministic. Rank error is roughly 1.7 / k.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3):
+        self.k = k
+        self.c = c
+        self.compactors = [[]]
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._flip = 0
+        self._size = 0  # items retained across all levels
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        while self._size >= self._max_size:
+            for h, items in enumerate(self.compactors):
+                if len(items) >= self._capacity(h):
+                    if h + 1 == len(self.compactors):
+                        self._grow()
+                    items.sort()
+                    keep = items.pop() if len(items) % 2 else None  # odd one out stays at this level
+                    self.compactors[h + 1].extend(items[self._flip::2])
+                    self._flip ^= 1
+                    self._size -= len(items) // 2
+                    items[:] = [] if keep is None else [keep]
+                    break
+
+    def update(self, value: float):
+        value = float(value)
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values):
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold another sketch into this one (in place) and return self."""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self._size += other._size
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> list:
+        """Approximate quantiles (0..1), interpolated between retained items; exact while nothing has been compacted."""
+        if self.count == 0:
+            return [None for _ in qs]
+        values = np.concatenate([np.asarray(items, dtype=float) for items in self.compactors])
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.compactors)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # Weighted analogue of np.percentile's linear method: item i sits at rank midpoint of its weight
+        ranks = np.cumsum(weights) - weights / 2
+        total = weights.sum()
+        if len(values) == 1:
+            return [float(values[0]) for _ in qs]
+        positions = [(q * (total - weights[0] / 2 - weights[-1] / 2) + weights[0] / 2) for q in qs]
+        return [float(np.interp(p, ranks, values)) for p in positions]
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def __len__(self):
+        return self.count
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "c": self.c, "count": self.count, "min": self.min, "max": self.max,
+                "flip": self._flip, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KLLSketch":
+        sketch = cls(k=data["k"], c=data["c"])
+        sketch.compactors = [list(items) for items in data["compactors"]] or [[]]
+        sketch._size = sum(len(items) for items in sketch.compactors)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch.count = data["count"]
+        sketch.min = data["min"] if data["count"] else math.inf
+        sketch.max = data["max"] if data["count"] else -math.inf
+        sketch._flip = data.get("flip", 0)
+        return sketch
+
+
+def time_bucket(observed_at, bucket: str = "month") -> str:
+    """'2025-08' (month), '2025-W32' (ISO week) or '2025-08-10' (day) for a date or ISO date string."""
+    if isinstance(observed_at, str):
+        observed_at = datetime.fromisoformat(observed_at[:10]).date()
+    elif isinstance(observed_at, datetime):
+        observed_at = observed_at.date()
+    elif not isinstance(observed_at, date):
+        raise ValueError(f"❌ Unsupported observation date: {observed_at!r}")
+    if bucket == "month":
+        return f"{observed_at.year:04d}-{observed_at.month:02d}"
+    if bucket == "week":
+        year, week, _ = observed_at.isocalendar()
+        return f"{year:04d}-W{week:02d}"
+    if bucket == "day":
+        return observed_at.isoformat()
+    raise ValueError(f"❌ Unknown bucket {bucket!r}, expected one of {BUCKETS}")
+
+
+def bucket_range(label) -> tuple:
+    """(first_day, last_day) a bucket label or window bound covers: '2025', '2025-08', '2025-W32' or '2025-08-10'."""
+    if isinstance(label, datetime):
+        label = label.date()
+    if isinstance(label, date):
+        return label, label
+    text = str(label).strip()
+    try:
+        week = _WEEK_LABEL.match(text)
+        if week:
+            first = date.fromisocalendar(int(week[1]), int(week[2]), 1)
+            return first, first + timedelta(days=6)
+        parts = [int(p) for p in text.split("-")]
+        if len(parts) == 1:
+            return date(parts[0], 1, 1), date(parts[0], 12, 31)
+        if len(parts) == 2:
+            return date(parts[0], parts[1], 1), date(parts[0], parts[1], calendar.monthrange(*parts)[1])
+        if len(parts) == 3:
+            return date(*parts), date(*parts)
+    except ValueError:
+        pass
+    raise ValueError(f"❌ Unrecognized time bucket {label!r}, expected e.g. 2025, 2025-08, 2025-W32 or 2025-08-10")
+
+
+class SalarySketchStore:
+    """(role, location, seniority) -> time bucket -> KLLSketch, persisted as one JSON file."""
+
+    def __init__(self, path: Optional[str | Path] = None, bucket: str = "month", k: int = 200):
+        if bucket not in BUCKETS:
+            raise ValueError(f"❌ Unknown bucket {bucket!r}, expected one of {BUCKETS}")
+        self.path = Path(path or DEFAULT_SKETCH_PATH).resolve()
+        self.bucket = bucket
+        self.k = k
+        self.cells = {}   # normalized key -> {bucket: KLLSketch}
+        self.labels = {}  # normalized key -> (role, location, seniority) as first seen
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("bucket") != self.bucket:
+            print(f"⚠️ {self.path.name} uses {saved.get('bucket')!r} buckets, not {self.bucket!r}; using the saved ones")
+            self.bucket = saved.get("bucket", self.bucket)
+        for cell in saved.get("cells", []):
+            key = market_key(*cell["label"])
+            self.labels[key] = tuple(cell["label"])
+            self.cells[key] = {b: KLLSketch.from_dict(s) for b, s in cell["buckets"].items()}
+
+    def save(self):
+        with self._lock:
+            data = {
+                "bucket": self.bucket,
+                "cells": [
+                    {"label": list(self.labels[key]), "buckets": {b: s.to_dict() for b, s in sorted(buckets.items())}}
+                    for key, buckets in self.cells.items()
+                ],
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    # ---------- ingestion ----------
+    def add(self, role: str, location: str, seniority: str, salary: float, observed_at):
+        key = market_key(role, location, seniority)
+        bucket = time_bucket(observed_at, self.bucket)
+        with self._lock:
+            self.labels.setdefault(key, (role, location, seniority))
+            buckets = self.cells.setdefault(key, {})
+            sketch = buckets.get(bucket)
+            if sketch is None:
+                sketch = buckets[bucket] = KLLSketch(self.k)
+            sketch.update(salary)
+
+    def ingest(self, observations) -> int:
+        """Add {"role", "location", "seniority", "salary_inr_lpa", "observed_at"} records (any iterable)."""
+        count = 0
+        for obs in observations:
+            try:
+                self.add(obs["role"], obs["location"], obs["seniority"], float(obs["salary_inr_lpa"]), obs["observed_at"])
+                count += 1
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ Skipping observation {obs!r}: {e}")
+        return count
+
+    def ingest_snapshot(self, market_data: dict) -> int:
+        """Add every salary sample of a market_intelligence.json snapshot, dated its updated_at."""
+        observed_at = market_data.get("updated_at") or date.today().isoformat()
+        count = 0
+        for row in market_data.get("roles", []):
+            for salary in row.get("salary_samples_inr_lpa", []):
+                self.add(row.get("role", ""), row.get("location", ""), row.get("seniority", ""), float(salary), observed_at)
+                count += 1
+        return count
+
+    # ---------- queries ----------
+    def _window(self, key, start: Optional[str], end: Optional[str]) -> list:
+        """(bucket, sketch) pairs of a cell overlapping [start, end], in date order.
+
+        Bounds may use any bucket format (see bucket_range), so a month window works
+        on week or day buckets too; a week straddling a bound is included.
+        """
+        first_day = bucket_range(start)[0] if start else None
+        last_day = bucket_range(end)[1] if end else None
+        window = []
+        for bucket, sketch in self.cells.get(key, {}).items():
+            first, last = bucket_range(bucket)
+            if (first_day is None or last >= first_day) and (last_day is None or first <= last_day):
+                window.append((first, bucket, sketch))
+        return [(bucket, sketch) for _, bucket, sketch in sorted(window, key=lambda item: item[0])]
+
+    def percentiles(self, role: str, location: str, seniority: str, start: Optional[str] = None,
+                    end: Optional[str] = None, percentiles=PERCENTILES) -> dict:
+        """Percentiles of every observation in the time window (bucket labels, inclusive)."""
+        merged = KLLSketch(self.k)
+        with self._lock:
+            for _, sketch in self._window(market_key(role, location, seniority), start, end):
+                merged.merge(sketch)  # reads `sketch`, only `merged` changes
+        values = merged.quantiles([p / 100 for p in percentiles])
+        result = {f"p{p}": (round(v, 2) if v is not None else None) for p, v in zip(percentiles, values)}
+        result["sample_size"] = merged.count
+        return result
+
+    def trend(self, role: str, location: str, seniority: str, start: Optional[str] = None,
+              end: Optional[str] = None, percentiles=(25, 50, 75)) -> list:
+        """One row per time bucket: {"bucket", "sample_size", "p25", "p50", "p75"}."""
+        rows = []
+        with self._lock:
+            for bucket, sketch in self._window(market_key(role, location, seniority), start, end):
+                values = sketch.quantiles([p / 100 for p in percentiles])
+                rows.append({"bucket": bucket, "sample_size": sketch.count,
+                             **{f"p{p}": round(v, 2) for p, v in zip(percentiles, values)}})
+        return rows
+
+    def buckets(self, role: str, location: str, seniority: str) -> list:
+        with self._lock:
+            return sorted(self.cells.get(market_key(role, location, seniority), {}), key=bucket_range)
+
+    def __contains__(self, item):
+        return market_key(*item) in self.cells
+
+
+_store: Optional[SalarySketchStore] = None
+_store_lock = threading.Lock()
+
+
+def sketch_path() -> Path:
+    return Path(os.getenv("SALARY_SKETCH_PATH") or DEFAULT_SKETCH_PATH).resolve()
+
+
+def open_sketch_store() -> SalarySketchStore:
+    """A store configured from SALARY_SKETCH_PATH, SALARY_SKETCH_BUCKET and SALARY_SKETCH_K."""
+    return SalarySketchStore(
+        sketch_path(),
+        bucket=os.getenv("SALARY_SKETCH_BUCKET", "month"),
+        k=int(os.getenv("SALARY_SKETCH_K", "200")),
+    )
+
+
+def get_sketch_store() -> SalarySketchStore:
+    """Shared store for this process (see open_sketch_store)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = open_sketch_store()
+        return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Salary quantile sketches per market cell and time bucket.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Fold salary observations (JSON array or NDJSON) into the sketches")
+    p_ingest.add_argument("path")
+    p_snapshot = sub.add_parser("ingest-snapshot", help="Fold a market_intelligence.json snapshot into the sketches")
+    p_snapshot.add_argument("path", nargs="?", default=str(ROOT / "data" / "market_intelligence.json"))
+    for name in ("query", "trend"):
+        p = sub.add_parser(name)
+        p.add_argument("role")
+        p.add_argument("location")
+        p.add_argument("seniority")
+        p.add_argument("--start", help="First bucket or date, e.g. 2025-01, 2025-W02 or 2025-01-15")
+        p.add_argument("--end", help="Last bucket or date, e.g. 2025-12")
+    args = parser.parse_args()
+
+    store = get_sketch_store()
+    if args.command == "ingest":
+        print(f"✅ Ingested {store.ingest(iter_records(args.path))} observations")
+        store.save()
+    elif args.command == "ingest-snapshot":
+        with open(args.path, "r", encoding="utf-8") as f:
+            print(f"✅ Ingested {store.ingest_snapshot(json.load(f))} snapshot samples")
+        store.save()
+    elif args.command == "query":
+        print(json.dumps(store.percentiles(args.role, args.location, args.seniority, args.start, args.end), indent=2))
+    else:
+        print(json.dumps(store.trend(args.role, args.location, args.seniority, args.start, args.end), indent=2))
+
+
+if __name__ == "__main__":
+    main()
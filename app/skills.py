@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import Optional
+
+# Canonical skill name -> aliases seen across resumes, LinkedIn, GitHub, LeetCode and JDs.
+# Case, spacing and punctuation differences are handled by skill_key() and trailing
+# qualifiers ("NLP tasks") by canonical_skill(), so aliases only need to cover
+# genuinely different spellings and abbreviations. Short aliases
+# that mean different things in different JDs ("tf", "cv", "pm", "rest", ...) are left
+# out on purpose: an unmatched skill stays distinct, a wrong merge silently mis-scores.
+TAXONOMY = {
+    # Languages
+    "Python": ["py", "python3"],
+    "JavaScript": ["js", "ecmascript"],
+    "TypeScript": [],
+    "C++": ["cpp", "cplusplus"],
+    "C#": ["csharp", "c sharp"],
+    "Go": ["golang"],
+    "SQL": [],
+    "T-SQL": ["transact sql"],
+    "Shell Scripting": ["shell", "bash", "bash scripting"],
+    # ML / AI
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "Reinforcement Learning": [],
+    "Deep Reinforcement Learning": ["deep rl", "drl"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "Large Language Models": ["llm", "llms"],
+    "Hugging Face Transformers": ["hugging face", "huggingface", "hf transformers"],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "TensorFlow": [],
+    "PyTorch": ["torch"],
+    "Pandas": [],
+    "NumPy": [],
+    "Data Visualization": ["data viz", "dataviz"],
+    "Data Science": [],
+    "Data Analysis": ["data analytics"],
+    # Infra / DevOps
+    "AWS": ["amazon web services"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Kubernetes": ["k8s"],
+    "Docker": [],
+    "Terraform": [],
+    "Ansible": [],
+    "CI/CD": ["continuous integration", "continuous delivery", "ci cd"],
+    "PostgreSQL": ["postgres", "psql"],
+    "REST APIs": ["rest api", "restful api", "restful apis"],
+    "Monitoring & Logging": ["monitoring and logging", "observability"],
+    # DSA (LeetCode strengths)
+    "Dynamic Programming": ["dp"],
+    "Data Structures": ["dsa", "data structures and algorithms"],
+    "Arrays": ["array"],
+    "Strings": ["string"],
+    "Graphs": ["graph", "graph algorithms"],
+    "HashMaps": ["hashmap", "hash map", "hash maps", "hash table", "hash tables", "hashing"],
+    "Greedy": ["greedy algorithms"],
+    "Sorting": ["sort"],
+    # Process / management
+    "Agile": [],
+    "Scrum": [],
+    "JIRA": [],
+    "Project Management": [],
+    "Stakeholder Communication": ["stakeholder management"],
+    "Leadership": [],
+    "Mentoring": [],
+}
+
+# Everything except letters, digits, '+' and '#' is dropped so "C++"/"C#" stay distinct from "C"
+_KEY_STRIP = re.compile(r"[^a-z0-9+#]+")
+# Separators of compound entries such as "Python/Shell scripting" or "Leadership & Mentoring"
+_COMPOUND_SPLIT = re.compile(r"\s*(?:/|&|,|;|\band\b)\s*", re.IGNORECASE)
+# Generic qualifiers trailing a skill name, as in "NLP tasks" or "Computer Vision related problems"
+_QUALIFIER_SUFFIX = re.compile(r"[\s-]*\b(?:related|tasks?|problems?|based|concepts|skills?)\s*$", re.IGNORECASE)
+
+
+def skill_key(name: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive lookup key."""
+    return _KEY_STRIP.sub("", str(name).lower())
+
+
+# Precompiled alias index: lookup key -> canonical name
+ALIAS_INDEX = {}
+for _canonical, _aliases in TAXONOMY.items():
+    for _alias in [_canonical, *_aliases]:
+        ALIAS_INDEX.setdefault(skill_key(_alias), _canonical)
+
+
+def _known_key(name: str) -> Optional[str]:
+    """Alias index key of an entry, or None if it isn't in the taxonomy.
+
+    Trailing qualifiers ("related", "tasks", "problems", ...) are dropped one at a time,
+    but only when what is left is a known skill, so unknown names keep their full key.
+    """
+    text = str(name).strip()
+    while True:
+        key = skill_key(text)
+        if key in ALIAS_INDEX:
+            return key
+        stripped = _QUALIFIER_SUFFIX.sub("", text)
+        if not stripped or stripped == text:
+            return None
+        text = stripped
+
+
+@lru_cache(maxsize=4096)
+def canonical_skill(name: str) -> str:
+    """Canonical taxonomy name for a skill, or the trimmed input if it isn't in the taxonomy."""
+    key = _known_key(name)
+    return ALIAS_INDEX[key] if key is not None else str(name).strip()
+
+
+@lru_cache(maxsize=4096)
+def expand_skill(name: str) -> tuple:
+    """Canonical skills named by one entry, splitting compounds like "Python/Shell scripting".
+
+    A whole-string match wins ("CI/CD", "Monitoring & Logging"), and an entry is only split
+    when at least one part is a known skill, so unknown pairs such as "TCP/IP" stay whole.
+    """
+    if _known_key(name) is not None:
+        return (canonical_skill(name),)
+    parts = [p for p in _COMPOUND_SPLIT.split(str(name)) if skill_key(p)]
+    if len(parts) > 1 and any(_known_key(p) is not None for p in parts):
+        return tuple(dict.fromkeys(canonical_skill(p) for p in parts))
+    return (canonical_skill(name),)
+
+
+def canonical_key(name: str) -> str:
+    """Lookup key of the canonical name, for exact joins between skill lists."""
+    return skill_key(canonical_skill(name))
+
+
+def canonical_keys(name: str) -> list:
+    """Lookup keys of every canonical skill an entry names (see expand_skill)."""
+    return [skill_key(s) for s in expand_skill(name)]
+
+
+def canonical_skills(names) -> list:
+    """Canonicalize a skill list, splitting compounds and dropping duplicates while keeping first-seen order."""
+    seen = {}
+    for name in names or []:
+        for canonical in expand_skill(name):
+            seen.setdefault(skill_key(canonical), canonical)
+    return list(seen.values())
+
+
+def same_skill(a: str, b: str) -> bool:
+    return canonical_key(a) == canonical_key(b)
@@ -0,0 +1,396 @@
+"""Optional SQLite backend for the candidate/job data and the generated reports.
+
+Usage (from the repo root):
+    python -m app.sqlstore import                   # data/ + talent-intelligence-report/ -> data/smarthire.sqlite3
+    python -m app.sqlstore reports --job JD001      # every report stored for a JD
+    python -m app.sqlstore skill "Machine Learning" # candidates and JDs listing a skill (any alias)
+    python -m app.sqlstore find github stars ">" 50
+
+Set DATA_BACKEND=sqlite to make the agents, orchestrator and pages read from the database
+instead of the JSON files; records keep exactly the shape they have in the JSON files.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional
+from app.catalog import DATASETS, REPORT_KINDS, parse_report_filename
+from app.ingest import iter_records
+from app.skills import canonical_key, canonical_keys
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB_PATH = ROOT / "data" / "smarthire.sqlite3"
+
+# Comparison operators allowed in find()
+_OPERATORS = {"=", "!=", "<", "<=", ">", ">=", "LIKE"}
+_FIELD = re.compile(r"^[A-Za-z0-9_.\[\]]+$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    dataset TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (dataset, record_id)
+);
+CREATE INDEX IF NOT EXISTS idx_records_id ON records(record_id);
+CREATE INDEX IF NOT EXISTS idx_records_position ON records(dataset, position);
+CREATE INDEX IF NOT EXISTS idx_records_updated ON records(updated_at);
+
+CREATE TABLE IF NOT EXISTS record_skills (
+    dataset TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    skill_key TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (dataset, record_id, skill_key)
+);
+CREATE INDEX IF NOT EXISTS idx_record_skills_key ON record_skills(skill_key, dataset);
+
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    doc TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reports (
+    kind TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (kind, person_id, job_id)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_job ON reports(job_id, kind);
+CREATE INDEX IF NOT EXISTS idx_reports_person ON reports(person_id, kind);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports(created_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Staging tables of import_dataset's own connection (same keys, so the first record per id still wins)
+_STAGING_SCHEMA = """
+CREATE TEMP TABLE staged_records (
+    dataset TEXT NOT NULL, record_id TEXT NOT NULL, position INTEGER NOT NULL,
+    doc TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (dataset, record_id)
+);
+CREATE TEMP TABLE staged_skills (
+    dataset TEXT NOT NULL, record_id TEXT NOT NULL, skill_key TEXT NOT NULL,
+    skill TEXT NOT NULL, PRIMARY KEY (dataset, record_id, skill_key)
+);
+"""
+
+
+class SQLDataset:
+    """One dataset table with the same interface as datastore.Dataset."""
+
+    def __init__(self, db: "SQLiteStore", name: str):
+        self.db = db
+        self.name = name
+        self.key = DATASETS[name][1]
+        self.path = db.path
+
+    @property
+    def mtime(self) -> float:
+        return self.db.data_version()
+
+    def get(self, record_id, default=None):
+        row = self.db._fetchone(
+            "SELECT doc FROM records WHERE dataset = ? AND record_id = ?", (self.name, str(record_id))
+        )
+        return json.loads(row[0]) if row else default
+
+    def ids(self) -> list:
+        rows = self.db._fetchall("SELECT record_id FROM records WHERE dataset = ? ORDER BY position", (self.name,))
+        return [r[0] for r in rows]
+
+    def __contains__(self, record_id):
+        return self.db._fetchone(
+            "SELECT 1 FROM records WHERE dataset = ? AND record_id = ?", (self.name, str(record_id))
+        ) is not None
+
+    def __iter__(self):
+        # Page through by position so the connection lock isn't held while the caller works
+        position = -1
+        while True:
+            rows = self.db._fetchall(
+                "SELECT position, doc FROM records WHERE dataset = ? AND position > ? ORDER BY position LIMIT 500",
+                (self.name, position),
+            )
+            if not rows:
+                return
+            for position, doc in rows:
+                yield json.loads(doc)
+
+    def __len__(self):
+        return self.db._fetchone("SELECT COUNT(*) FROM records WHERE dataset = ?", (self.name,))[0]
+
+
+class SQLiteStore:
+    """Candidates, jobs, market data and reports in one SQLite file."""
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self.path = Path(path or DEFAULT_DB_PATH).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._datasets = {name: SQLDataset(self, name) for name in DATASETS}
+
+    # ---------- helpers ----------
+    def _fetchone(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, sql, rows):
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+
+    def data_version(self) -> float:
+        """Time of the last data import (reports newer than this are up to date)."""
+        row = self._fetchone("SELECT value FROM meta WHERE key = 'data_version'")
+        return float(row[0]) if row else 0.0
+
+    # ---------- data ----------
+    def dataset(self, name: str) -> SQLDataset:
+        return self._datasets[name]
+
+    def market(self) -> dict:
+        row = self._fetchone("SELECT doc FROM documents WHERE name = 'market_intelligence'")
+        return json.loads(row[0]) if row else {}
+
+    def import_dataset(self, name: str, records, batch_size: int = 1000) -> int:
+        """Replace a dataset with `records` (any iterable, consumed in batches).
+
+        Each import stages its batches in temporary tables on a connection of its own
+        (so concurrent imports never see each other's staging), then swaps the old rows
+        for the staged ones in a single transaction: readers never see a half-imported
+        dataset and a failed import leaves the previous one in place.
+        """
+        _, key, skill_fields = DATASETS[name]
+        now = time.time()
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            conn.executescript(_STAGING_SCHEMA)
+            count = 0
+            rows, skill_rows = [], []
+            for record in records:
+                if not isinstance(record, dict) or key not in record:
+                    continue
+                record_id = str(record[key])
+                rows.append((name, record_id, count, json.dumps(record, ensure_ascii=False), now))
+                for field in skill_fields:
+                    for skill in record.get(field) or []:
+                        skill_rows.extend((name, record_id, k, skill) for k in canonical_keys(skill))
+                count += 1
+                if len(rows) >= batch_size:
+                    self._stage(conn, rows, skill_rows)
+                    rows, skill_rows = [], []
+            self._stage(conn, rows, skill_rows)
+
+            with conn:  # one transaction: commits on success, rolls back on error
+                conn.execute("DELETE FROM records WHERE dataset = ?", (name,))
+                conn.execute("DELETE FROM record_skills WHERE dataset = ?", (name,))
+                conn.execute("INSERT INTO records SELECT * FROM temp.staged_records")
+                conn.execute("INSERT INTO record_skills SELECT * FROM temp.staged_skills")
+        finally:
+            conn.close()  # drops the staging tables
+        return count
+
+    @staticmethod
+    def _stage(conn, rows, skill_rows):
+        # First record per id wins, like the JSON loaders
+        conn.executemany("INSERT OR IGNORE INTO temp.staged_records VALUES (?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT OR IGNORE INTO temp.staged_skills VALUES (?, ?, ?, ?)", skill_rows)
+        conn.commit()
+
+    def import_market(self, document: dict):
+        self._write(
+            "INSERT OR REPLACE INTO documents VALUES ('market_intelligence', ?, ?)",
+            [(json.dumps(document, ensure_ascii=False), time.time())],
+        )
+
+    def import_json(self, data_dir: str | Path, report_dir: Optional[str | Path] = None) -> dict:
+        """Load every data file (JSON or NDJSON) and, optionally, every saved report."""
+        from app.datastore import resolve_data_path
+
+        data_dir = Path(data_dir)
+        counts = {}
+        for name, (filename, _, _) in DATASETS.items():
+            path = resolve_data_path(data_dir / filename)
+            if path.exists():
+                counts[name] = self.import_dataset(name, iter_records(path))
+                print(f"✅ Imported {counts[name]} {name} records from {path.name}")
+        market_path = data_dir / "market_intelligence.json"
+        if market_path.exists():
+            with open(market_path, "r", encoding="utf-8") as f:
+                self.import_market(json.load(f))
+            print("✅ Imported market intelligence")
+        self._write("INSERT OR REPLACE INTO meta VALUES ('data_version', ?)", [(str(time.time()),)])
+
+        if report_dir and Path(report_dir).exists():
+            counts["reports"] = self.import_reports(report_dir)
+        return counts
+
+    def import_reports(self, report_dir: str | Path) -> int:
+        count = 0
+        for path in sorted(Path(report_dir).glob("*.json")):
+            parsed = parse_report_filename(path.name)
+            if not parsed:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                print(f"⚠️ Skipping unreadable report {path.name}")
+                continue
+            self.save_report(*parsed, report, created_at=path.stat().st_mtime)
+            count += 1
+        print(f"✅ Imported {count} reports from {report_dir}")
+        return count
+
+    # ---------- reports ----------
+    def save_report(self, kind: str, person_id: str, job_id: Optional[str], report: dict,
+                    created_at: Optional[float] = None):
+        if kind not in REPORT_KINDS:
+            raise ValueError(f"❌ Unknown report kind {kind!r}, expected one of {REPORT_KINDS}")
+        self._write(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+            [(kind, person_id, job_id or "", json.dumps(report, ensure_ascii=False), created_at or time.time())],
+        )
+
+    def load_report(self, kind: str, person_id: str, job_id: Optional[str]) -> Optional[dict]:
+        row = self._fetchone(
+            "SELECT doc FROM reports WHERE kind = ? AND person_id = ? AND job_id = ?", (kind, person_id, job_id or "")
+        )
+        return json.loads(row[0]) if row else None
+
+    def report_time(self, kind: str, person_id: str, job_id: Optional[str]) -> Optional[float]:
+        row = self._fetchone(
+            "SELECT created_at FROM reports WHERE kind = ? AND person_id = ? AND job_id = ?",
+            (kind, person_id, job_id or ""),
+        )
+        return row[0] if row else None
+
+    def reports(self, kind: Optional[str] = None, person_id: Optional[str] = None, job_id: Optional[str] = None,
+                since: Optional[float] = None) -> list:
+        """Reports matching every given filter, newest first."""
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("person_id", person_id), ("job_id", job_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._fetchall(f"SELECT doc FROM reports {where} ORDER BY created_at DESC", params)
+        return [json.loads(r[0]) for r in rows]
+
+    # ---------- queries ----------
+    def with_skill(self, skill: str, dataset: Optional[str] = None) -> list:
+        """Ids of records listing the skill under any alias, e.g. with_skill("ml", "resume")."""
+        sql = "SELECT DISTINCT dataset, record_id FROM record_skills WHERE skill_key = ?"
+        params = [canonical_key(skill)]
+        if dataset:
+            sql += " AND dataset = ?"
+            params.append(dataset)
+        rows = self._fetchall(sql + " ORDER BY dataset, record_id", params)
+        return [r[1] for r in rows] if dataset else [(r[0], r[1]) for r in rows]
+
+    def find(self, dataset: str, field: str, op: str, value) -> list:
+        """Records whose JSON field compares true, e.g. find("github", "stars", ">", 50)."""
+        op = op.upper()
+        if op not in _OPERATORS or not _FIELD.match(field):
+            raise ValueError(f"❌ Unsupported filter: {field} {op}")
+        rows = self._fetchall(
+            f"SELECT doc FROM records WHERE dataset = ? AND json_extract(doc, ?) {op} ? ORDER BY position",
+            (dataset, f"$.{field}", value),
+        )
+        return [json.loads(r[0]) for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_db: Optional[SQLiteStore] = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> Optional[SQLiteStore]:
+    """The shared database when DATA_BACKEND=sqlite (path from DATA_DB_PATH), otherwise None."""
+    global _db
+    if os.getenv("DATA_BACKEND", "json").lower() != "sqlite":
+        return None
+    with _db_lock:
+        if _db is None:
+            _db = SQLiteStore(os.getenv("DATA_DB_PATH") or None)
+        return _db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite storage for candidates, jobs and reports.")
+    parser.add_argument("--db", help=f"Database file (default: DATA_DB_PATH or {DEFAULT_DB_PATH.relative_to(ROOT)})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Import the JSON/NDJSON data files and saved reports")
+    p_import.add_argument("--data-dir", default=str(ROOT / "data"))
+    p_import.add_argument("--report-dir", default=str(ROOT / "talent-intelligence-report"))
+
+    p_reports = sub.add_parser("reports", help="List stored reports")
+    p_reports.add_argument("--kind", choices=REPORT_KINDS)
+    p_reports.add_argument("--person")
+    p_reports.add_argument("--job")
+
+    p_skill = sub.add_parser("skill", help="Candidates and JDs listing a skill")
+    p_skill.add_argument("skill")
+    p_skill.add_argument("--dataset", choices=list(DATASETS))
+
+    p_find = sub.add_parser("find", help="Filter a dataset on a JSON field")
+    p_find.add_argument("dataset", choices=list(DATASETS))
+    p_find.add_argument("field")
+    p_find.add_argument("op")
+    p_find.add_argument("value")
+
+    args = parser.parse_args()
+    db = SQLiteStore(args.db or os.getenv("DATA_DB_PATH") or None)
+
+    if args.command == "import":
+        counts = db.import_json(args.data_dir, args.report_dir)
+        print(f"🏁 {db.path}: {counts}")
+    elif args.command == "reports":
+        for report in db.reports(kind=args.kind, person_id=args.person, job_id=args.job):
+            print(f"{report.get('person_id')} x {report.get('job_id')}")
+    elif args.command == "skill":
+        for entry in db.with_skill(args.skill, args.dataset):
+            print(entry)
+    elif args.command == "find":
+        value = args.value
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        key = DATASETS[args.dataset][1]
+        for record in db.find(args.dataset, args.field, args.op, value):
+            print(record.get(key))
+
+
+if __name__ == "__main__":
+    main()
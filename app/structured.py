@@ -0,0 +1,262 @@
+"""Structured (JSON) LLM output: tolerant parsing, schema validation and one targeted re-query.
+
+Schemas are small dicts in the JSON Schema style, covering only what the agents need:
+    {"type": "object", "required": [...], "properties": {name: schema}}
+    {"type": "array", "items": schema, "min_items": 1, "unwrap": "questions"}
+    {"type": "string" | "number" | "integer" | "boolean"}
+"unwrap" lets an array also arrive wrapped in an object under that key (JSON mode
+only returns objects).
+"""
+import ast
+import json
+import re
+from typing import Optional
+from app.llm_cache import get_cache
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+}
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+class StructuredOutputError(ValueError):
+    """The response could not be turned into valid JSON for its schema, even after the re-query."""
+
+    def __init__(self, message: str, raw: str = "", errors=None):
+        super().__init__(message)
+        self.raw = raw
+        self.errors = errors or []
+
+
+# --- Repair ---
+def _strip_noise(text: str) -> str:
+    """Remove comments and trailing commas and normalize Python literals, outside of strings."""
+    out, i, n = [], 0, len(text)
+    in_string = False
+    while i < n:
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                i += 1
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch == ",":
+            j = i + 1
+            while j < n:  # next significant character, skipping whitespace and comments
+                if text[j] in " \t\r\n":
+                    j += 1
+                elif text.startswith("//", j):
+                    end = text.find("\n", j)
+                    j = n if end == -1 else end
+                elif text.startswith("/*", j):
+                    end = text.find("*/", j + 2)
+                    j = n if end == -1 else end + 2
+                else:
+                    break
+            if j < n and text[j] in "]}":
+                i += 1
+                continue  # trailing comma
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any brackets left open (a response cut off mid-way)."""
+    stack, in_string, escaped = [], False, False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            stack.append("]" if ch == "[" else "}")
+        elif ch in "]}" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    text = re.sub(r"[,:\s]+$", "", text)
+    return text + "".join(reversed(stack))
+
+
+def _json_region(text: str) -> str:
+    """From the first '{' or '[' to its matching bracket (or the end of the text)."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def repair_json(raw: Optional[str]):
+    """Parse an LLM reply as JSON, fixing the usual defects locally.
+
+    Handles markdown fences, prose around the JSON, // and /* */ comments, trailing
+    commas, smart quotes, Python True/False/None, single-quoted (Python-style)
+    objects and output truncated mid-way. Raises ValueError when nothing parses.
+    """
+    text = (raw or "").strip()
+    if not text:
+        raise ValueError("❌ Empty response")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    elif text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:].strip()
+    text = _json_region(text.translate(_SMART_QUOTES))
+
+    cleaned = _strip_noise(text)
+    for candidate in (cleaned, _close_truncated(cleaned)):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    try:
+        # Single-quoted keys/strings: valid as a Python literal
+        value = ast.literal_eval(text)
+        if isinstance(value, (dict, list)):
+            return value
+    except (ValueError, SyntaxError):
+        pass
+    raise ValueError(f"❌ Could not repair JSON:\n{raw}")
+
+
+# --- Validation ---
+def validate(value, schema: dict, path: str = "$") -> tuple:
+    """(value, errors): value with wrapped arrays unwrapped and numeric strings coerced; errors as readable strings."""
+    expected = schema.get("type")
+    if expected == "array" and isinstance(value, dict) and schema.get("unwrap") in value:
+        value = value[schema["unwrap"]]
+    if expected in ("number", "integer") and isinstance(value, str):
+        try:
+            value = float(value) if expected == "number" else int(value)
+        except ValueError:
+            pass
+    if expected and not isinstance(value, _TYPES[expected]) or (expected in ("number", "integer") and isinstance(value, bool)):
+        return value, [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                value[key], sub_errors = validate(value[key], sub, f"{path}.{key}")
+                errors.extend(sub_errors)
+    elif expected == "array":
+        if len(value) < schema.get("min_items", 0):
+            errors.append(f"{path}: expected at least {schema['min_items']} items, got {len(value)}")
+        if "items" in schema:
+            for i, item in enumerate(value):
+                value[i], item_errors = validate(item, schema["items"], f"{path}[{i}]")
+                errors.extend(item_errors)
+    return value, errors
+
+
+def parse_structured(raw: Optional[str], schema: dict) -> tuple:
+    """(value, errors) for a raw reply; value is None when it isn't JSON at all."""
+    try:
+        value = repair_json(raw)
+    except ValueError:
+        return None, ["reply is not JSON"]
+    return validate(value, schema)
+
+
+# --- LLM call ---
+def complete_structured(llm, prompt: str, schema: dict, model: str, temperature: float, use_cache: bool = True,
+                        agent: str = "unknown", call_site: str = "unknown", raw: Optional[str] = None):
+    """Call the LLM for JSON matching `schema`, repairing locally and re-querying once on failure.
+
+    Pass `raw` to validate an already received reply (e.g. a streamed one) instead of
+    making the first call. The re-query repeats only this prompt, with the validation
+    errors appended, and bypasses the response cache. Raises StructuredOutputError if
+    the second reply is unusable too.
+    """
+    json_mode = schema.get("type") == "object"
+    if raw is None:
+        raw = llm.complete(prompt, model=model, temperature=temperature, use_cache=use_cache,
+                           agent=agent, call_site=call_site, json_mode=json_mode)
+    value, errors = parse_structured(raw, schema)
+    if not errors:
+        return value
+
+    print(f"⚠️ {agent}/{call_site}: invalid structured output ({'; '.join(errors[:3])}), re-querying once")
+    # Don't replay the unusable response on the next run
+    cache = get_cache()
+    if cache is not None:
+        cache.invalidate(model, prompt, temperature)
+    retry_prompt = (
+        f"{prompt}\n\nYour previous reply could not be used: {'; '.join(errors[:5])}.\n"
+        "Reply again with ONLY the corrected JSON, no markdown and no explanation."
+    )
+    raw_retry = llm.complete(retry_prompt, model=model, temperature=temperature, use_cache=False,
+                             agent=agent, call_site=f"{call_site}-repair", json_mode=json_mode)
+    value, retry_errors = parse_structured(raw_retry, schema)
+    if not retry_errors:
+        print(f"✅ {agent}/{call_site}: re-query returned valid output")
+        return value
+    raise StructuredOutputError(
+        f"❌ {agent}/{call_site} returned invalid JSON twice: {'; '.join(retry_errors[:5])}\n{raw_retry}",
+        raw=raw_retry, errors=retry_errors,
+    )
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from collections import defaultdict
+from typing import Optional
+
+TELEMETRY_DIR = Path(__file__).resolve().parent.parent / ".cache" / "telemetry"
+
+# Upper bounds (seconds) of the Prometheus latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Telemetry:
+    """Per-call LLM telemetry: one JSONL event per chat completion plus Prometheus-text metrics.
+
+    The JSONL log rotates at `max_bytes` (keeping `backups` old files as .1, .2, ...).
+    The metrics file is rewritten after every call with cumulative counters since startup.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str | Path] = None,
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 3,
+    ):
+        self.directory = Path(directory) if directory else TELEMETRY_DIR
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / "llm_calls.jsonl"
+        self.metrics_path = self.directory / "llm_metrics.prom"
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+        # (agent, call_site, outcome) -> count; (agent, call_site) -> sums / histogram
+        self.calls = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.prompt_tokens = defaultdict(int)
+        self.completion_tokens = defaultdict(int)
+        self.latency_sum = defaultdict(float)
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    # ---------- recording ----------
+    def record(
+        self,
+        agent: str,
+        call_site: str,
+        model: str,
+        latency_s: float,
+        prompt_tokens: int,
+        completion_tokens: int,
+        retries: int,
+        outcome: str,
+        streamed: bool = False,
+        error: Optional[str] = None,
+    ):
+        """Log one call. outcome is "ok", "cache_hit" or "error"."""
+        event = {
+            "ts": round(time.time(), 3),
+            "agent": agent,
+            "call_site": call_site,
+            "model": model,
+            "latency_s": round(latency_s, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "outcome": outcome,
+            "streamed": streamed,
+        }
+        if error:
+            event["error"] = error
+
+        site = (agent, call_site)
+        with self._lock:
+            self.calls[(agent, call_site, outcome)] += 1
+            self.retries[site] += retries
+            self.prompt_tokens[site] += prompt_tokens
+            self.completion_tokens[site] += completion_tokens
+            self.latency_sum[site] += latency_s
+            buckets = self.latency_buckets[site]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency_s <= bound:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+
+            try:
+                self._append(event)
+                self._write_metrics()
+            except OSError as e:
+                print(f"⚠️ Could not write LLM telemetry: {e}")
+
+    def _append(self, event: dict):
+        if self.log_path.exists() and self.log_path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            older = self.log_path.with_suffix(f".jsonl.{i}")
+            if older.exists():
+                os.replace(older, self.log_path.with_suffix(f".jsonl.{i + 1}"))
+        if self.backups:
+            os.replace(self.log_path, self.log_path.with_suffix(".jsonl.1"))
+        else:
+            self.log_path.unlink()
+
+    # ---------- Prometheus export ----------
+    @staticmethod
+    def _labels(**labels) -> str:
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# HELP smarthire_llm_calls_total LLM chat completions by outcome.",
+            "# TYPE smarthire_llm_calls_total counter",
+        ]
+        for (agent, call_site, outcome), count in sorted(self.calls.items()):
+            lines.append(f"smarthire_llm_calls_total{self._labels(agent=agent, call_site=call_site, outcome=outcome)} {count}")
+
+        for name, values, help_text in (
+            ("smarthire_llm_retries_total", self.retries, "Retried attempts before a call succeeded or failed."),
+            ("smarthire_llm_prompt_tokens_total", self.prompt_tokens, "Prompt tokens sent."),
+            ("smarthire_llm_completion_tokens_total", self.completion_tokens, "Completion tokens received."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (agent, call_site), value in sorted(values.items()):
+                lines.append(f"{name}{self._labels(agent=agent, call_site=call_site)} {value}")
+
+        lines += [
+            "# HELP smarthire_llm_latency_seconds Wall latency of LLM calls, including rate-limit waits and retries.",
+            "# TYPE smarthire_llm_latency_seconds histogram",
+        ]
+        for (agent, call_site), buckets in sorted(self.latency_buckets.items()):
+            cumulative = 0
+            for bound, count in zip([*LATENCY_BUCKETS, "+Inf"], buckets):
+                cumulative += count
+                labels = self._labels(agent=agent, call_site=call_site, le=bound)
+                lines.append(f"smarthire_llm_latency_seconds_bucket{labels} {cumulative}")
+            labels = self._labels(agent=agent, call_site=call_site)
+            lines.append(f"smarthire_llm_latency_seconds_sum{labels} {self.latency_sum[(agent, call_site)]:.4f}")
+            lines.append(f"smarthire_llm_latency_seconds_count{labels} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def _write_metrics(self):
+        # Write-then-rename so scrapers never see a half-written file
+        tmp = self.metrics_path.with_suffix(".prom.tmp")
+        tmp.write_text(self.render_metrics(), encoding="utf-8")
+        os.replace(tmp, self.metrics_path)
+
+
+def load_events(directory: Optional[str | Path] = None) -> list:
+    """All events still on disk (rotated files first, oldest to newest)."""
+    directory = Path(directory) if directory else TELEMETRY_DIR
+    log_path = directory / "llm_calls.jsonl"
+    rotated = sorted(directory.glob("llm_calls.jsonl.*"), key=lambda p: int(p.suffix[1:]), reverse=True)
+    events = []
+    for path in [*rotated, log_path]:
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # a line cut short by a crash
+    return events
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    """Process-wide telemetry sink, or None when LLM_TELEMETRY_DISABLED=1."""
+    global _telemetry
+    if os.getenv("LLM_TELEMETRY_DISABLED") == "1":
+        return None
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry(
+                directory=os.getenv("LLM_TELEMETRY_DIR") or None,
+                max_bytes=int(os.getenv("LLM_TELEMETRY_MAX_BYTES", str(5 * 1024 * 1024))),
+                backups=int(os.getenv("LLM_TELEMETRY_BACKUPS", "3")),
+            )
+        return _telemetry
@@ -0,0 +1,78 @@
+"""Streamlit caches shared by every dashboard session.
+
+Everything is keyed on data_version() (newest data file mtime, or the last SQLite
+import), so editing a data file invalidates the cached lists, datasets, agents
+and orchestration results on the next rerun.
+"""
+import threading
+from collections import OrderedDict
+import streamlit as st
+from app.datastore import get_store
+from app.orchestrator import DATA_DIR, build_agents, list_profiles, list_jds
+
+MAX_CACHED_REPORTS = 128
+
+
+def data_version() -> float:
+    return get_store(DATA_DIR).data_version()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_profiles(version: float) -> list:
+    return list_profiles()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_jds(version: float) -> list:
+    return list_jds()
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def cached_dataset(name: str, version: float):
+    """Indexed Dataset (not copied per session, unlike cache_data)."""
+    return get_store(DATA_DIR).dataset(name)
+
+
+@st.cache_resource(show_spinner="Loading agents...", max_entries=1)
+def cached_agents(version: float) -> dict:
+    return build_agents()
+
+
+class _ReportCache:
+    """(person_id, job_id, data version) -> orchestrated report, LRU-bounded."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._reports:
+                self._reports.move_to_end(key)
+            return self._reports.get(key)
+
+    def put(self, key, report):
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._reports.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def report_cache() -> _ReportCache:
+    return _ReportCache(MAX_CACHED_REPORTS)
+
+
+def cached_report(person_id: str, job_id: str, version: float):
+    """A previous orchestration result for this pair and data version, if any."""
+    return report_cache().get((person_id, job_id, version))
+
+
+def remember_report(person_id: str, job_id: str, version: float, report: dict):
+    report_cache().put((person_id, job_id, version), report)
@@ -0,0 +1,279 @@
+"""Local stand-in for the Groq chat-completions API, for benchmarks and offline testing.
+
+Responses are canned but shaped like what each agent expects (skill score maps,
+assessment arrays, behavioral and market JSON, plain text otherwise). Latency is
+drawn from a configurable distribution seeded by the prompt, so a run replays the
+same delays regardless of thread scheduling.
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+def _skill_scores(prompt: str) -> str:
+    match = re.search(r"Evidence: (\{.*\})", prompt)
+    try:
+        skills = json.loads(match.group(1)) if match else {}
+    except json.JSONDecodeError:
+        skills = {}
+    return json.dumps({skill: round(0.5 + 0.05 * (len(skill) % 10), 2) for skill in skills})
+
+
+def _assessment() -> str:
+    questions = []
+    for i, difficulty in enumerate(["Easy", "Medium", "Hard"], 1):
+        questions.append({
+            "title": f"Benchmark Challenge {i}",
+            "difficulty": difficulty,
+            "description": "Given an array of integers, return the length of the longest increasing subsequence.",
+            "instructions": "Implement the function and explain its complexity.",
+            "constraints": ["1 <= n <= 10^5"],
+            "examples": [{"input": "[10, 9, 2, 5, 3, 7, 101, 18]", "output": "4"}],
+            "options": {"time_limit_min": 30, "languages_allowed": ["Python", "Java", "C++"]},
+        })
+    return json.dumps(questions)
+
+
+def _behavioral_analysis() -> dict:
+    return {
+        "soft_skill_analysis": {
+            "collaboration": "Works closely with cross-functional teams.",
+            "problem_solving": "Breaks down complex problems methodically.",
+            "communication": "Communicates blockers and decisions clearly.",
+        },
+        "keywords": ["collaborated", "mentoring", "brainstorming"],
+        "themes": ["teamwork", "ownership"],
+        "high_level_insights": "Collaborative engineer with a strong ownership mindset.",
+        "bias_mitigation_protocol": {"guidelines": ["Assess evidence, not style.", "Use structured rubrics."]},
+    }
+
+
+def _behavioral(prompt: str) -> str:
+    match = re.search(r'"person_id": "([^"]*)"', prompt)
+    return json.dumps({"person_id": match.group(1) if match else "", **_behavioral_analysis()})
+
+
+def _behavioral_batch(prompt: str) -> str:
+    match = re.search(r"^Candidate Texts: (\{.*\})$", prompt, flags=re.MULTILINE)
+    try:
+        person_ids = list(json.loads(match.group(1))) if match else []
+    except json.JSONDecodeError:
+        person_ids = []
+    return json.dumps({person_id: _behavioral_analysis() for person_id in person_ids})
+
+
+def _market(prompt: str) -> str:
+    match = re.search(r'"job_id": "([^"]*)"', prompt)
+    return json.dumps({
+        "job_id": match.group(1) if match else "",
+        "summary": "Pay is competitive at the median; supply is moderate with most openings in two hubs.",
+        "recommendations": ["Source on LinkedIn and GitHub first.", "Offer at or above p50 for senior roles."],
+    })
+
+
+def canned_response(prompt: str) -> str:
+    """Pick a response of the shape the calling agent parses."""
+    if "mapping every skill name" in prompt:
+        return _skill_scores(prompt)
+    if "Only output a number" in prompt:
+        return "0.7"
+    if "coding challenges" in prompt:
+        return _assessment()
+    if "Candidate Texts:" in prompt:
+        return _behavioral_batch(prompt)
+    if "behavioral and cultural fit" in prompt:
+        return _behavioral(prompt)
+    if "Market Intelligence" in prompt:
+        return _market(prompt)
+    return (
+        "The candidate shows solid hands-on experience across the listed projects and roles. "
+        "Strengths line up with the core requirements; gaps are mostly in production-scale tooling."
+    )
+
+
+class FakeGroqServer:
+    """Threaded HTTP server answering POST .../chat/completions (streamed or not).
+
+    latency: "fixed" (latency_ms), "uniform" (latency_ms * [1 - spread, 1 + spread])
+    or "lognormal" (median latency_ms, sigma = spread). error_rate is the share of
+    attempts answered with 429 + Retry-After, which exercises the client's retries.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "lognormal",
+        latency_ms: float = 200.0,
+        spread: float = 0.5,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"❌ Unknown latency distribution {latency!r}, expected one of {LATENCY_DISTRIBUTIONS}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.spread = spread
+        self.error_rate = error_rate
+        self.seed = seed
+
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._attempts = defaultdict(int)
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ---------- behaviour ----------
+    def _rng(self, prompt: str) -> random.Random:
+        """Per-(prompt, attempt) RNG so delays and errors replay identically across runs."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts[digest]
+            self._attempts[digest] += 1
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def _delay(self, rng: random.Random) -> float:
+        if self.latency == "fixed":
+            ms = self.latency_ms
+        elif self.latency == "uniform":
+            ms = rng.uniform(self.latency_ms * (1 - self.spread), self.latency_ms * (1 + self.spread))
+        else:
+            ms = rng.lognormvariate(0.0, self.spread) * self.latency_ms
+        return max(0.0, ms) / 1000.0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_event(self, data: str):
+                chunk = f"data: {data}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+                model = request.get("model", "")
+                rng = server._rng(prompt)
+
+                if rng.random() < server.error_rate:
+                    with server._lock:
+                        server.errors += 1
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_exceeded"}},
+                        {"retry-after": "0.05"},
+                    )
+                    return
+
+                time.sleep(server._delay(rng))
+                content = canned_response(prompt)
+                usage = {
+                    "prompt_tokens": max(1, len(prompt) // 4),
+                    "completion_tokens": max(1, len(content) // 4),
+                }
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                with server._lock:
+                    server.calls += 1
+                    server.prompt_tokens += usage["prompt_tokens"]
+                    server.completion_tokens += usage["completion_tokens"]
+
+                if not request.get("stream"):
+                    self._send_json(200, {
+                        "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = re.findall(r"\S+\s*", content)
+                for i, word in enumerate(words):
+                    chunk = {
+                        "id": "fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word},
+                                     "finish_reason": "stop" if i == len(words) - 1 else None}],
+                    }
+                    if i == len(words) - 1:
+                        chunk["x_groq"] = {"id": "fake", "usage": usage}
+                    self._send_event(json.dumps(chunk))
+                self._send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        print(f"✅ Fake Groq server listening on {self.base_url} ({self.latency}, {self.latency_ms:.0f} ms)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a fake Groq chat-completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeGroqServer(port=args.port, latency=args.latency, latency_ms=args.latency_ms,
+                            spread=args.spread, error_rate=args.error_rate).start()
+    print("Set GROQ_BASE_URL=" + server.base_url + " to point the agents at it (Ctrl+C to stop).")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,317 @@
+"""Benchmark the agents and the orchestrator against a local fake Groq server.
+
+Usage (from the repo root):
+    python -m benchmarks.run                          # 10, 1k and 100k candidates
+    python -m benchmarks.run --sizes 10 1000 --sample 50 --latency-ms 100
+    python -m benchmarks.run --compare benchmarks/results/<older>.json
+    python -m benchmarks.run --diff OLD.json NEW.json # compare two saved runs without running
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import resource
+import tracemalloc
+import subprocess
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.fake_groq import FakeGroqServer, LATENCY_DISTRIBUTIONS
+from benchmarks.synthetic import generate_dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DATASET_DIR = ROOT / ".cache" / "bench"
+
+WORKLOADS = ["generate_tir", "generate_assessment", "behavioral_analyze", "behavioral_batch", "market_analyze",
+             "run_orch"]
+
+# Metrics shown by --compare/--diff: (label, path into a result row, higher is better)
+COMPARED = [
+    ("throughput", ("throughput_ops_s",), True),
+    ("p95 latency", ("latency_s", "p95"), False),
+    ("LLM calls/op", ("llm_calls_per_op",), False),
+    ("peak MB", ("peak_mem_mb",), False),
+]
+
+
+def _percentile(values, q):
+    """Linear-interpolated percentile of a non-empty list (q in 0..100)."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def _git_revision():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+class Bench:
+    """Runs every workload over a sample of (person, job) pairs for one dataset size."""
+
+    def __init__(self, server: FakeGroqServer, data_dir: Path, report_dir: Path, workers: int, quiet: bool,
+                 warmup: int = 1):
+        self.server = server
+        self.warmup = warmup
+        self.data_dir = data_dir
+        self.report_dir = report_dir
+        self.workers = workers
+        self.quiet = quiet
+
+    @contextlib.contextmanager
+    def _silenced(self):
+        # Agents print status lines for every step; keep them out of the results table
+        if not self.quiet:
+            yield
+            return
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+    def _measure(self, name, size, fn, items, warmup=0):
+        """Run fn(item) for each item on the worker pool and collect latency/LLM/memory stats.
+
+        The first `warmup` items are run once beforehand (untimed) so connection setup and
+        cold caches don't land in the measured latencies.
+        """
+        with self._silenced():
+            for item in items[:warmup]:
+                try:
+                    fn(*item)
+                except Exception:
+                    pass
+        before = self.server.stats()
+        latencies, errors, first_error = [], 0, None
+        tracemalloc.reset_peak()
+        mem_start = tracemalloc.get_traced_memory()[0]
+
+        def _timed(item):
+            started = time.perf_counter()
+            try:
+                fn(*item)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            return time.perf_counter() - started, error
+
+        started = time.perf_counter()
+        with self._silenced():
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bench") as pool:
+                for latency, error in pool.map(_timed, items):
+                    latencies.append(latency)
+                    if error:
+                        errors += 1
+                        first_error = first_error or error
+        wall = time.perf_counter() - started
+
+        after = self.server.stats()
+        calls = after["calls"] - before["calls"]
+        row = {
+            "size": size,
+            "workload": name,
+            "ops": len(items),
+            "errors": errors,
+            "first_error": first_error,
+            "wall_s": round(wall, 4),
+            "throughput_ops_s": round(len(items) / wall, 3) if wall else 0.0,
+            "latency_s": {
+                "mean": round(sum(latencies) / len(latencies), 4),
+                "p50": round(_percentile(latencies, 50), 4),
+                "p95": round(_percentile(latencies, 95), 4),
+                "p99": round(_percentile(latencies, 99), 4),
+                "max": round(max(latencies), 4),
+            } if latencies else {},
+            "llm_calls": calls,
+            "llm_calls_per_op": round(calls / len(items), 3) if items else 0.0,
+            "prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+            "completion_tokens": after["completion_tokens"] - before["completion_tokens"],
+            "peak_mem_mb": round((tracemalloc.get_traced_memory()[1] - mem_start) / 2 ** 20, 2),
+        }
+        print(
+            f"  {name:<20} {row['ops']:>4} ops  {row['throughput_ops_s']:>8.2f} ops/s  "
+            f"p50 {row['latency_s'].get('p50', 0):>7.3f}s  p95 {row['latency_s'].get('p95', 0):>7.3f}s  "
+            f"{row['llm_calls_per_op']:>5.1f} calls/op  peak {row['peak_mem_mb']:>8.1f} MB"
+            + (f"  ❌ {errors} failed ({first_error})" if errors else "")
+        )
+        return row
+
+    def run(self, size: int, sample: int, workloads):
+        from app import orchestrator
+        from app.datastore import get_store
+        from agents.candidate_profiler import CandidateProfilerAI
+        from agents.assessment_designer import AssessmentDesigner
+        from agents.behavioral_analyzer import BehavioralAnalyzer
+        from agents.market_optimizer import MarketOptimizer
+
+        data_dir = str(self.data_dir)
+        orchestrator.DATA_DIR = data_dir
+        orchestrator.REPORT_DIR = str(self.report_dir)
+        loaded = {}
+
+        def _load():
+            loaded["profiler"] = CandidateProfilerAI(data_dir=data_dir, report_dir=self.report_dir)
+            loaded["assessment"] = AssessmentDesigner(
+                leetcode_data_path=os.path.join(data_dir, "leetcode.json"),
+                resume_data_path=os.path.join(data_dir, "resume.json"),
+                jd_data_path=os.path.join(data_dir, "jd.json"),
+            )
+            loaded["behavioral"] = BehavioralAnalyzer(os.path.join(data_dir, "candidate_text.json"))
+            loaded["market"] = MarketOptimizer(
+                market_data_path=os.path.join(data_dir, "market_intelligence.json"),
+                jd_data_path=os.path.join(data_dir, "jd.json"),
+            )
+            loaded["store"] = get_store(data_dir)
+
+        # Loading the datasets is where the candidate count matters most
+        rows = [self._measure("load", size, _load, [()])]
+
+        if "store" not in loaded:
+            raise RuntimeError(f"❌ Could not load the {size}-candidate dataset: {rows[0]['first_error']}")
+        store = loaded["store"]
+        person_ids, job_ids = store.person_ids(), store.job_ids()
+        step = max(1, len(person_ids) // sample)
+        pairs = [(pid, job_ids[i % len(job_ids)]) for i, pid in enumerate(person_ids[::step][:sample])]
+
+        # behavioral_batch: one op is a full batch starting at the sampled candidate
+        from agents.behavioral_analyzer import BATCH_MAX_CANDIDATES
+        position = {pid: i for i, pid in enumerate(person_ids[::step][:sample])}
+        groups = {pid: person_ids[i * step:i * step + BATCH_MAX_CANDIDATES] for pid, i in position.items()}
+
+        runners = {
+            "generate_tir": lambda pid, jid: loaded["profiler"].generate_tir(
+                pid, jid, use_cache=False, incremental=False
+            ),
+            "generate_assessment": lambda pid, jid: loaded["assessment"].generate_assessment(
+                pid, jid, use_cache=False
+            ),
+            "behavioral_analyze": lambda pid, jid: loaded["behavioral"].analyze(pid, use_cache=False),
+            "behavioral_batch": lambda pid, jid: loaded["behavioral"].analyze_many(groups[pid], use_cache=False),
+            "market_analyze": lambda pid, jid: loaded["market"].analyze(jid, use_cache=False),
+            "run_orch": lambda pid, jid: orchestrator.run_orch(pid, jid, use_cache=False, concurrent=True),
+        }
+        for name in workloads:
+            rows.append(self._measure(name, size, runners[name], pairs, warmup=self.warmup))
+        return rows
+
+
+def _lookup(row, path):
+    for key in path:
+        row = (row or {}).get(key)
+    return row
+
+
+def compare(old: dict, new: dict):
+    """Print per-(size, workload) changes between two saved result files."""
+    old_rows = {(r["size"], r["workload"]): r for r in old.get("results", [])}
+    print(f"\n📊 {old['meta'].get('commit')} → {new['meta'].get('commit')}")
+    for row in new.get("results", []):
+        base = old_rows.get((row["size"], row["workload"]))
+        if not base:
+            continue
+        cells = []
+        for label, path, higher_is_better in COMPARED:
+            before, after = _lookup(base, path), _lookup(row, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = change < -5 if higher_is_better else change > 5
+            cells.append(f"{label} {before:g}→{after:g} ({change:+.1f}%{' ⚠️' if worse else ''})")
+        print(f"  {row['size']:>7} {row['workload']:<20} " + " | ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against a local fake Groq server.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 1000, 100000], help="Synthetic candidate counts")
+    parser.add_argument("--jobs", type=int, default=20, help="Synthetic job descriptions per dataset")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json", help="Synthetic candidate file format")
+    parser.add_argument("--sample", type=int, default=20, help="(person, job) pairs run per workload")
+    parser.add_argument("--workload", nargs="*", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--workers", type=int, default=4, help="Operations in flight per workload")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed operations run before each workload")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fixed/mean/median server latency")
+    parser.add_argument("--spread", type=float, default=0.5, help="Uniform half-width ratio or lognormal sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of attempts answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare this run against")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="Compare two saved result files and exit")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agents' own status output")
+    args = parser.parse_args()
+
+    if args.diff:
+        old, new = (json.loads(Path(p).read_text()) for p in args.diff)
+        compare(old, new)
+        return
+
+    server = FakeGroqServer(latency=args.latency, latency_ms=args.latency_ms, spread=args.spread,
+                            error_rate=args.error_rate, seed=args.seed).start()
+    scratch = Path(tempfile.mkdtemp(prefix="smarthire-bench-"))
+
+    # Everything must be configured before the shared client pool is first created
+    os.environ.update({
+        "GROQ_API_KEY": os.getenv("GROQ_API_KEY") or "bench",
+        "GROQ_BASE_URL": server.base_url,
+        "LLM_CACHE_DISABLED": "1",
+        "LLM_TELEMETRY_DIR": str(scratch / "telemetry"),
+        "MARKET_ARTIFACT_DIR": str(scratch / "market-artifacts"),
+        # Canned problems must never land in (or be served from) the real question bank
+        "QUESTION_BANK_PATH": str(scratch / "question_bank.sqlite3"),
+    })
+    os.environ.setdefault("LLM_REQUESTS_PER_MIN", "0")
+    os.environ.setdefault("LLM_TOKENS_PER_MIN", "0")
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "32")
+
+    from app.llm_client import get_llm_pool
+    get_llm_pool()  # start the pool up front so its setup isn't charged to the first load
+
+    tracemalloc.start()
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"\n🏁 {size} candidates")
+            data_dir = generate_dataset(
+                DATASET_DIR / f"data-{size}-{args.jobs}-{args.seed}-{args.format}", size, args.jobs, args.seed, args.format
+            )
+            bench = Bench(server, data_dir, scratch / f"reports-{size}", args.workers, quiet=not args.verbose,
+                          warmup=args.warmup)
+            results.extend(bench.run(size, args.sample, args.workload))
+    finally:
+        server.stop()
+        tracemalloc.stop()
+
+    sha, dirty = _git_revision()
+    output = {
+        "meta": {
+            "commit": sha + ("-dirty" if dirty else ""),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "diff", "verbose")},
+        },
+        "results": results,
+    }
+    path = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{output['meta']['commit']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    print(f"\n💾 Results saved to {path}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), output)
+
+
+if __name__ == "__main__":
+    main()
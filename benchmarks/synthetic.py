@@ -0,0 +1,167 @@
+"""Deterministic synthetic datasets in the same layout as data/ (any number of candidates)."""
+import json
+import random
+from pathlib import Path
+from app.skills import TAXONOMY
+
+ROLES = {
+    "AI/ML Engineer": ["Python", "Machine Learning", "PyTorch", "NumPy", "Pandas", "Deep Learning"],
+    "Backend Engineer": ["Go", "PostgreSQL", "REST APIs", "Docker", "Kubernetes", "SQL"],
+    "Frontend Engineer": ["JavaScript", "TypeScript", "REST APIs", "CI/CD"],
+    "Data Scientist": ["Python", "Data Analysis", "Data Visualization", "Scikit-learn", "SQL"],
+    "DevOps Engineer": ["AWS", "Kubernetes", "Docker", "CI/CD", "Monitoring & Logging", "Shell Scripting"],
+    "Project Manager": ["Agile", "Scrum", "JIRA", "Stakeholder Communication", "Project Management"],
+}
+LOCATIONS = ["Bengaluru, IN", "Hyderabad, IN", "Remote, IN", "Pune, IN", "Chennai, IN"]
+SENIORITIES = ["Junior", "Mid", "Senior"]
+CHANNELS = ["LinkedIn", "GitHub", "Referrals", "HackerRank", "StackOverflow", "Kaggle"]
+SKILLS = sorted(TAXONOMY)
+DSA = ["Dynamic Programming", "Arrays", "Strings", "Graphs", "HashMaps", "Greedy", "Sorting"]
+COMPANIES = ["Acme Labs", "Globex", "Initech", "Umbrella AI", "Hooli", "Vandelay Systems"]
+SENTENCES = [
+    "I collaborated with a team of {n} engineers to ship a new {area} service.",
+    "I often facilitated communication between backend and frontend teams to resolve blockers.",
+    "I enjoy breaking complex {area} problems into smaller experiments.",
+    "I mentored {n} junior members and ran weekly knowledge-sharing sessions.",
+    "When deadlines slipped I re-planned scope with stakeholders and kept everyone informed.",
+    "I documented design decisions so the team could review trade-offs asynchronously.",
+]
+AREAS = ["data", "payments", "search", "ML", "infrastructure", "analytics"]
+
+
+def _candidate(rng: random.Random, i: int):
+    person_id = f"CAND{i:06d}"
+    role = rng.choice(list(ROLES))
+    skills = list(dict.fromkeys(ROLES[role] + rng.sample(SKILLS, rng.randint(3, 10))))
+    experience = []
+    for _ in range(rng.randint(0, 3)):
+        experience.append({
+            "company": rng.choice(COMPANIES),
+            "role": role,
+            "YOE": str(round(rng.uniform(0.3, 4.0), 1)),
+            "responsibilities": [
+                f"Built {rng.choice(AREAS)} features using {', '.join(rng.sample(skills, min(3, len(skills))))}.",
+                f"Improved {rng.choice(AREAS)} throughput by {rng.randint(5, 60)}%.",
+            ],
+        })
+    resume = {
+        "person_id": person_id,
+        "name": f"Candidate {i}",
+        "email": f"candidate{i}@example.com",
+        "phone": f"+9100000{i:06d}",
+        "location": rng.choice(LOCATIONS),
+        "education": [{"degree": "B.Tech in Computer Science", "institution": "Example Institute",
+                       "year_of_graduation": rng.randint(2015, 2027)}],
+        "experience": experience,
+        "projects": [{"title": f"{rng.choice(AREAS).title()} Toolkit",
+                      "description": "Side project exploring the area end to end.",
+                      "technologies": rng.sample(skills, min(3, len(skills)))}],
+        "skills": skills,
+    }
+    linkedin = {
+        "person_id": person_id,
+        "headline": f"{role} | {rng.choice(AREAS).title()}",
+        "skills": rng.sample(skills, min(5, len(skills))),
+        "endorsements": {s: rng.randint(1, 30) for s in skills[:3]},
+        "jobs": [{"company": e["company"], "title": e["role"], "years": "2022-2024"} for e in experience],
+    }
+    github = {
+        "person_id": person_id,
+        "username": f"dev{i}",
+        "repos": rng.randint(1, 80),
+        "stars": rng.randint(0, 500),
+        "top_languages": rng.sample(["Python", "JavaScript", "Go", "TypeScript", "C++", "Java"], 3),
+        "recent_activity": [f"commit: update {rng.choice(AREAS)} pipeline"],
+    }
+    leetcode = {
+        "person_id": person_id,
+        "username": f"lc{i}",
+        "problems_solved": rng.randint(20, 900),
+        "contest_rating": rng.randint(1200, 2400),
+        "strengths": rng.sample(DSA, 3),
+    }
+    text = {
+        "person_id": person_id,
+        "text": " ".join(
+            s.format(n=rng.randint(2, 9), area=rng.choice(AREAS)) for s in rng.sample(SENTENCES, 4)
+        ),
+    }
+    return resume, linkedin, github, leetcode, text
+
+
+def _jobs(rng: random.Random, n_jobs: int):
+    jobs = []
+    for i in range(1, n_jobs + 1):
+        role = rng.choice(list(ROLES))
+        jobs.append({
+            "job_id": f"JD{i:03d}",
+            "title": role,
+            "seniority": rng.choice(SENIORITIES),
+            "experience_required_years": rng.choice([0, 1, 2, 3, 5]),
+            "skills_required": ROLES[role][:4],
+            "preferred_skills": rng.sample(SKILLS, 3),
+            "job_description": f"{role} working on {rng.choice(AREAS)} systems.",
+            "responsibilities": ["Design and ship features", "Review code", "Collaborate across teams"],
+            "location": rng.choice(LOCATIONS),
+        })
+    return jobs
+
+
+def _market(rng: random.Random):
+    rows = []
+    for role in ROLES:
+        for location in LOCATIONS:
+            for seniority in SENIORITIES:
+                base = {"Junior": 6, "Mid": 15, "Senior": 30}[seniority]
+                rows.append({
+                    "role": role,
+                    "location": location,
+                    "seniority": seniority,
+                    "openings": rng.randint(5, 150),
+                    "talent_supply_index": round(rng.uniform(0.3, 0.9), 2),
+                    "salary_samples_inr_lpa": [round(base * rng.uniform(0.7, 1.5), 1) for _ in range(rng.randint(4, 20))],
+                    "channels": {ch: round(rng.uniform(0.3, 0.9), 2) for ch in rng.sample(CHANNELS, 4)},
+                })
+    return {"updated_at": "2025-08-10", "roles": rows}
+
+
+def generate_dataset(directory, n_candidates: int, n_jobs: int = 20, seed: int = 0, fmt: str = "json") -> Path:
+    """Write resume/linkedin/github/leetcode/candidate_text/jd/market files for n candidates.
+
+    fmt="ndjson" writes the candidate files as one record per line (resume.ndjson, ...).
+    Reuses an existing dataset in `directory` generated with the same parameters.
+    """
+    directory = Path(directory)
+    marker = directory / "_params.json"
+    params = {"n_candidates": n_candidates, "n_jobs": n_jobs, "seed": seed, "format": fmt}
+    if marker.exists() and json.loads(marker.read_text()) == params:
+        return directory
+    directory.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(seed)
+    names = ["resume", "linkedin", "github", "leetcode", "candidate_text"]
+    ndjson = fmt == "ndjson"
+    files = {name: open(directory / f"{name}.{fmt}", "w", encoding="utf-8") for name in names}
+    try:
+        # Stream records out one by one so 100k candidates never sit in memory at once
+        if not ndjson:
+            for f in files.values():
+                f.write("[\n")
+        for i in range(1, n_candidates + 1):
+            for name, record in zip(names, _candidate(rng, i)):
+                if ndjson:
+                    files[name].write(json.dumps(record) + "\n")
+                else:
+                    files[name].write(("" if i == 1 else ",\n") + json.dumps(record))
+        if not ndjson:
+            for f in files.values():
+                f.write("\n]\n")
+    finally:
+        for f in files.values():
+            f.close()
+
+    (directory / "jd.json").write_text(json.dumps(_jobs(rng, n_jobs), indent=2), encoding="utf-8")
+    (directory / "market_intelligence.json").write_text(json.dumps(_market(rng), indent=2), encoding="utf-8")
+    marker.write_text(json.dumps(params))
+    print(f"✅ Generated synthetic dataset: {n_candidates} candidates, {n_jobs} jobs in {directory}")
+    return directory
@@ -13,6 +13,12 @@ else:
 
     st.subheader(f"Assessment Package for **{profile_id}**")
 
+    # A failed or timed-out assessment run leaves an error entry instead of problems
+    for task in assessment:
+        if task.get("error"):
+            st.error(f"❌ Assessment could not be generated: {task['error']}")
+    assessment = [task for task in assessment if not task.get("error")]
+
     # ---- Render Each Problem ----
     for idx, task in enumerate(assessment, 1):
 
@@ -10,23 +10,33 @@ if "report" not in st.session_state:
 else:
     report = st.session_state["report"].get("behavioral_analysis", {})
 
-    if not report:
+    if report.get("error"):
+        st.error(f"❌ Behavioral analysis could not be generated: {report['error']}")
+    elif not report:
         st.warning("No behavioral analysis available.")
     else:
         # --- Soft Skills Section ---
         st.subheader("Soft Skills Analysis")
         soft_skills = report.get("soft_skill_analysis", {})
 
+        evidence = report.get("evidence", {})
+
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric(label="Collaboration", value="✔️")
             st.caption(soft_skills.get("collaboration", ""))
+            for snippet in evidence.get("collaboration", []):
+                st.caption(f"“{snippet}”")
         with col2:
             st.metric(label="Problem-Solving", value="✔️")
             st.caption(soft_skills.get("problem_solving", ""))
+            for snippet in evidence.get("problem_solving", []):
+                st.caption(f"“{snippet}”")
         with col3:
             st.metric(label="Communication", value="✔️")
             st.caption(soft_skills.get("communication", ""))
+            for snippet in evidence.get("communication", []):
+                st.caption(f"“{snippet}”")
 
         st.divider()
 
@@ -53,6 +63,8 @@ else:
         # --- High-Level Insights ---
         st.subheader("High-Level Insights")
         st.success(report.get("high_level_insights", "No insights available."))
+        if report.get("analysis_mode") == "fast":
+            st.caption("Generated locally from the extracted signals (fast mode, no LLM).")
 
         st.divider()
 
@@ -1,5 +1,13 @@
+import os
 import streamlit as st
 import pandas as pd
+from app.salary_sketch import SalarySketchStore, open_sketch_store, sketch_path
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_sketches(mtime: float) -> SalarySketchStore:
+    """Reloaded whenever the sketch file is rewritten (keyed on its mtime)."""
+    return open_sketch_store()
 
 st.set_page_config(page_title="Market Intelligence", page_icon="📈", layout="wide")
 st.title("📈 Market Intelligence & Sourcing Optimizer")
@@ -8,7 +16,9 @@ if "report" not in st.session_state:
     st.error("❌ Please run an analysis first from the main app.")
 else:
     market = st.session_state["report"].get("market_intelligence", {})
-    if not market:
+    if market.get("error"):
+        st.error(f"❌ Market intelligence could not be generated: {market['error']}")
+    elif not market:
         st.warning("⚠️ No market intelligence available for this selection.")
     else:
         # Header context
@@ -17,17 +27,40 @@ else:
         cols[1].metric("Location", market.get("location", "—"))
         cols[2].metric("Seniority", market.get("seniority", "—"))
         cols[3].metric("Updated", market.get("updated_at", "—"))
+        if market.get("market_level") not in (None, "exact"):
+            st.info(f"ℹ️ No exact market row for this JD; figures cover the {market.get('market_scope')}.")
 
         st.markdown("---")
 
         # Compensation
         st.subheader("💰 Compensation Benchmarks (INR, LPA)")
         comp = market.get("compensation", {})
-        c1, c2, c3, c4 = st.columns(4)
+        c0, c1, c2, c3, c4, c5 = st.columns(6)
+        c0.metric("p10", comp.get("p10", "—"))
         c1.metric("p25", comp.get("p25", "—"))
         c2.metric("Median", comp.get("median", "—"))
         c3.metric("p75", comp.get("p75", "—"))
-        c4.metric("Samples", comp.get("sample_size", 0))
+        c4.metric("p90", comp.get("p90", "—"))
+        c5.metric("Samples", comp.get("sample_size", 0))
+
+        # Salary history from the quantile sketches (bounded memory, any time window)
+        path = sketch_path()
+        sketches = load_sketches(os.path.getmtime(path) if path.exists() else 0.0)
+        cell = (market.get("role", ""), market.get("location", ""), market.get("seniority", ""))
+        buckets = sketches.buckets(*cell)
+        if buckets:
+            st.subheader("📉 Salary Trend (INR, LPA)")
+            start, end = (buckets[0], buckets[-1]) if len(buckets) == 1 else st.select_slider(
+                "Time window", options=buckets, value=(buckets[0], buckets[-1])
+            )
+            window = sketches.percentiles(*cell, start=start, end=end)
+            w1, w2, w3, w4 = st.columns(4)
+            w1.metric("Window p25", window.get("p25", "—"))
+            w2.metric("Window median", window.get("p50", "—"))
+            w3.metric("Window p75", window.get("p75", "—"))
+            w4.metric("Observations", window.get("sample_size", 0))
+            df_trend = pd.DataFrame(sketches.trend(*cell, start=start, end=end)).set_index("bucket")
+            st.line_chart(df_trend[["p25", "p50", "p75"]])
 
         # Trends
         st.subheader("📊 Talent Trends")
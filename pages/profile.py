@@ -11,6 +11,8 @@ if "report" not in st.session_state:
 else:
     profile_id = st.session_state["selected_profile"]
     tir = st.session_state["report"]["tir"]
+    if tir.get("error"):
+        st.error(f"❌ Candidate profile could not be generated: {tir['error']}")
 
     profile = tir.get("profile", {})
     education = tir.get("education", [])
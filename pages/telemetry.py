@@ -0,0 +1,62 @@
+import streamlit as st
+import pandas as pd
+from app.telemetry import load_events
+
+st.set_page_config(page_title="LLM Telemetry", page_icon="⏱️", layout="wide")
+st.title("⏱️ LLM Call Telemetry")
+
+events = load_events()
+if not events:
+    st.warning("⚠️ No LLM calls recorded yet. Run an analysis from the main app first.")
+else:
+    df = pd.DataFrame(events)
+    df["time"] = pd.to_datetime(df["ts"], unit="s")
+    df["tokens"] = df["prompt_tokens"] + df["completion_tokens"]
+
+    agents = sorted(df["agent"].unique())
+    selected = st.multiselect("Agents", agents, default=agents)
+    include_cache_hits = st.checkbox("Include cache hits in latency", value=False)
+    df = df[df["agent"].isin(selected)]
+
+    # Header metrics
+    cols = st.columns(4)
+    cols[0].metric("Calls", len(df))
+    cols[1].metric("Cache hit rate", f"{(df['outcome'] == 'cache_hit').mean():.0%}" if len(df) else "—")
+    cols[2].metric("Errors", int((df["outcome"] == "error").sum()))
+    cols[3].metric("Tokens spent", int(df["tokens"].sum()))
+
+    st.markdown("---")
+
+    # Per call site
+    st.subheader("📊 Latency and Token Spend per Call Site")
+    timed = df if include_cache_hits else df[df["outcome"] != "cache_hit"]
+    if timed.empty:
+        st.info("No calls to summarize for this filter.")
+    else:
+        grouped = timed.groupby(["agent", "call_site"])
+        summary = pd.DataFrame({
+            "calls": grouped.size(),
+            "p50_latency_s": grouped["latency_s"].quantile(0.5),
+            "p95_latency_s": grouped["latency_s"].quantile(0.95),
+            "total_latency_s": grouped["latency_s"].sum(),
+            "prompt_tokens": grouped["prompt_tokens"].sum(),
+            "completion_tokens": grouped["completion_tokens"].sum(),
+            "retries": grouped["retries"].sum(),
+            "errors": grouped["outcome"].apply(lambda s: int((s == "error").sum())),
+        }).round(3).sort_values("total_latency_s", ascending=False)
+        st.dataframe(summary, use_container_width=True)
+
+        by_site = summary.reset_index().set_index("call_site")
+        c1, c2 = st.columns(2)
+        c1.caption("p50 / p95 latency (s)")
+        c1.bar_chart(by_site[["p50_latency_s", "p95_latency_s"]])
+        c2.caption("Token spend")
+        c2.bar_chart(by_site[["prompt_tokens", "completion_tokens"]])
+
+    # Recent calls
+    st.subheader("🧾 Recent Calls")
+    recent = df.sort_values("ts", ascending=False).head(200)
+    st.dataframe(
+        recent[["time", "agent", "call_site", "outcome", "latency_s", "prompt_tokens", "completion_tokens", "retries"]],
+        use_container_width=True,
+    )
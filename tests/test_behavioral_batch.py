@@ -0,0 +1,126 @@
+import json
+import re
+import pytest
+import agents.behavioral_analyzer as behavioral
+from agents.behavioral_analyzer import BehavioralAnalyzer
+
+ANALYSIS = {
+    "soft_skill_analysis": {"collaboration": "c", "problem_solving": "p", "communication": "m"},
+    "keywords": ["teamwork"],
+    "themes": ["collaboration"],
+    "high_level_insights": "Works well with others.",
+    "bias_mitigation_protocol": {"guidelines": ["Judge behaviors."]},
+}
+TEXTS = {f"CAND{i:03d}": f"I collaborated with my team on project {i}. " * (1 + i % 3) for i in range(1, 8)}
+
+
+class StubPool:
+    """Answers batch prompts through `batch_reply(person_ids)` and single prompts with one analysis."""
+
+    def __init__(self, batch_reply=None):
+        self.batch_reply = batch_reply or (lambda ids: json.dumps({pid: ANALYSIS for pid in ids}))
+        self.batches, self.singles = [], []
+
+    def complete(self, prompt, call_site="", **kwargs):
+        if call_site == "behavioral-batch":
+            ids = list(json.loads(re.search(r"^Candidate Texts: (\{.*\})$", prompt, flags=re.MULTILINE).group(1)))
+            self.batches.append(ids)
+            return self.batch_reply(ids)
+        self.singles.append(re.search(r"CAND\d+", prompt).group(0))
+        return json.dumps(ANALYSIS)
+
+
+class StubCache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, model, prompt, temperature):
+        self.invalidated.append(prompt)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = StubCache()
+    monkeypatch.setattr(behavioral, "get_cache", lambda: cache)
+    monkeypatch.setattr("app.structured.get_cache", lambda: cache)
+    return cache
+
+
+def _analyzer(tmp_path, monkeypatch, pool, mode="llm"):
+    path = tmp_path / "candidate_text.json"
+    path.write_text(json.dumps([{"person_id": pid, "text": text} for pid, text in TEXTS.items()]), encoding="utf-8")
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr(behavioral, "get_llm_pool", lambda: pool)
+    return BehavioralAnalyzer(candidate_text_path=path, mode=mode)
+
+
+def test_pack_respects_token_budget_and_batch_size(tmp_path, monkeypatch):
+    analyzer = _analyzer(tmp_path, monkeypatch, StubPool())
+    ids = list(TEXTS)
+    cost = {pid: behavioral.estimate_tokens(TEXTS[pid]) + 8 for pid in ids}
+    budget = max(cost.values()) * 2
+    batches = analyzer._pack(ids, budget, max_candidates=3)
+    assert [pid for batch in batches for pid in batch] == ids
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) == 1 or sum(cost[pid] for pid in batch) <= budget
+    # A text over budget goes alone instead of being dropped
+    assert analyzer._pack(ids[:2], 1, max_candidates=8) == [[ids[0]], [ids[1]]]
+
+
+def test_all_candidates_in_few_requests(tmp_path, monkeypatch, cache):
+    pool = StubPool()
+    results = _analyzer(tmp_path, monkeypatch, pool).analyze_many(list(TEXTS), max_candidates=4)
+    assert list(results) == list(TEXTS)
+    assert [len(batch) for batch in pool.batches] == [4, 3]
+    assert pool.singles == [] and cache.invalidated == []
+    assert results["CAND001"] == {"person_id": "CAND001", **ANALYSIS}
+
+
+def test_candidates_missing_or_malformed_in_a_reply_are_retried_individually(tmp_path, monkeypatch, cache):
+    def partial(ids):
+        reply = {pid: ANALYSIS for pid in ids[2:]}
+        reply[ids[1]] = {"keywords": ["only"]}  # fails validation
+        return json.dumps(reply)
+
+    pool = StubPool(partial)
+    results = _analyzer(tmp_path, monkeypatch, pool).analyze_many(list(TEXTS)[:4], max_candidates=4)
+    assert len(pool.batches) == 1
+    assert sorted(pool.singles) == ["CAND001", "CAND002"]
+    assert all(results[pid]["high_level_insights"] == ANALYSIS["high_level_insights"] for pid in results)
+    assert cache.invalidated == []
+
+
+def test_unparseable_batch_is_invalidated_and_retried(tmp_path, monkeypatch, cache):
+    pool = StubPool(lambda ids: "Sorry, I can't help with that.")
+    results = _analyzer(tmp_path, monkeypatch, pool).analyze_many(list(TEXTS)[:3], max_candidates=3)
+    assert len(cache.invalidated) == 1 and "Candidate Texts:" in cache.invalidated[0]
+    assert sorted(pool.singles) == list(TEXTS)[:3]
+    assert list(results) == list(TEXTS)[:3]
+
+
+def test_failed_batch_request_falls_back_to_single_calls(tmp_path, monkeypatch, cache):
+    def boom(ids):
+        raise RuntimeError("429 after retries")
+
+    pool = StubPool(boom)
+    results = _analyzer(tmp_path, monkeypatch, pool).analyze_many(list(TEXTS)[:3], max_candidates=3)
+    assert sorted(pool.singles) == list(TEXTS)[:3]
+    assert list(results) == list(TEXTS)[:3]
+
+
+def test_hybrid_batch_keeps_llm_prose_and_local_signals(tmp_path, monkeypatch, cache):
+    pool = StubPool()
+    results = _analyzer(tmp_path, monkeypatch, pool, mode="hybrid").analyze_many(list(TEXTS)[:2])
+    for pid, analysis in results.items():
+        assert analysis["soft_skill_analysis"] == ANALYSIS["soft_skill_analysis"]
+        assert analysis["bias_mitigation_protocol"] == ANALYSIS["bias_mitigation_protocol"]
+        assert analysis["analysis_mode"] == "hybrid" and "evidence" in analysis
+    assert pool.singles == []
+
+
+def test_unknown_candidate_fails_before_any_request(tmp_path, monkeypatch, cache):
+    pool = StubPool()
+    with pytest.raises(ValueError):
+        _analyzer(tmp_path, monkeypatch, pool).analyze_many(["CAND001", "NOPE"])
+    assert pool.batches == [] and pool.singles == []
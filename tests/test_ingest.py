@@ -0,0 +1,73 @@
+import json
+import pytest
+import app.ingest as ingest
+from app.ingest import StreamingDataset, build_offset_index, iter_entries, iter_records, read_record
+
+RECORDS = [
+    {"person_id": "CAND001", "name": "Ana", "skills": ["Python"]},
+    {"person_id": "CAND002", "name": "Zoë", "skills": ["Go", "SQL"]},  # non-ASCII: offsets are bytes
+    {"person_id": "CAND001", "name": "duplicate"},
+    {"no_id": True},
+    {"person_id": "CAND003", "name": "Ravi"},
+]
+
+
+@pytest.fixture(autouse=True)
+def _index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "INDEX_DIR", tmp_path / "index")
+
+
+def _write_ndjson(path, records):
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(params=["ndjson", "array"])
+def data_file(request, tmp_path):
+    if request.param == "ndjson":
+        return _write_ndjson(tmp_path / "resume.ndjson", RECORDS)
+    path = tmp_path / "resume.json"
+    path.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def test_iter_records_streams_every_record(data_file):
+    assert list(iter_records(data_file, chunk_size=16)) == RECORDS
+
+
+def test_entry_offsets_point_at_the_record(data_file):
+    for offset, length, record in iter_entries(data_file, chunk_size=16):
+        assert read_record(data_file, offset, length) == record
+
+
+def test_offset_index_first_occurrence_wins(data_file):
+    index = build_offset_index(data_file, "person_id", persist=False)
+    assert list(index) == ["CAND001", "CAND002", "CAND003"]
+    assert read_record(data_file, *index["CAND001"])["name"] == "Ana"
+
+
+def test_offset_index_is_persisted_and_rebuilt_on_change(tmp_path):
+    path = _write_ndjson(tmp_path / "resume.ndjson", RECORDS)
+    first = build_offset_index(path, "person_id")
+    assert list((tmp_path / "index").glob("*.json"))
+    assert build_offset_index(path, "person_id") == first
+
+    _write_ndjson(path, [{"person_id": "NEW", "name": "Changed file, different size"}])
+    assert list(build_offset_index(path, "person_id")) == ["NEW"]
+
+
+def test_streaming_dataset_lookups(data_file):
+    dataset = StreamingDataset(data_file, "person_id", cache_size=1)
+    assert len(dataset) == 3
+    assert "CAND002" in dataset and "missing" not in dataset
+    assert dataset.get("CAND002")["name"] == "Zoë"
+    assert dataset.get("CAND003")["name"] == "Ravi"
+    assert dataset.get("missing", {}) == {}
+    assert [r.get("person_id") for r in dataset] == [r.get("person_id") for r in RECORDS]
+
+
+def test_non_array_json_is_rejected(tmp_path):
+    path = tmp_path / "resume.json"
+    path.write_text('{"person_id": "CAND001"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_records(path))
@@ -0,0 +1,103 @@
+import json
+import pytest
+from app.datastore import DataStore
+from app.job_matcher import SCORE_WEIGHTS, SOURCE_WEIGHTS, JobMatcher, years_of_experience
+from app.skills import canonical_keys
+
+RESUMES = [
+    {"person_id": "CAND001", "skills": ["Python", "Docker", "k8s"], "YOE": 6},
+    {"person_id": "CAND002", "skills": ["python3"], "experience": [{"YOE": 1}, {"YOE": "2"}]},
+    {"person_id": "CAND003", "skills": ["Java"], "YOE": 10},
+    {"person_id": "CAND004", "skills": ["Python/Shell scripting", "AWS"], "YOE": 4},
+    {"person_id": "CAND005", "skills": [], "YOE": "n/a"},
+]
+LINKEDIN = [{"person_id": "CAND002", "skills": ["Kubernetes", "Terraform"]}]
+GITHUB = [{"person_id": "CAND003", "top_languages": ["Python"]}]
+LEETCODE = [{"person_id": "CAND005", "strengths": ["Dynamic Programming"]}]
+JDS = [
+    {"job_id": "JD001", "skills_required": ["Python", "Kubernetes", "Docker"], "preferred_skills": ["Terraform"],
+     "experience_required_years": 5},
+    {"job_id": "JD002", "skills_required": [], "preferred_skills": ["AWS", "Bash"]},
+]
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    for filename, records in (("resume.json", RESUMES), ("linkedin.json", LINKEDIN), ("github.json", GITHUB),
+                              ("leetcode.json", LEETCODE), ("jd.json", JDS)):
+        (tmp_path / filename).write_text(json.dumps(records), encoding="utf-8")
+    return JobMatcher(DataStore(tmp_path))
+
+
+def _reference_score(person_id: str, job: dict) -> float:
+    """Plain-Python version of the scoring rules, one candidate at a time."""
+    evidence = {}
+    sources = {
+        "resume": next(r for r in RESUMES if r["person_id"] == person_id).get("skills", []),
+        "linkedin": next((r["skills"] for r in LINKEDIN if r["person_id"] == person_id), []),
+        "github": next((r["top_languages"] for r in GITHUB if r["person_id"] == person_id), []),
+        "leetcode": next((r["strengths"] for r in LEETCODE if r["person_id"] == person_id), []),
+    }
+    for source, skills in sources.items():
+        for key in {k for s in skills for k in canonical_keys(s)}:
+            evidence[key] = min(1.0, evidence.get(key, 0.0) + SOURCE_WEIGHTS[source])
+
+    def coverage(field):
+        keys = {k for s in job.get(field, []) for k in canonical_keys(s)}
+        return sum(evidence.get(k, 0.0) for k in keys) / len(keys) if keys else 1.0
+
+    years = job.get("experience_required_years") or 0
+    yoe = years_of_experience(next(r for r in RESUMES if r["person_id"] == person_id))
+    experience = min(1.0, yoe / years) if years else 1.0
+    return (SCORE_WEIGHTS["required"] * coverage("skills_required")
+            + SCORE_WEIGHTS["preferred"] * coverage("preferred_skills")
+            + SCORE_WEIGHTS["experience"] * experience)
+
+
+def test_ranking_matches_the_reference_scores(matcher):
+    shortlists = matcher.score_jobs(["JD001", "JD002"], top_k=len(RESUMES))
+    for job in JDS:
+        ranked = shortlists[job["job_id"]]
+        assert sorted(entry["person_id"] for entry in ranked) == sorted(r["person_id"] for r in RESUMES)
+        for entry in ranked:
+            assert entry["score"] == pytest.approx(_reference_score(entry["person_id"], job), abs=1e-4)
+        scores = [entry["score"] for entry in ranked]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_breakdown_is_consistent_with_the_score(matcher):
+    for entry in matcher.score_job("JD001", top_k=len(RESUMES)):
+        blended = (SCORE_WEIGHTS["required"] * entry["required_coverage"]
+                   + SCORE_WEIGHTS["preferred"] * entry["preferred_coverage"]
+                   + SCORE_WEIGHTS["experience"] * entry["experience_fit"])
+        assert entry["score"] == pytest.approx(blended, abs=1e-3)
+        assert sorted(entry["matched_required"] + entry["missing_required"]) == sorted(JDS[0]["skills_required"])
+        if entry["required_coverage"] == 1.0:
+            assert entry["missing_required"] == []
+
+
+def test_breakdown_details(matcher):
+    by_id = {entry["person_id"]: entry for entry in matcher.score_job("JD001", top_k=len(RESUMES))}
+    assert by_id["CAND001"]["matched_required"] == ["Python", "Kubernetes", "Docker"]
+    assert by_id["CAND001"]["experience_fit"] == 1.0
+    # Aliases across sources: python3 in the resume, Kubernetes and Terraform on LinkedIn
+    assert by_id["CAND002"]["missing_required"] == ["Docker"]
+    assert by_id["CAND002"]["matched_preferred"] == ["Terraform"]
+    assert by_id["CAND002"]["years_of_experience"] == 3.0
+    # GitHub evidence counts, but for less than a resume entry
+    assert by_id["CAND003"]["required_coverage"] == pytest.approx(SOURCE_WEIGHTS["github"] / 3, abs=1e-4)
+    assert by_id["CAND005"]["years_of_experience"] == 0.0
+
+
+def test_empty_requirement_list_counts_as_covered(matcher):
+    by_id = {entry["person_id"]: entry for entry in matcher.score_job("JD002", top_k=len(RESUMES))}
+    assert all(entry["required_coverage"] == 1.0 for entry in by_id.values())
+    # "Python/Shell scripting" is split, so Bash (Shell Scripting) counts as a preferred match
+    assert by_id["CAND004"]["matched_preferred"] == ["AWS", "Bash"]
+    assert matcher.shortlist("JD002", top_k=1) == ["CAND004"]
+
+
+def test_top_k(matcher):
+    assert len(matcher.score_job("JD001", top_k=2)) == 2
+    assert len(matcher.score_job("JD001", top_k=50)) == len(RESUMES)
+    assert matcher.shortlist("JD001", top_k=1) == ["CAND001"]
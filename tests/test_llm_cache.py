@@ -0,0 +1,86 @@
+import pytest
+from app.llm_cache import LLMCache
+
+MODEL = "llama-3.3-70b-versatile"
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.llm_cache.time.time", clock)
+    return clock
+
+
+def test_hit_miss_and_key_parts(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3")
+    assert cache.get(MODEL, "p", 0.2) is None
+    cache.set(MODEL, "p", 0.2, "answer")
+    assert cache.get(MODEL, "p", 0.2) == "answer"
+    # Model, prompt and temperature are all part of the key
+    assert cache.get("other-model", "p", 0.2) is None
+    assert cache.get(MODEL, "q", 0.2) is None
+    assert cache.get(MODEL, "p", 0.7) is None
+    # Persisted across instances
+    assert LLMCache(cache.path).get(MODEL, "p", 0.2) == "answer"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3", max_entries=2)
+    cache.set(MODEL, "a", 0.0, "A")
+    clock.now += 1
+    cache.set(MODEL, "b", 0.0, "B")
+    clock.now += 1
+    assert cache.get(MODEL, "a", 0.0) == "A"  # "a" is now more recent than "b"
+    clock.now += 1
+    cache.set(MODEL, "c", 0.0, "C")
+    assert cache.get(MODEL, "b", 0.0) is None
+    assert cache.get(MODEL, "a", 0.0) == "A"
+    assert cache.get(MODEL, "c", 0.0) == "C"
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_expired_entries_are_evicted_on_read_and_write(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3", max_age_s=60)
+    cache.set(MODEL, "old", 0.0, "stale")
+    clock.now += 61
+    assert cache.get(MODEL, "old", 0.0) is None
+    assert cache.evictions == 1
+
+    cache.set(MODEL, "a", 0.0, "A")
+    clock.now += 30
+    cache.set(MODEL, "b", 0.0, "B")
+    assert cache.get(MODEL, "a", 0.0) == "A"  # reading doesn't extend its age
+    clock.now += 31
+    cache.set(MODEL, "c", 0.0, "C")  # the write drops "a"
+    assert cache.stats()["entries"] == 2 and cache.evictions == 2
+
+
+def test_invalidate_drops_one_entry(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3")
+    cache.set(MODEL, "a", 0.0, "not json")
+    cache.set(MODEL, "b", 0.0, "{}")
+    cache.invalidate(MODEL, "a", 0.0)
+    cache.invalidate(MODEL, "missing", 0.0)
+    assert cache.get(MODEL, "a", 0.0) is None
+    assert cache.get(MODEL, "b", 0.0) == "{}"
+
+
+def test_stats(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3")
+    assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "hit_rate": 0.0}
+    cache.set(MODEL, "a", 0.0, "A")
+    cache.get(MODEL, "a", 0.0)
+    cache.get(MODEL, "a", 0.0)
+    cache.get(MODEL, "b", 0.0)
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 1, 0.667)
+    cache.clear()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import pytest
+from groq import APIStatusError
+import app.llm_client as llm_client
+from app.llm_client import LLMClientPool, TokenBucket
+
+
+class Clock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _status_error(status: int) -> APIStatusError:
+    response = httpx.Response(status, request=httpx.Request("POST", "https://api.groq.test/chat"))
+    return APIStatusError(f"status {status}", response=response, body=None)
+
+
+def _reply(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+class StubCompletions:
+    """Fails with the queued errors first, then replies; records each call's kwargs."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.errors:
+            raise self.errors.pop(0)
+        return _reply('{"ok": true}')
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DISABLED", "1")
+    monkeypatch.setenv("LLM_TELEMETRY_DISABLED", "1")
+    monkeypatch.setattr(llm_client, "JSON_MODE_ENABLED", True)
+    pool = LLMClientPool(api_key="test", requests_per_min=None, tokens_per_min=None, base_delay=0, max_delay=0)
+    yield pool
+    pool.close()
+
+
+def _stub(pool, errors=()):
+    completions = StubCompletions(errors)
+    pool.client = SimpleNamespace(chat=SimpleNamespace(completions=completions), close=lambda: asyncio.sleep(0))
+    return completions
+
+
+# ---------- TokenBucket ----------
+def test_bucket_refills_continuously_up_to_capacity(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_client.time, "monotonic", clock)
+    bucket = TokenBucket(rate_per_min=60)  # one token per second
+    assert bucket.tokens == bucket.capacity == 60
+
+    asyncio.run(bucket.acquire(50))
+    assert bucket.tokens == 10
+    clock.now += 5
+    bucket._refill()
+    assert bucket.tokens == 15
+    clock.now += 3600
+    bucket._refill()
+    assert bucket.tokens == 60  # never above capacity
+
+
+def test_bucket_waits_for_the_missing_tokens(monkeypatch):
+    clock = Clock()
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(llm_client.time, "monotonic", clock)
+    monkeypatch.setattr(llm_client.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate_per_min=120, capacity=10)  # two tokens per second
+
+    asyncio.run(bucket.acquire(10))
+    asyncio.run(bucket.acquire(4))
+    assert slept == [2.0] and bucket.tokens == 0
+    # Requests bigger than the bucket are capped instead of waiting forever
+    asyncio.run(bucket.acquire(1000))
+    assert slept == [2.0, 5.0]
+
+
+def test_debit_delays_later_callers(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_client.time, "monotonic", clock)
+    bucket = TokenBucket(rate_per_min=60, capacity=10)
+    bucket.debit(15)
+    assert bucket.tokens == -5
+    clock.now += 6
+    bucket._refill()
+    assert bucket.tokens == 1
+
+
+# ---------- JSON mode ----------
+def test_json_mode_400_is_retried_once_without_response_format(pool):
+    completions = _stub(pool, [_status_error(400)])
+    assert pool.complete("prompt", model="m", temperature=0.0, json_mode=True) == '{"ok": true}'
+    assert [call.get("response_format") for call in completions.calls] == [{"type": "json_object"}, None]
+
+
+def test_400_without_json_mode_is_raised(pool):
+    completions = _stub(pool, [_status_error(400)])
+    with pytest.raises(APIStatusError):
+        pool.complete("prompt", model="m", temperature=0.0)
+    assert len(completions.calls) == 1
+
+
+def test_second_400_after_the_fallback_is_raised(pool):
+    completions = _stub(pool, [_status_error(400), _status_error(400)])
+    with pytest.raises(APIStatusError):
+        pool.complete("prompt", model="m", temperature=0.0, json_mode=True)
+    assert len(completions.calls) == 2
+
+
+def test_json_mode_disabled_by_env_skips_response_format(pool, monkeypatch):
+    monkeypatch.setattr(llm_client, "JSON_MODE_ENABLED", False)
+    completions = _stub(pool)
+    pool.complete("prompt", model="m", temperature=0.0, json_mode=True)
+    assert "response_format" not in completions.calls[0]
+
+
+def test_retryable_status_is_retried_with_json_mode_kept(pool):
+    completions = _stub(pool, [_status_error(503)])
+    pool.complete("prompt", model="m", temperature=0.0, json_mode=True)
+    assert [call.get("response_format") for call in completions.calls] == [{"type": "json_object"}] * 2
@@ -0,0 +1,30 @@
+import numpy as np
+from app.market_index import PERCENTILES, interpolated_percentiles
+
+
+def _grouped(groups):
+    counts = np.array([len(g) for g in groups], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    values = np.concatenate([np.sort(np.asarray(g, dtype=float)) for g in groups]) if groups else np.array([])
+    return offsets, counts, values
+
+
+def test_matches_numpy_linear_percentiles():
+    rng = np.random.default_rng(7)
+    groups = [rng.normal(12, 4, size=n) for n in (1, 2, 3, 10, 57, 400)]
+    result = interpolated_percentiles(*_grouped(groups))
+    assert result.shape == (len(groups), len(PERCENTILES))
+    for row, group in zip(result, groups):
+        np.testing.assert_allclose(row, np.percentile(group, PERCENTILES, method="linear"))
+
+
+def test_empty_groups_are_nan():
+    result = interpolated_percentiles(*_grouped([[], [5.0, 7.0], []]), percentiles=(0, 50, 100))
+    assert np.isnan(result[0]).all() and np.isnan(result[2]).all()
+    np.testing.assert_allclose(result[1], [5.0, 6.0, 7.0])
+
+
+def test_no_values_at_all():
+    offsets = np.zeros(2, dtype=np.int64)
+    counts = np.zeros(2, dtype=np.int64)
+    assert np.isnan(interpolated_percentiles(offsets, counts, np.array([]))).all()
@@ -0,0 +1,110 @@
+import json
+import pytest
+from app.report_archive import _REF, ReportArchive
+
+TIR = {"person_id": "CAND001", "job_id": "JD001", "profile": {"name": "Zoë"}, "skills_analysis": [{"skill": "Go"}]}
+
+
+def _orchestrated(tir=TIR):
+    return {"tir": tir, "assessment": [{"title": "Two Sum"}], "market_intelligence": {"job_id": "JD001"}}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ReportArchive(tmp_path / "archive", max_segment_bytes=400)
+
+
+def _frames(archive):
+    return sorted(archive.directory.glob("segment-*.seg"))
+
+
+def test_frames_round_trip_across_segments(archive):
+    reports = {f"CAND{i:03d}": {"person_id": f"CAND{i:03d}", "notes": "x" * 200, "n": i} for i in range(6)}
+    for person_id, report in reports.items():
+        archive.put("tir", person_id, "JD001", report)
+    assert len(_frames(archive)) > 1  # max_segment_bytes forces a rollover
+    for person_id, report in reports.items():
+        assert archive.get("tir", person_id, "JD001") == report
+    assert archive.get("tir", "missing", "JD001", default={}) == {}
+    assert ("tir", "CAND000", "JD001") in archive and len(archive) == 6
+
+
+def test_latest_put_wins_and_job_less_keys(archive):
+    archive.put("tir", "CAND001", None, {"v": 1})
+    archive.put("tir", "CAND001", None, {"v": 2})
+    assert archive.get("tir", "CAND001", None) == {"v": 2}
+    assert ReportArchive(archive.directory).get("tir", "CAND001", None) == {"v": 2}
+    with pytest.raises(ValueError):
+        archive.put("summary", "CAND001", None, {})
+
+
+def test_orchestrated_report_references_the_saved_tir(archive):
+    archive.put("tir", "CAND001", "JD001", TIR)
+    archive.put("orchestrated", "CAND001", "JD001", _orchestrated())
+
+    stored = archive._read(*archive.index["orchestrated\tCAND001\tJD001"][:3])
+    assert set(stored["tir"]) == {_REF}  # the TIR is not stored twice
+    assert archive.get("orchestrated", "CAND001", "JD001") == _orchestrated()
+
+
+def test_a_different_tir_is_kept_as_its_own_blob(archive):
+    archive.put("tir", "CAND001", "JD001", TIR)
+    other = {**TIR, "career_summary": "edited after the profiler saved it"}
+    archive.put("orchestrated", "CAND001", "JD001", _orchestrated(other))
+    assert archive.get("orchestrated", "CAND001", "JD001")["tir"] == other
+    assert archive.get("tir", "CAND001", "JD001") == TIR
+    assert len(archive) == 2  # the blob isn't a report
+
+
+def test_frames_missing_from_the_index_are_reindexed(archive):
+    archive.put("tir", "CAND001", "JD001", TIR)
+    archive.put("orchestrated", "CAND001", "JD001", _orchestrated())
+    archive.put("tir", "CAND002", "JD001", {"person_id": "CAND002"})
+    # Crash between writing the last frame and its index line, which is left half-written
+    lines = archive.index_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    archive.index_path.write_text("".join(lines[:-1]) + lines[-1][:10], encoding="utf-8")
+
+    reopened = ReportArchive(archive.directory)
+    assert reopened.get("tir", "CAND002", "JD001") == {"person_id": "CAND002"}
+    assert reopened.get("orchestrated", "CAND001", "JD001") == _orchestrated()
+
+
+def test_torn_frame_at_the_end_of_a_segment_is_ignored(archive):
+    archive.put("tir", "CAND001", "JD001", TIR)
+    segment = _frames(archive)[-1]
+    archive.put("tir", "CAND002", "JD001", {"person_id": "CAND002"})
+    archive.index_path.write_text(archive.index_path.read_text(encoding="utf-8").splitlines(keepends=True)[0],
+                                  encoding="utf-8")
+    with open(segment, "r+b") as f:  # the second frame was only partly written
+        f.truncate(segment.stat().st_size - 5)
+
+    reopened = ReportArchive(archive.directory)
+    assert reopened.get("tir", "CAND001", "JD001") == TIR
+    assert ("tir", "CAND002", "JD001") not in reopened
+
+
+def test_keys_and_export_follow_storage_order(archive, tmp_path):
+    archive.put("tir", "CAND002", "JD001", {"n": 2})
+    archive.put("tir", "CAND001", "JD001", {"n": 1})
+    archive.put("orchestrated", "CAND001", "JD001", {"tir": {"n": 1}})
+    archive.put("tir", "CAND002", "JD001", {"n": 3})  # rewritten: now the latest frame
+    assert list(archive.keys()) == [
+        ("tir", "CAND001", "JD001"), ("orchestrated", "CAND001", "JD001"), ("tir", "CAND002", "JD001"),
+    ]
+    assert list(archive.keys("orchestrated")) == [("orchestrated", "CAND001", "JD001")]
+
+    assert archive.export(tmp_path / "out") == 3
+    exported = json.loads((tmp_path / "out" / "TIR_CAND002_JD001.json").read_text(encoding="utf-8"))
+    assert exported == {"n": 3}
+    assert (tmp_path / "out" / "CAND001_JD001_orchestrated.json").exists()
+
+
+def test_import_dir_dedupes_tirs(archive, tmp_path):
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    (reports / "CAND001_JD001_orchestrated.json").write_text(json.dumps(_orchestrated()), encoding="utf-8")
+    (reports / "TIR_CAND001_JD001.json").write_text(json.dumps(TIR), encoding="utf-8")
+    (reports / "notes.json").write_text("{}", encoding="utf-8")
+    assert archive.import_dir(reports) == 2
+    assert not any(key.startswith("blob\t") for key in archive.index)
+    assert archive.get("orchestrated", "CAND001", "JD001") == _orchestrated()
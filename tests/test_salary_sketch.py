@@ -0,0 +1,101 @@
+import json
+from datetime import date
+import numpy as np
+import pytest
+from app.salary_sketch import KLLSketch, SalarySketchStore, bucket_range
+
+QS = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def _rank_error(sample, estimates):
+    """Largest gap between each quantile asked for and the empirical rank of its estimate."""
+    sample = np.sort(sample)
+    return max(abs(np.searchsorted(sample, est) / len(sample) - q) for q, est in zip(QS, estimates))
+
+
+def test_empty_sketch_has_no_quantiles():
+    assert KLLSketch().quantiles(QS) == [None] * len(QS)
+
+
+def test_exact_before_any_compaction():
+    values = [9.0, 3.0, 7.0, 1.0, 5.0]
+    sketch = KLLSketch(k=200)
+    sketch.extend(values)
+    np.testing.assert_allclose(sketch.quantiles(QS), np.percentile(values, [q * 100 for q in QS]))
+    assert sketch.quantile(0.0) == 1.0 and sketch.quantile(1.0) == 9.0
+
+
+def test_rank_error_and_bounded_size_on_large_streams():
+    rng = np.random.default_rng(3)
+    sample = rng.lognormal(2.5, 0.4, size=50_000)
+    sketch = KLLSketch(k=200)
+    sketch.extend(sample)
+    assert len(sketch) == len(sample)
+    assert sum(len(items) for items in sketch.compactors) < 2_000
+    assert sketch.min == sample.min() and sketch.max == sample.max()
+    assert _rank_error(sample, sketch.quantiles(QS)) < 0.02
+
+
+def test_merge_matches_the_combined_stream():
+    rng = np.random.default_rng(11)
+    a, b = rng.normal(10, 2, size=20_000), rng.normal(20, 3, size=20_000)
+    left, right = KLLSketch(), KLLSketch()
+    left.extend(a)
+    right.extend(b)
+    merged = left.merge(right)
+    assert len(merged) == 40_000
+    assert _rank_error(np.concatenate([a, b]), merged.quantiles(QS)) < 0.02
+
+
+def test_round_trips_through_json():
+    sketch = KLLSketch(k=64)
+    sketch.extend(range(5_000))
+    restored = KLLSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.quantiles(QS) == sketch.quantiles(QS)
+    restored.update(1e6)
+    assert restored.max == 1e6 and len(restored) == 5_001
+
+
+def test_bucket_range_parses_every_label_format():
+    assert bucket_range("2025") == (date(2025, 1, 1), date(2025, 12, 31))
+    assert bucket_range("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert bucket_range("2025-W01") == (date(2024, 12, 30), date(2025, 1, 5))
+    assert bucket_range("2025-08-10") == (date(2025, 8, 10), date(2025, 8, 10))
+    with pytest.raises(ValueError):
+        bucket_range("2025-13")
+    with pytest.raises(ValueError):
+        bucket_range("last month")
+
+
+def _store(tmp_path, bucket, observations):
+    store = SalarySketchStore(tmp_path / "sketches.json", bucket=bucket)
+    for observed_at, salary in observations:
+        store.add("Backend Engineer", "Hyderabad, IN", "Mid", salary, observed_at)
+    return store
+
+
+def _window(store, start=None, end=None):
+    return [row["bucket"] for row in store.trend("Backend Engineer", "Hyderabad, IN", "Mid", start=start, end=end)]
+
+
+def test_month_bounds_select_week_buckets_by_date(tmp_path):
+    # 2024-12-30 falls in ISO week 2025-W01, 2025-01-27 in 2025-W05 (which ends in February)
+    store = _store(tmp_path, "week", [("2024-12-20", 10), ("2024-12-30", 11), ("2025-01-15", 12),
+                                      ("2025-01-27", 13), ("2025-02-10", 14), ("2025-10-06", 15)])
+    assert _window(store, "2025-01", "2025-01") == ["2025-W01", "2025-W03", "2025-W05"]
+    assert _window(store, end="2024-12") == ["2024-W51", "2025-W01"]
+    assert _window(store, "2025-02") == ["2025-W05", "2025-W07", "2025-W41"]
+    # Date order, not string order, across the year boundary
+    assert store.buckets("Backend Engineer", "Hyderabad, IN", "Mid")[:2] == ["2024-W51", "2025-W01"]
+
+
+def test_bounds_of_any_format_select_month_and_day_buckets(tmp_path):
+    months = _store(tmp_path / "m", "month", [("2025-01-10", 10), ("2025-02-10", 12), ("2025-03-10", 14)])
+    assert _window(months, "2025-01-15", "2025-02-01") == ["2025-01", "2025-02"]
+    assert _window(months, "2025-W09", "2025-W09") == ["2025-02", "2025-03"]  # 24 Feb - 2 Mar
+    assert _window(months, "2025", "2025") == ["2025-01", "2025-02", "2025-03"]
+    assert months.percentiles("Backend Engineer", "Hyderabad, IN", "Mid", "2025-02", "2025-12")["sample_size"] == 2
+
+    days = _store(tmp_path / "d", "day", [("2025-01-31", 10), ("2025-02-01", 12), ("2025-02-28", 14)])
+    assert _window(days, "2025-02", "2025-02") == ["2025-02-01", "2025-02-28"]
+    assert _window(days, end="2025-01") == ["2025-01-31"]
@@ -0,0 +1,58 @@
+from app.skills import canonical_key, canonical_skill, canonical_skills, expand_skill, same_skill
+
+
+def test_aliases_map_to_canonical_name():
+    assert canonical_skill("ml") == "Machine Learning"
+    assert canonical_skill("  DP ") == "Dynamic Programming"
+    assert canonical_skill("k8s") == "Kubernetes"
+    assert canonical_skill("Hash Table") == "HashMaps"
+
+
+def test_key_ignores_case_spacing_and_punctuation():
+    assert canonical_key("Scikit Learn") == canonical_key("scikit-learn") == canonical_key("sklearn")
+    assert same_skill("PostgreSQL", "postgres")
+
+
+def test_plus_and_hash_stay_distinct_from_c():
+    assert canonical_key("C++") != canonical_key("C#")
+    assert canonical_key("C++") != canonical_key("C")
+
+
+def test_trailing_qualifiers_are_dropped_for_known_skills():
+    assert canonical_skill("Computer Vision related") == "Computer Vision"
+    assert canonical_skill("NLP tasks") == "NLP"
+    assert canonical_skill("NLP-related problems") == "NLP"
+    assert canonical_skill("Leadership skills") == "Leadership"
+    assert expand_skill("NLP & Computer Vision related tasks") == ("NLP", "Computer Vision")
+    # Unknown names and bare qualifiers are left alone
+    assert canonical_skill("Distributed systems problems") == "Distributed systems problems"
+    assert canonical_skill("Tasks") == "Tasks"
+
+
+def test_unknown_skill_is_kept_trimmed():
+    assert canonical_skill("  Rust ") == "Rust"
+
+
+def test_ambiguous_short_aliases_are_not_merged():
+    for alias, skill in (("tf", "TensorFlow"), ("cv", "Computer Vision"), ("pm", "Project Management"),
+                         ("containers", "Docker"), ("logging", "Monitoring & Logging")):
+        assert not same_skill(alias, skill)
+    assert not same_skill("Leadership", "Mentoring")
+
+
+def test_compound_entries_expand_to_each_skill():
+    assert expand_skill("Python/Shell scripting") == ("Python", "Shell Scripting")
+    assert expand_skill("Leadership & Mentoring") == ("Leadership", "Mentoring")
+
+
+def test_whole_string_matches_and_unknown_pairs_stay_whole():
+    assert expand_skill("CI/CD") == ("CI/CD",)
+    assert expand_skill("Monitoring & Logging") == ("Monitoring & Logging",)
+    assert expand_skill("TCP/IP") == ("TCP/IP",)
+
+
+def test_canonical_skills_dedupes_in_first_seen_order():
+    assert canonical_skills(["py", "ML", "Python", "machine learning", "Python/Bash"]) == [
+        "Python", "Machine Learning", "Shell Scripting",
+    ]
+    assert canonical_skills(None) == []
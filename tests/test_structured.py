@@ -0,0 +1,79 @@
+import pytest
+from app.structured import StructuredOutputError, complete_structured, parse_structured, repair_json, validate
+
+QUESTIONS = {
+    "type": "array",
+    "min_items": 1,
+    "unwrap": "questions",
+    "items": {
+        "type": "object",
+        "required": ["title", "difficulty"],
+        "properties": {"title": {"type": "string"}, "time_limit_min": {"type": "integer"}},
+    },
+}
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Sure! Here it is:\n{"a": [1, 2]}\nHope that helps.', {"a": [1, 2]}),
+    ('{"a": 1, // note\n "b": [1, 2,], /* x */ "c": 3}', {"a": 1, "b": [1, 2], "c": 3}),
+    ('{"a": [1, 2,], /* trailing */}', {"a": [1, 2]}),
+    ('{“a”: “b”}', {"a": "b"}),
+    ('{"ok": True, "missing": None}', {"ok": True, "missing": None}),
+    ("{'a': 'single quoted'}", {"a": "single quoted"}),
+    ('{"items": [{"a": 1}, {"a": "cut off', {"items": [{"a": 1}, {"a": "cut off"}]}),
+    ('{"url": "http://x.io/a,]", "t": "True"}', {"url": "http://x.io/a,]", "t": "True"}),
+])
+def test_repair_json(raw, expected):
+    assert repair_json(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", None, "no json here"])
+def test_repair_json_rejects_non_json(raw):
+    with pytest.raises(ValueError):
+        repair_json(raw)
+
+
+def test_validate_unwraps_and_coerces():
+    value, errors = validate({"questions": [{"title": "Two Sum", "difficulty": "Easy", "time_limit_min": "30"}]},
+                             QUESTIONS)
+    assert errors == []
+    assert value == [{"title": "Two Sum", "difficulty": "Easy", "time_limit_min": 30}]
+
+
+def test_validate_reports_paths():
+    _, errors = validate([{"title": 5}], QUESTIONS)
+    assert errors == ["$[0].difficulty: missing", "$[0].title: expected string, got int"]
+    _, errors = validate([], QUESTIONS)
+    assert errors == ["$: expected at least 1 items, got 0"]
+    _, errors = validate({"n": True}, {"type": "object", "properties": {"n": {"type": "number"}}})
+    assert errors == ["$.n: expected number, got bool"]
+
+
+def test_parse_structured_flags_non_json():
+    assert parse_structured("nothing", QUESTIONS) == (None, ["reply is not JSON"])
+
+
+class _FakeLLM:
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def complete(self, prompt, **kwargs):
+        self.prompts.append((prompt, kwargs))
+        return self.replies.pop(0)
+
+
+def test_complete_structured_requeries_once(monkeypatch):
+    monkeypatch.setattr("app.structured.get_cache", lambda: None)
+    llm = _FakeLLM('{"questions": []}', '[{"title": "Two Sum", "difficulty": "Easy"}]')
+    value = complete_structured(llm, "prompt", QUESTIONS, model="m", temperature=0.0)
+    assert value == [{"title": "Two Sum", "difficulty": "Easy"}]
+    retry_prompt, retry_kwargs = llm.prompts[1]
+    assert "at least 1 items" in retry_prompt and retry_kwargs["use_cache"] is False
+
+    llm = _FakeLLM("nope", "still nope")
+    with pytest.raises(StructuredOutputError) as info:
+        complete_structured(llm, "prompt", QUESTIONS, model="m", temperature=0.0)
+    assert info.value.raw == "still nope"